@@ -2455,6 +2455,110 @@
     /** 全候補 URL が失敗したキー（再試行しない） */
     var svgFetchFailedKeys = new Set();
 
+    /**
+     * アイコンアトラス（scripts/build_icon_atlas.py が assets/ に書く icon_atlas.json + 画像）。
+     * 最初のアイコン要求で索引と画像を 1 回ずつ取得し、載っているアイコンは白マスクの枠を canvas で symHex に
+     * 着色して objectURL にする（アイコンごとの SVG fetch をしない）。アトラスが無い・読めない・載っていない
+     * アイコンは従来どおり SVG を fetch する。#game-map data-icon-atlas="false" で無効化。
+     */
+    /** 最大表示 px（icon_only 24px × 重要度 5 の 1.4 倍）。高 DPI では 2 倍まで大きい枠を選ぶ */
+    var ICON_ATLAS_DISPLAY_PX = 34;
+    var iconAtlasPromise = null;
+
+    function loadIconAtlas() {
+        if (iconAtlasPromise) return iconAtlasPromise;
+        var cv = document.createElement('canvas');
+        if (mapDiv.getAttribute('data-icon-atlas') === 'false' || typeof cv.toBlob !== 'function') {
+            iconAtlasPromise = Promise.resolve(null);
+            return iconAtlasPromise;
+        }
+        var assetsBase = baseUrl + 'assets/';
+        iconAtlasPromise = fetch(assetsBase + 'icon_atlas.json?' + svgFetchSessionBust)
+            .then(function (r) {
+                if (!r.ok) throw new Error('atlas index ' + r.status);
+                return r.json();
+            })
+            .then(function (index) {
+                if (!index || index.version !== 1 || !index.icons || !index.image) throw new Error('atlas index');
+                // 画像は中身のハッシュ付き URL（同じアトラスの間はブラウザキャッシュが効く）
+                var imgUrl = assetsBase + encodeURIComponent(index.image) +
+                    '?' + (index.image_hash ? 'h=' + encodeURIComponent(index.image_hash) : svgFetchSessionBust);
+                return fetch(imgUrl)
+                    .then(function (r) {
+                        if (!r.ok) throw new Error('atlas image ' + r.status);
+                        return r.blob();
+                    })
+                    .then(function (blob) {
+                        return new Promise(function (resolve, reject) {
+                            var u = URL.createObjectURL(blob);
+                            var img = new Image();
+                            img.onload = function () { resolve({ index: index, image: img }); };
+                            img.onerror = function () {
+                                URL.revokeObjectURL(u);
+                                reject(new Error('atlas decode'));
+                            };
+                            img.src = u;
+                        });
+                    });
+            })
+            .catch(function (e) {
+                if (isDebug) console.warn('[map.js] icon atlas unavailable, fetching SVG per icon', e);
+                return null;
+            });
+        return iconAtlasPromise;
+    }
+
+    /** 今の画面に足りる一番小さい枠（足りる枠が無ければ一番大きい枠） */
+    function pickIconAtlasFrame(rec, sizes) {
+        var want = ICON_ATLAS_DISPLAY_PX * Math.min(2, Math.max(1, window.devicePixelRatio || 1));
+        var best = null;
+        var bestSize = 0;
+        (sizes || []).forEach(function (s) {
+            var f = rec.frames && rec.frames[String(s)];
+            if (!f || f.length !== 4) return;
+            if (!best || (bestSize < want && s > bestSize) || (s >= want && s < bestSize)) {
+                best = f;
+                bestSize = s;
+            }
+        });
+        return best;
+    }
+
+    /** アトラスに載っていれば着色済み objectURL、無ければ null（replaceSvgCurrentColor と同じ色の扱い） */
+    function atlasIconObjectUrlAsync(pinSvgId, symHex) {
+        return loadIconAtlas()
+            .then(function (atlas) {
+                if (!atlas) return null;
+                var rec = atlas.index.icons[pinSvgId];
+                // 多色・グラデーションのアイコンは単色に潰れるので SVG の取得に任せる
+                if (!rec || rec.single_tint === false) return null;
+                var f = pickIconAtlasFrame(rec, atlas.index.sizes);
+                if (!f) return null;
+                var h = String(symHex || '#ffffff').trim();
+                if (!/^#[0-9a-fA-F]{6}$/.test(h)) h = '#ffffff';
+                var w = f[2];
+                var ht = f[3];
+                var cv = document.createElement('canvas');
+                cv.width = w;
+                cv.height = ht;
+                var ctx = cv.getContext('2d');
+                if (!ctx) return null;
+                ctx.drawImage(atlas.image, f[0], f[1], w, ht, 0, 0, w, ht);
+                // マスクのアルファだけ残して単色で塗る
+                ctx.globalCompositeOperation = 'source-in';
+                ctx.fillStyle = h;
+                ctx.fillRect(0, 0, w, ht);
+                return new Promise(function (resolve) {
+                    cv.toBlob(function (blob) {
+                        resolve(blob ? URL.createObjectURL(blob) : null);
+                    }, 'image/png');
+                });
+            })
+            .catch(function () {
+                return null;
+            });
+    }
+
     function svgResolvedCacheKey(pinSvgId, scope, symHex) {
         return String(pinSvgId || '') + '\x00' + String(scope || '') + '\x00' + String(symHex || '');
     }
@@ -2508,7 +2612,10 @@
             return;
         }
         if (svgFetchPromiseByKey[ck] === undefined) {
-            svgFetchPromiseByKey[ck] = fetchFirstSvgAsObjectUrlAsync(candidates, svgFetchSessionBust, symHex);
+            // アトラスに載っていればそれを使い、無ければ SVG を取りに行く
+            svgFetchPromiseByKey[ck] = atlasIconObjectUrlAsync(pinSvgId, symHex).then(function (u) {
+                return u || fetchFirstSvgAsObjectUrlAsync(candidates, svgFetchSessionBust, symHex);
+            });
         }
         svgFetchPromiseByKey[ck].then(
             function (u) {
@@ -1,5 +1,9 @@
+import multiprocessing
+
 from src.portal import Portal
 
 if __name__ == "__main__":
+    # タイル生成のプロセスプール用（exe 化時に子プロセスがアプリ本体を起動しないようにする）
+    multiprocessing.freeze_support()
     app = Portal()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+ピンの表示名解決・JSON エクスポートのベンチマーク（合成データ）。
+
+一時フォルダに config.json（カテゴリ・アイテムマスタ）と master_data.csv（ピン N 本）を作り、
+- resolve_pin_for_display: ピンごとに索引を作る（旧来の呼び方）
+- PinDisplayResolver: 索引 1 回 + resolve_many
+- export_pins_to_json 全体（CSV 読込 + 解決 + 書き出し）: indent / compact / 無変更での増分
+の所要時間を表示する。
+
+例:
+  python scripts/bench_pin_export.py
+  python scripts/bench_pin_export.py --pins 10000 --categories 400 --items 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.export_utils import (  # noqa: E402
+    PinDisplayResolver,
+    _load_pins_csv,
+    export_pins_to_json,
+    resolve_pin_for_display,
+)
+from src.pin_record import PIN_CSV_FIELDS  # noqa: E402
+
+
+def make_dataset(game_dir: Path, n_pins: int, n_categories: int, n_items: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    attr_mapping = {
+        f"OBJ_{i}": {"name_jp": f"オブジェクト{i}", "name_en": f"Object {i}", "type": "loot", "attributes": {}}
+        for i in range(20)
+    }
+    category_master = {}
+    item_master = {}
+    for c in range(n_categories):
+        name_jp = f"分類{c}"
+        category_master[name_jp] = {"id": f"cat_{c}", "name_en": f"Category {c}", "type": "loot"}
+        item_master[name_jp] = {
+            f"item_{c}_{i}": {"name_jp": f"アイテム{c}-{i}", "name_en": f"Item {c}-{i}"} for i in range(n_items)
+        }
+    config = {
+        "save_file": "master_data.csv",
+        "attr_mapping": attr_mapping,
+        "category_master": category_master,
+        "item_master": item_master,
+    }
+    with open(game_dir / "config.json", "w", encoding="utf-8") as f:
+        json.dump(config, f, ensure_ascii=False)
+
+    obj_ids = list(attr_mapping)
+    with open(game_dir / "master_data.csv", "w", encoding="utf-8-sig", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=PIN_CSV_FIELDS)
+        w.writeheader()
+        for n in range(n_pins):
+            slots = []
+            for _ in range(rng.randint(1, 4)):
+                c = rng.randrange(n_categories)
+                i = rng.randrange(n_items)
+                slots.append({
+                    "cat_id": f"cat_{c}",
+                    "category": f"分類{c}",
+                    "item_id": f"item_{c}_{i}",
+                    "item_name_jp": "",
+                    "item_name_en": "",
+                    "qty": str(rng.randint(1, 50)),
+                    "attributes": {},
+                })
+            w.writerow({
+                "uid": f"p_{n}",
+                "x": f"{rng.uniform(0, 8192):.3f}",
+                "y": f"{rng.uniform(0, 8192):.3f}",
+                "attribute": rng.choice(obj_ids),
+                "categories": json.dumps(slots, ensure_ascii=False),
+                "obj_attributes": "{}",
+                "updated_at": "2026-01-01T00:00:00",
+            })
+    return config
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark pin display resolution / JSON export on synthetic data.")
+    parser.add_argument("--pins", type=int, default=10000)
+    parser.add_argument("--categories", type=int, default=200)
+    parser.add_argument("--items", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        game_dir = Path(tmp)
+        config = make_dataset(game_dir, args.pins, args.categories, args.items, args.seed)
+        pins = _load_pins_csv(str(game_dir))
+
+        t_legacy = timed(lambda: [resolve_pin_for_display(p, config) for p in pins], args.repeat)
+        t_build = timed(lambda: PinDisplayResolver(config), args.repeat)
+        resolver = PinDisplayResolver(config)
+        t_bulk = timed(lambda: resolver.resolve_many(pins), args.repeat)
+        t_export = timed(lambda: export_pins_to_json(str(game_dir)), args.repeat)
+        t_compact = timed(lambda: export_pins_to_json(str(game_dir), compact=True), args.repeat)
+        export_pins_to_json(str(game_dir), compact=True, incremental=True)
+        t_incr = timed(lambda: export_pins_to_json(str(game_dir), compact=True, incremental=True), args.repeat)
+        size_compact = (game_dir / "pins_export.json").stat().st_size
+        export_pins_to_json(str(game_dir))
+        size_full = (game_dir / "pins_export.json").stat().st_size
+        same = [resolve_pin_for_display(p, config) for p in pins] == resolver.resolve_many(pins)
+
+    print("=== bench_pin_export ===")
+    print(f"pins: {len(pins)}  categories: {args.categories}  items/category: {args.items}")
+    print(f"per-pin index (resolve_pin_for_display): {t_legacy * 1000:9.1f} ms")
+    print(f"PinDisplayResolver build:                {t_build * 1000:9.1f} ms")
+    print(f"PinDisplayResolver.resolve_many:         {t_bulk * 1000:9.1f} ms")
+    print(f"export_pins_to_json (read+resolve+write): {t_export * 1000:8.1f} ms  ({size_full / 1024:.0f} KB)")
+    print(f"export_pins_to_json compact:             {t_compact * 1000:9.1f} ms  ({size_compact / 1024:.0f} KB)")
+    print(f"export_pins_to_json compact incremental: {t_incr * 1000:9.1f} ms  (no changes)")
+    print(f"identical output: {same}")
+
+
+if __name__ == "__main__":
+    main()
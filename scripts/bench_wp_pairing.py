@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+WordPress REST 投稿の日英突き合わせ（wp_rest_guide.build_paired_entries）のベンチマーク（合成データ）。
+
+JA / EN の投稿を N 件ずつ作り、次の 3 通りで突き合わせにかかる時間を表示する。
+- translations: JA 側の translations に EN の ID がある（順引き）
+- reverse: JA 側には translations が無く、EN 側の translations に JA の ID だけがある（逆引き）
+- slug: translations が無い（slug 一致）
+どれも一部の投稿は相手なし（片側だけの行）にする。
+
+例:
+  python scripts/bench_wp_pairing.py
+  python scripts/bench_wp_pairing.py --posts 20000 --repeat 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.wp_rest_guide import build_paired_entries  # noqa: E402
+
+JA_API = "https://guide.example.com/wp-json/wp/v2/posts?lang=ja"
+EN_API = "https://guide.example.com/wp-json/wp/v2/posts?lang=en"
+
+
+def _post(pid: int, slug: str, title: str, link: str, lang: str, translations: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "id": pid,
+        "slug": slug,
+        "link": link,
+        "title": {"rendered": title},
+        "lang": lang,
+        "translations": translations,
+        "modified": "2026-01-01T00:00:00",
+    }
+
+
+def make_posts(n: int, mode: str, unmatched: float, seed: int) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    rng = random.Random(seed)
+    posts_ja: List[Dict[str, Any]] = []
+    posts_en: List[Dict[str, Any]] = []
+    for i in range(n):
+        ja_id = 100000 + i
+        en_id = 200000 + i
+        paired = rng.random() >= unmatched
+        slug = f"guide-{i}"
+        ja_trans: Dict[str, int] = {}
+        en_trans: Dict[str, int] = {}
+        if mode == "translations":
+            ja_trans = {"ja": ja_id, "en": en_id} if paired else {"ja": ja_id}
+            en_trans = {"en": en_id, "ja": ja_id} if paired else {"en": en_id}
+        elif mode == "reverse":
+            en_trans = {"en": en_id, "ja": ja_id} if paired else {"en": en_id}
+        posts_ja.append(
+            _post(ja_id, slug, f"攻略 &amp; 解説 {i}", f"https://guide.example.com/{slug}/", "ja", ja_trans)
+        )
+        en_slug = slug if paired or mode != "slug" else f"{slug}-en"
+        posts_en.append(
+            _post(en_id, en_slug, f"Guide &amp; Walkthrough {i}", f"https://guide.example.com/en/{en_slug}/", "en", en_trans)
+        )
+    rng.shuffle(posts_en)
+    return posts_ja, posts_en
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark JA/EN WordPress post pairing on synthetic data.")
+    parser.add_argument("--posts", type=int, default=10000, help="posts per language")
+    parser.add_argument("--unmatched", type=float, default=0.1, help="fraction of posts without a counterpart")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print("=== bench_wp_pairing ===")
+    print(f"posts/language: {args.posts}  unmatched: {args.unmatched:.0%}")
+    for mode in ("translations", "reverse", "slug"):
+        posts_ja, posts_en = make_posts(args.posts, mode, args.unmatched, args.seed)
+        pair_mode = "slug" if mode == "slug" else "translations"
+
+        def run():
+            return build_paired_entries(
+                posts_ja,
+                posts_en,
+                ja_posts_api_url=JA_API,
+                en_posts_api_url=EN_API,
+                force_pair_mode=pair_mode,
+            )
+
+        t = timed(run, args.repeat)
+        rows = run()
+        both = sum(1 for r in rows if r["url_jp"] and r["url_en"])
+        print(f"{mode:<13} {t * 1000:9.1f} ms  rows: {len(rows)}  paired: {both}")
+
+
+if __name__ == "__main__":
+    main()
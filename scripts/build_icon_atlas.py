@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+共通・ゲーム別の SVG アイコンを一括ラスタ化し、スプライトアトラス（PNG / WebP）と JSON 索引を書き出す。
+
+- 出力: games/<game>/<region>/assets/icon_atlas.{png|webp} と icon_atlas.json
+- エディタは起動時にこのアトラスからアイコンキャッシュを温める（SVG が変わったアイコンだけその場でラスタ化）。
+- サイトの map.js は assets/icon_atlas.json があればアトラスからアイコンを描く（SVG を 1 件ずつ取得しない）。
+  SVG を差し替えたら、このスクリプトを実行してからアトラスも一緒にアップロードすること。
+
+例:
+  python scripts/build_icon_atlas.py "games/StarRupture/Update_1"
+  python scripts/build_icon_atlas.py "games/vein/world map" --format webp --sizes 20,28,34,42,56,68
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src import svg_icon_assets  # noqa: E402
+from src.svg_icon_atlas import DEFAULT_ATLAS_SIZES, build_icon_atlas  # noqa: E402
+from src.svg_raster_cache import raster_cache_dir_for_game  # noqa: E402
+
+
+def parse_sizes(text: str):
+    return [int(s) for s in text.replace(" ", "").split(",") if s]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the SVG marker icon sprite atlas for a game folder.")
+    parser.add_argument("game_path", help="ゲームフォルダ（games/<game>/<region>）")
+    parser.add_argument("--format", choices=("png", "webp"), default="png")
+    parser.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=list(DEFAULT_ATLAS_SIZES),
+        help="一辺 px のカンマ区切り（既定: エディタとサイトで使うサイズ）",
+    )
+    args = parser.parse_args()
+
+    game_path = Path(args.game_path)
+    if not game_path.is_absolute():
+        game_path = (Path.cwd() / game_path).resolve()
+    if not game_path.is_dir():
+        raise SystemExit(f"ゲームフォルダが見つかりません: {game_path}")
+
+    svg_icon_assets.set_raster_cache_dir(raster_cache_dir_for_game(str(game_path)))
+    t0 = time.perf_counter()
+    stats = build_icon_atlas(str(ROOT), str(game_path), sizes=args.sizes, fmt=args.format)
+    print("=== build_icon_atlas ===")
+    print(f"icons: {stats['icons']}  sizes: {stats['sizes']}  atlas: {stats['width']}x{stats['height']}")
+    if stats["failed"]:
+        print(f"failed: {', '.join(stats['failed'])}")
+    print(f"image: {stats['image_path']}")
+    print(f"index: {stats['index_path']}")
+    print(f"elapsed: {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
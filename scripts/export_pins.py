@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+ゲームフォルダのピン（master_data.csv）をサイト用 JSON に書き出す。
+
+- 既定: pins_export.json（indent=2、従来と同じ出力）
+- --compact: 改行・インデント無しの本番用
+- --incremental: pins_export.json.manifest.json を使い、変わったピンだけ解決し直す
+- --sharded: 地図タイルと同じ {z}/{x}/{y} 区画ごとの pins_shards/ と index.json も書き出す
+
+例:
+  python scripts/export_pins.py "games/StarRupture/Update_1" --compact --incremental --sharded
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.export_utils import write_pins_export, write_sharded_pins_export  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export pins of a game folder to JSON for the published map.")
+    parser.add_argument("game_path", help="ゲームフォルダ（games/<game>/<region>）")
+    parser.add_argument("--output", default="pins_export.json", help="出力ファイル名（ゲームフォルダ内）")
+    parser.add_argument("--compact", action="store_true", help="改行・インデント無しで書く")
+    parser.add_argument("--incremental", action="store_true", help="前回のマニフェストから変わったピンだけ解決する")
+    parser.add_argument("--sharded", action="store_true", help="区画ごとのファイル（pins_shards/）も書く")
+    parser.add_argument("--shard-zoom", type=int, default=None, help="区画のズーム（既定: config の pin_shard_zoom か 最大ズーム-3）")
+    args = parser.parse_args()
+
+    game_path = Path(args.game_path)
+    if not game_path.is_absolute():
+        game_path = (Path.cwd() / game_path).resolve()
+    if not game_path.is_dir():
+        raise SystemExit(f"ゲームフォルダが見つかりません: {game_path}")
+
+    t0 = time.perf_counter()
+    stats = write_pins_export(str(game_path), args.output, compact=args.compact, incremental=args.incremental)
+    print("=== export_pins ===")
+    if stats["path"] is None:
+        raise SystemExit("ピンがありません（CSV が無いか、有効な行がありません）。")
+    print(
+        f"{stats['path']}: pins={stats['pins']} resolved={stats['resolved']} reused={stats['reused']}"
+        f" incremental={stats['incremental']}"
+    )
+    if args.sharded:
+        sh = write_sharded_pins_export(str(game_path), shard_zoom=args.shard_zoom)
+        print(f"{sh['path']}: zoom={sh['zoom']} shards={sh['shards']} pins={sh['pins']} removed={sh['removed']}")
+    print(f"elapsed: {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""
+エディタの自動保存（メインスレッドでは凍結コピーを作るだけ、書き込みはワーカースレッド）。
+
+- RowFreezer: data_list / area_list の「保存用の凍結コピー」を copy-on-write で作る。
+  前回の凍結コピーと == で比べ（dict の比較は C 側でネストまで見るので JSON 化より桁違いに速い）、
+  変わった行だけ deepcopy し直す。変わっていない行は前回のコピーをそのまま共有する。
+  凍結コピーは誰も書き換えないので、ワーカーは UI と競合せずに読める。
+- AutosaveWorker: 保存関数を 1 本のワーカースレッドで呼ぶ。未着手の依頼は新しいものに置き換える（最新だけ書けばよい）。
+  結果は take_results() で受け取る（メインスレッドから after で見に行く。ワーカーからは Tk を呼ばないので、
+  close() で書き終わりを待っている間に Tk 呼び出しで固まることがない）。
+"""
+from __future__ import annotations
+
+import copy
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_AUTOSAVE_INTERVAL_SEC = 120
+
+
+class RowFreezer:
+    """行リストの凍結コピーを作る。freeze() はメインスレッドから呼ぶ。"""
+
+    def __init__(self):
+        # id(元の行) -> (元の行, 凍結コピー)。元の行を持っておくので id が使い回されることはない
+        self._frozen: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+    def prime(self, rows: List[Dict[str, Any]], start: int, count: int) -> int:
+        """
+        rows[start:start + count] の凍結コピーを先に作っておく（最初の freeze が全行の deepcopy にならないように、
+        読込直後に少しずつ呼ぶ）。次の start を返す。
+        """
+        end = min(len(rows), start + max(1, count))
+        for r in rows[start:end]:
+            if id(r) not in self._frozen:
+                self._frozen[id(r)] = (r, copy.deepcopy(r))
+        return end
+
+    def freeze(self, rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """(凍結コピーのリスト, コピーし直した行数)。"""
+        prev = self._frozen
+        cur: Dict[int, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        out: List[Dict[str, Any]] = []
+        copied = 0
+        for r in rows:
+            hit = prev.get(id(r))
+            if hit is not None and hit[0] is r and hit[1] == r:
+                frozen = hit[1]
+            else:
+                frozen = copy.deepcopy(r)
+                copied += 1
+            cur[id(r)] = (r, frozen)
+            out.append(frozen)
+        self._frozen = cur
+        return out, copied
+
+
+class AutosaveWorker:
+    """save(job) を呼ぶ専用スレッド。submit は直前の未着手分を置き換える。"""
+
+    def __init__(self, save: Callable[[Any], Any]):
+        self._save = save
+        self._cond = threading.Condition()
+        self._pending: Optional[Any] = None
+        self._results: List[Tuple[Any, Optional[BaseException]]] = []
+        self._busy = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    @property
+    def busy(self) -> bool:
+        with self._cond:
+            return self._busy or self._pending is not None
+
+    def submit(self, job: Any) -> None:
+        with self._cond:
+            if self._closed:
+                return
+            self._pending = job
+            self._cond.notify_all()
+
+    def take_results(self) -> List[Tuple[Any, Optional[BaseException]]]:
+        """書き終えた依頼の (save の戻り値, 例外) を古い順に取り出す。"""
+        with self._cond:
+            out, self._results = self._results, []
+        return out
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """未着手・処理中の依頼が無くなるまで待つ。"""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._busy and self._pending is None, timeout)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """処理中・未着手の依頼を書き終えてから止める。"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending is not None or self._closed)
+                job = self._pending
+                if job is None:
+                    return
+                self._pending = None
+                self._busy = True
+            result, error = None, None
+            try:
+                result = self._save(job)
+            except BaseException as ex:  # ワーカーは止めず、呼び出し側に知らせる
+                error = ex
+            with self._cond:
+                self._busy = False
+                self._results.append((result, error))
+                self._cond.notify_all()
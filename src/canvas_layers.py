@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+エディタ地図キャンバスの保持モード描画（レイヤごとにキャンバスアイテム ID を覚えておく）。
+
+毎フレーム「全部消して全部作る」代わりに、描画コードは従来どおり create_* と同じ引数で
+layer.draw(kind, *coords, **opts) を呼ぶだけにし、前フレームの同じキーのアイテムと比べて
+座標が変わったものは coords、オプションが変わったものは itemconfig、新規だけ create、
+今回描かれなかったものだけ delete する。ピン 1 本のドラッグや選択切り替えはキャンバス操作 1〜2 回で済む。
+
+キーを渡さない draw は「そのレイヤで何番目に描いたか」がキーになる（エリア・オーバーレイ向け）。
+ピンのように増減・並び替えがあるものは行ごとのキーを渡す。
+"""
+from __future__ import annotations
+
+import tkinter as tk
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+class _Item:
+    __slots__ = ("item_id", "kind", "coords", "opts")
+
+    def __init__(self, item_id: int, kind: str, coords: Tuple[float, ...], opts: Dict[str, Any]):
+        self.item_id = item_id
+        self.kind = kind
+        self.coords = coords
+        self.opts = opts
+
+
+def _flatten(coords: Sequence[Any]) -> Tuple[float, ...]:
+    out: List[float] = []
+    for c in coords:
+        if isinstance(c, (tuple, list)):
+            out.extend(float(v) for v in c)
+        else:
+            out.append(float(c))
+    return tuple(out)
+
+
+def _same_opt(a: Any, b: Any) -> bool:
+    # PhotoImage は同一性で比べる（== は定義されていない）
+    return a is b or (type(a) is type(b) and a == b)
+
+
+class CanvasLayer:
+    """1 つのタグ（レイヤ）分のアイテム。begin() → draw()... → end() を 1 フレームとする。"""
+
+    def __init__(self, canvas: tk.Canvas, tag: str):
+        self.canvas = canvas
+        self.tag = tag
+        self._items: Dict[Hashable, _Item] = {}
+        self._order: List[Hashable] = []
+        self._seq = 0
+        self._created_before_kept = False
+        self._created_any = False
+        self._last_created_pos: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def begin(self) -> None:
+        self._order = []
+        self._seq = 0
+        self._created_any = False
+        self._created_before_kept = False
+        self._last_created_pos = None
+
+    def has(self, key: Hashable) -> bool:
+        return key in self._items
+
+    def draw(self, kind: str, *coords: Any, key: Optional[Hashable] = None, **opts: Any) -> int:
+        """canvas.create_<kind>(*coords, **opts) 相当。前フレームと同じなら何もしない。"""
+        if key is None:
+            key = ("#", self._seq)
+            self._seq += 1
+        flat = _flatten(coords)
+        pos = len(self._order)
+        self._order.append(key)
+        prev = self._items.get(key)
+        if prev is not None and prev.kind == kind and set(prev.opts) == set(opts):
+            if prev.coords != flat:
+                self.canvas.coords(prev.item_id, *flat)
+                prev.coords = flat
+            changed = {k: v for k, v in opts.items() if not _same_opt(prev.opts.get(k), v)}
+            if changed:
+                self.canvas.itemconfigure(prev.item_id, **changed)
+                prev.opts = dict(opts)
+            if self._last_created_pos is not None:
+                self._created_before_kept = True
+            return prev.item_id
+        if prev is not None:
+            self.canvas.delete(prev.item_id)
+        creator = getattr(self.canvas, f"create_{kind}")
+        item_id = creator(*flat, tags=(self.tag,), **opts)
+        self._items[key] = _Item(item_id, kind, flat, dict(opts))
+        self._created_any = True
+        self._last_created_pos = pos
+        return item_id
+
+    def end(self) -> bool:
+        """今回描かれなかったアイテムを消す。新規作成があったら True（重なり順の補正が要る）。"""
+        seen = set(self._order)
+        stale = [k for k in self._items if k not in seen]
+        for k in stale:
+            self.canvas.delete(self._items.pop(k).item_id)
+        if self._created_before_kept:
+            # 新しいアイテムが既存アイテムより前の描画順に入ったので、レイヤ内を描画順に積み直す
+            for k in self._order:
+                it = self._items.get(k)
+                if it is not None:
+                    self.canvas.tag_raise(it.item_id)
+        return self._created_any
+
+    def clear(self) -> None:
+        self.canvas.delete(self.tag)
+        self._items.clear()
+        self._order = []
+
+
+class CanvasLayerStack:
+    """下から順に重なる複数レイヤ。フレームの最後に新規作成があったレイヤの重なり順だけ直す。"""
+
+    def __init__(self, canvas: tk.Canvas, tags: Sequence[str]):
+        self.canvas = canvas
+        self.tags = tuple(tags)
+        self._layers = {t: CanvasLayer(canvas, t) for t in self.tags}
+
+    def layer(self, tag: str) -> CanvasLayer:
+        return self._layers[tag]
+
+    def begin_frame(self) -> None:
+        for t in self.tags:
+            self._layers[t].begin()
+
+    def end_frame(self) -> None:
+        created = [self._layers[t].end() for t in self.tags]
+        if any(created):
+            # 新規アイテムはキャンバス最前面に作られるので、上のレイヤを順に持ち上げ直す
+            first = created.index(True)
+            for t in self.tags[first + 1:]:
+                self.canvas.tag_raise(t)
+
+    def clear(self) -> None:
+        for t in self.tags:
+            self._layers[t].clear()
@@ -15,10 +15,42 @@ from PIL import Image, ImageDraw, ImageTk
 
 from .constants import GAMES_ROOT, PROJECT_ROOT
 from . import svg_icon_assets
+from .svg_raster_cache import raster_cache_dir_for_game
+from .svg_icon_atlas import EDITOR_ICON_SIZES, warm_raster_cache_from_atlas
+from .pin_store import PIN_STORE_SQLITE, SqlitePinStore, pin_record_from_blob, pin_store_path, write_pin_csv_atomic
+from .autosave import DEFAULT_AUTOSAVE_INTERVAL_SEC, AutosaveWorker, RowFreezer
+from .save_journal import (
+    DEFAULT_COMPACT_KB as DEFAULT_SAVE_JOURNAL_COMPACT_KB,
+    KIND_AREA,
+    KIND_PIN,
+    SaveJournal,
+    apply_ops,
+    compact_save_journal,
+    new_area_snapshot,
+    new_pin_snapshot,
+    save_journal_path,
+    write_areas_atomic,
+)
 from . import wp_rest_guide
+from .wp_rest_fetch import wp_rest_cache_dir_for_game
+from .guide_link_index import GuideLinkSearchIndex
+from .master_table import VirtualRowTable
+from .wp_guide_sync import cached_guide_rows, guide_sync_index_path, sync_guide_sources
 from .marker_display import normalize_marker_display_style
 from .utils import save_cropped_image_with_annotations
-from .export_utils import resolve_pin_for_display
+from .export_utils import PinDisplayResolver
+from .pin_spatial_index import PinSpatialIndex
+from .tile_prefetch import TilePrefetcher, decode_tile, tile_cache_key
+from .viewport_compose import compose_viewport, normalize_resample
+from .canvas_layers import CanvasLayerStack
+from .image_cache import DEFAULT_BUDGET_MB as DEFAULT_IMAGE_CACHE_BUDGET_MB, ImageCacheManager
+from .pin_style_cache import ResolvedPinStyleCache
+from .pin_display_filter import compile_pin_display_filter
+from .pin_record import (
+    PinRecord,
+    pin_category_slots,
+    pin_object_attributes,
+)
 from . import pin_site_preview
 from . import category_special_notes
 from . import category_special_rules_builder
@@ -31,6 +63,8 @@ BOX_BORDER_COLOR = "#3d5166" # 控えめな縁で立体感
 BOX_PADX, BOX_PADY = 12, 10 # 内側の余白
 
 GUIDE_PAGE_LINKS_DEFAULT_FILE = "guide_page_links.json"
+TILE_PREFETCH_POLL_MS = 30 # 先読みタイルの取り込み間隔（デコード中だけ回す）
+MASTER_ROW_HEIGHT = 36 # 環境設定のマスタ表 1 行の高さ（スロットの間隔）
 GUIDE_LINK_PICK_NONE = "（ページ候補から選ぶ）"
 PARENT_TYPE_DEFAULT = "inside"
 PARENT_TYPE_VALUES = ("inside", "near", "in_area")
@@ -191,52 +225,43 @@ class SettingsWindow(ctk.CTkToplevel):
         _cfg_frame(getattr(self, "_f_head_route", None), "attr")
         _cfg_frame(getattr(self, "_f_head_cat", None), "cat")
         _cfg_frame(getattr(self, "_f_head_item", None), "item")
-        for r in self.attr_rows:
-            try:
-                self._configure_attr_table_columns(r["frame"])
-                self._sync_attr_row_widget_sizes(r)
-            except (tk.TclError, KeyError):
-                pass
-        for r in self.route_attr_rows:
-            try:
-                self._configure_attr_table_columns(r["frame"])
-                self._sync_attr_row_widget_sizes(r)
-            except (tk.TclError, KeyError):
-                pass
-        for r in self.cat_rows:
-            try:
-                self._configure_cat_table_columns(r["frame"])
-                self._sync_cat_row_widget_sizes(r)
-            except (tk.TclError, KeyError):
-                pass
-        for r in self.item_rows:
-            try:
-                self._configure_item_table_columns(r["frame"])
-                self._sync_item_row_widget_sizes(r)
-            except (tk.TclError, KeyError):
-                pass
+        # 行ウィジェットは表示中のスロット分しか無いので、スロットだけ直せばよい
+        for table, kind, sync in (
+            (getattr(self, "table_attr", None), "attr", self._sync_attr_row_widget_sizes),
+            (getattr(self, "table_route", None), "attr", self._sync_attr_row_widget_sizes),
+            (getattr(self, "table_cat", None), "cat", self._sync_cat_row_widget_sizes),
+            (getattr(self, "table_item", None), "item", self._sync_item_row_widget_sizes),
+        ):
+            if table is None:
+                continue
+            for slot in table.slots():
+                try:
+                    _cfg_frame(slot["frame"], kind)
+                    sync(slot)
+                except (tk.TclError, KeyError):
+                    pass
 
-    def _sync_attr_row_widget_sizes(self, r):
+    def _sync_attr_row_widget_sizes(self, slot):
         s = getattr(self, "_master_col_scale", 1.0)
-        r["name_jp"].configure(width=max(72, int(178 * s)))
-        r["name_en"].configure(width=max(72, int(178 * s)))
-        r["type"].configure(width=max(96, int(124 * s)))
-        r["lbl_id"].configure(width=max(72, int(138 * s)))
+        slot["name_jp"].configure(width=max(72, int(178 * s)))
+        slot["name_en"].configure(width=max(72, int(178 * s)))
+        slot["type"].configure(width=max(96, int(124 * s)))
+        slot["lbl_id"].configure(width=max(72, int(138 * s)))
 
-    def _sync_cat_row_widget_sizes(self, r):
+    def _sync_cat_row_widget_sizes(self, slot):
         s = getattr(self, "_master_col_scale", 1.0)
-        r["obj_group"].configure(width=max(88, int(164 * s)))
-        r["name_jp"].configure(width=max(64, int(148 * s)))
-        r["name_en"].configure(width=max(64, int(148 * s)))
-        r["id"].configure(width=max(56, int(118 * s)))
-        r["input_type"].configure(width=max(88, int(104 * s)))
+        slot["obj_group"].configure(width=max(88, int(164 * s)))
+        slot["name_jp"].configure(width=max(64, int(148 * s)))
+        slot["name_en"].configure(width=max(64, int(148 * s)))
+        slot["id"].configure(width=max(56, int(118 * s)))
+        slot["input_type"].configure(width=max(88, int(104 * s)))
 
-    def _sync_item_row_widget_sizes(self, r):
+    def _sync_item_row_widget_sizes(self, slot):
         s = getattr(self, "_master_col_scale", 1.0)
-        r["grp"].configure(width=max(72, int(132 * s)))
-        r["id"].configure(width=max(64, int(128 * s)))
-        r["jp"].configure(width=max(72, int(172 * s)))
-        r["en"].configure(width=max(72, int(172 * s)))
+        slot["grp"].configure(width=max(72, int(132 * s)))
+        slot["id"].configure(width=max(64, int(128 * s)))
+        slot["jp"].configure(width=max(72, int(172 * s)))
+        slot["en"].configure(width=max(72, int(172 * s)))
 
     def setup_attr_tab(self):
         # オブジェクト種類リスト（JSON の type 値／「種類(type)」タブと対応）
@@ -265,8 +290,8 @@ class SettingsWindow(ctk.CTkToplevel):
         ctk.CTkLabel(f_h_pin, text="マーカー", anchor="w", font=("Meiryo", 11, "bold")).pack(side="left")
         ctk.CTkLabel(f_head, text="削除", anchor="w", font=("Meiryo", 10, "bold"), text_color="#888888").grid(row=hr, column=8, sticky="e", padx=4, pady=2)
         self._configure_attr_table_columns(f_head)
-        self.scroll_attr = ctk.CTkScrollableFrame(self.tab_attr, fg_color="#2b2b2b")
-        self.scroll_attr.pack(expand=True, fill="both", padx=5, pady=5)
+        self.table_attr = self._new_attr_table(self.tab_attr, self.attr_rows)
+        self.table_attr.pack(expand=True, fill="both", padx=5, pady=5)
         ctk.CTkLabel(
             self.tab_attr,
             text="マップ上のピンで選ぶ「オブジェクト」です。config の map_object_attr_ids で行数・並びが決まります。",
@@ -300,8 +325,8 @@ class SettingsWindow(ctk.CTkToplevel):
         ctk.CTkLabel(f_h_pin, text="マーカー", anchor="w", font=("Meiryo", 11, "bold")).pack(side="left")
         ctk.CTkLabel(f_head, text="削除", anchor="w", font=("Meiryo", 10, "bold"), text_color="#888888").grid(row=hr, column=8, sticky="e", padx=4, pady=2)
         self._configure_attr_table_columns(f_head)
-        self.scroll_route = ctk.CTkScrollableFrame(self.tab_route, fg_color="#2b2b2b")
-        self.scroll_route.pack(expand=True, fill="both", padx=5, pady=5)
+        self.table_route = self._new_attr_table(self.tab_route, self.route_attr_rows)
+        self.table_route.pack(expand=True, fill="both", padx=5, pady=5)
         ctk.CTkButton(self.tab_route, text="＋ ルート参照行を追加", command=self.add_route_attr_row_empty, fg_color="#e67e22").pack(pady=5)
 
     def setup_cat_tab(self):
@@ -323,8 +348,11 @@ class SettingsWindow(ctk.CTkToplevel):
         ctk.CTkLabel(f_h_pin, text="マーカー", anchor="w", font=("Meiryo", 11, "bold")).pack(side="left")
         ctk.CTkLabel(f_head, text="削除", anchor="w", font=("Meiryo", 10, "bold"), text_color="#888888").grid(row=hr, column=9, sticky="e", padx=4, pady=2)
         self._configure_cat_table_columns(f_head)
-        self.scroll_cat = ctk.CTkScrollableFrame(self.tab_cat, fg_color="#2b2b2b")
-        self.scroll_cat.pack(expand=True, fill="both", padx=5, pady=5)
+        self.table_cat = VirtualRowTable(
+            self.tab_cat, self.cat_rows, self._build_cat_slot, self._bind_cat_slot, self._unbind_master_slot,
+            row_height=MASTER_ROW_HEIGHT,
+        )
+        self.table_cat.pack(expand=True, fill="both", padx=5, pady=5)
         ctk.CTkButton(self.tab_cat, text="＋ カテゴリ行を追加", command=self.add_cat_row_empty, fg_color="#3498db").pack(pady=5)
 
     def setup_item_tab(self):
@@ -350,8 +378,11 @@ class SettingsWindow(ctk.CTkToplevel):
         ctk.CTkLabel(f_head, text="削除", anchor="w", font=("Meiryo", 10, "bold"), text_color="#888888").grid(row=hr, column=7, sticky="e", padx=4, pady=2)
         self._configure_item_table_columns(f_head)
 
-        self.scroll_item = ctk.CTkScrollableFrame(self.tab_item, fg_color="#2b2b2b")
-        self.scroll_item.pack(expand=True, fill="both", padx=5, pady=5)
+        self.table_item = VirtualRowTable(
+            self.tab_item, self.item_rows, self._build_item_slot, self._bind_item_slot, self._unbind_master_slot,
+            row_height=MASTER_ROW_HEIGHT,
+        )
+        self.table_item.pack(expand=True, fill="both", padx=5, pady=5)
         ctk.CTkButton(self.tab_item, text="＋ アイテム行を追加", command=self.add_item_row_empty, fg_color="#3498db").pack(pady=5)
 
     def setup_en_tab(self):
@@ -470,13 +501,10 @@ class SettingsWindow(ctk.CTkToplevel):
         self._suspend_master_combo_refresh = True
         self._category_obj_combo_values_sig = None
         self._item_group_combo_values_sig = None
-        for w in self.scroll_attr.winfo_children():
-            w.destroy()
-        self.attr_rows = []
-        if self._attr_split_mode and getattr(self, "scroll_route", None):
-            for w in self.scroll_route.winfo_children():
-                w.destroy()
-            self.route_attr_rows = []
+        # 表は行リストをそのまま持っているので、リストは差し替えずに中身を空にする
+        for table in self._master_tables():
+            table.clear()
+            table.rows.clear()
 
         try:
             # オブジェクト設定（JP/EN + type + attributes対応）
@@ -520,14 +548,12 @@ class SettingsWindow(ctk.CTkToplevel):
                             v.get("attributes", {}),
                             v.get("use_category_slots", True),
                             k,
-                            scroll_parent=self.scroll_route,
-                            rows_list=self.route_attr_rows,
+                            table=self.table_route,
                         )
                     else:
                         self.add_attr_row(
                             v, k, "loot", {}, True, k,
-                            scroll_parent=self.scroll_route,
-                            rows_list=self.route_attr_rows,
+                            table=self.table_route,
                         )
                 if not self.attr_rows and not self.route_attr_rows:
                     self.add_attr_row("", "", "loot", {}, True, None)
@@ -588,6 +614,8 @@ class SettingsWindow(ctk.CTkToplevel):
             self._item_group_combo_values_sig = None
             self._refresh_category_object_combo_values()
             self._refresh_item_group_combo_values()
+            for table in self._master_tables():
+                table.refresh()
 
     def generate_id_from_en(self, en_name):
         """英語名からIDを自動生成"""
@@ -733,41 +761,46 @@ class SettingsWindow(ctk.CTkToplevel):
         return "モード: icon_only" if ds == "icon_only" else "モード: 標準"
 
     def _refresh_pin_marker_row_preview(self, row_rec, icon_px=20):
+        """行のマーカー表示を、その行を表示中のスロットに反映する（画面外の行は結び付けたときに描く）。"""
+        slot = row_rec.get("_slot")
+        if slot is None:
+            return
         pm = row_rec["pin_marker"]
-        if row_rec.get("lbl_pin_mode") is not None:
-            try:
-                row_rec["lbl_pin_mode"].configure(text=self._pin_marker_mode_label_text(pm))
-            except Exception:
-                pass
-        lbl = row_rec["lbl_pin_preview"]
-        holder = row_rec["_pin_preview_holder"]
-        sid = (pm.get("svg_icon_id") or "").strip()
-        ic = self._hex6_or_default(pm.get("icon_color"), "#ffffff")
-        resolved = svg_icon_assets.resolve_svg_icon(self.project_root, self.game_path, sid) if sid else None
-        if resolved and os.path.isfile(resolved["abs_path"]):
-            pil = svg_icon_assets.svg_or_placeholder_pil_rgba(resolved["abs_path"], icon_px, ic)
-            if pil is not None:
-                cti = ctk.CTkImage(light_image=pil, dark_image=pil, size=(icon_px, icon_px))
-                try:
-                    lbl.configure(image=cti, text="")
-                except tk.TclError:
-                    pass
-                holder.clear()
-                holder.append(cti)
-                try:
-                    row_rec["pin_swatch_icon"].configure(fg_color=pm["icon_color"])
-                    row_rec["pin_swatch_bg"].configure(fg_color=pm["background_color"])
-                except Exception:
-                    pass
-                return
         try:
-            lbl.configure(image=None, text=("…" if sid else "—"))
-        except tk.TclError:
+            slot["lbl_pin_mode"].configure(text=self._pin_marker_mode_label_text(pm))
+        except Exception:
             pass
-        holder.clear()
+        lbl = slot["lbl_pin_preview"]
+        holder = slot["_pin_preview_holder"]
+        sid = (pm.get("svg_icon_id") or "").strip()
+        ic = self._hex6_or_default(pm.get("icon_color"), "#ffffff")
+        # スクロールのたびに作り直さないよう、行ごとに最後の画像を持っておく
+        key = (sid, ic, icon_px)
+        cached = row_rec.get("_pin_preview_img")
+        cti = cached[1] if cached and cached[0] == key else None
+        if cti is None and sid:
+            resolved = svg_icon_assets.resolve_svg_icon(self.project_root, self.game_path, sid)
+            if resolved and os.path.isfile(resolved["abs_path"]):
+                pil = svg_icon_assets.svg_or_placeholder_pil_rgba(resolved["abs_path"], icon_px, ic)
+                if pil is not None:
+                    cti = ctk.CTkImage(light_image=pil, dark_image=pil, size=(icon_px, icon_px))
+                    row_rec["_pin_preview_img"] = (key, cti)
+        if cti is not None:
+            try:
+                lbl.configure(image=cti, text="")
+            except tk.TclError:
+                pass
+            holder.clear()
+            holder.append(cti)
+        else:
+            try:
+                lbl.configure(image=None, text=("…" if sid else "—"))
+            except tk.TclError:
+                pass
+            holder.clear()
         try:
-            row_rec["pin_swatch_icon"].configure(fg_color=pm["icon_color"])
-            row_rec["pin_swatch_bg"].configure(fg_color=pm["background_color"])
+            slot["pin_swatch_icon"].configure(fg_color=pm["icon_color"])
+            slot["pin_swatch_bg"].configure(fg_color=pm["background_color"])
         except Exception:
             pass
 
@@ -1122,41 +1155,90 @@ class SettingsWindow(ctk.CTkToplevel):
             select_no_icon()
         refresh_dialog_preview()
 
+    def _master_tables(self):
+        tables = [self.table_attr]
+        if getattr(self, "table_route", None) is not None:
+            tables.append(self.table_route)
+        tables.extend([self.table_cat, self.table_item])
+        return tables
+
+    def _master_table_for_rows(self, rows_list):
+        for table in self._master_tables():
+            if table.rows is rows_list:
+                return table
+        return None
+
+    def _refresh_master_table_for_rows(self, rows_list):
+        if getattr(self, "_suspend_master_combo_refresh", False):
+            return
+        table = self._master_table_for_rows(rows_list)
+        if table is not None:
+            table.refresh()
+
+    def _with_slot_row(self, slot, fn):
+        """スロットに今結び付いている行モデルで fn を呼ぶ（未使用のスロットなら何もしない）。"""
+        row = slot.get("row")
+        if row is not None:
+            fn(row)
+
+    def _unbind_master_slot(self, slot, row):
+        if row.get("_slot") is slot:
+            row["_slot"] = None
+
+    def _refresh_row_attr_button(self, row_rec):
+        slot = row_rec.get("_slot")
+        if slot is None:
+            return
+        try:
+            slot["btn_attr"].configure(text=row_rec["_attr_btn_fmt"].format(len(row_rec["attr_var"]["data"] or {})))
+        except tk.TclError:
+            pass
+
+    def _build_pin_marker_cells(self, parent, slot, column, title):
+        f_pin = ctk.CTkFrame(parent, fg_color="transparent")
+        f_pin.grid(row=0, column=column, sticky="w", padx=4, pady=2)
+        slot["lbl_pin_preview"] = ctk.CTkLabel(
+            f_pin, text="—", width=22, height=22, fg_color="transparent", corner_radius=0, text_color="#bdc3c7"
+        )
+        slot["lbl_pin_preview"].pack(side="left", padx=1)
+        slot["pin_swatch_icon"] = ctk.CTkFrame(f_pin, width=12, height=12, corner_radius=2, fg_color="#ffffff")
+        slot["pin_swatch_icon"].pack(side="left", padx=2)
+        slot["pin_swatch_bg"] = ctk.CTkFrame(f_pin, width=12, height=12, corner_radius=2, fg_color="#95a5a6")
+        slot["pin_swatch_bg"].pack(side="left", padx=2)
+        slot["lbl_pin_mode"] = ctk.CTkLabel(f_pin, text="", font=("Meiryo", 9), text_color="#95a5a6")
+        slot["lbl_pin_mode"].pack(side="left", padx=(4, 2))
+        slot["_pin_preview_holder"] = []
+        ctk.CTkButton(
+            f_pin, text="マーカー", width=68, height=26, fg_color="#2980b9",
+            command=lambda: self._with_slot_row(slot, lambda r: self._open_pin_marker_dialog(r, title)),
+        ).pack(side="left", padx=4)
+
     def add_attr_row_empty(self):
         self.add_attr_row("", "", "loot", {}, True, None)
-        self.after(10, lambda: self.scroll_attr._parent_canvas.yview_moveto(1.0))
+        self.after(10, self.table_attr.scroll_to_end)
 
     def add_route_attr_row_empty(self):
         self.add_attr_row(
             "", "", "loot", {}, True, None,
-            scroll_parent=self.scroll_route,
-            rows_list=self.route_attr_rows,
+            table=self.table_route,
         )
-        self.after(10, lambda: self.scroll_route._parent_canvas.yview_moveto(1.0))
+        self.after(10, self.table_route.scroll_to_end)
 
-    def _repack_rows_in_list(self, rows_list):
-        if not rows_list:
-            return
-        for r in rows_list:
-            try:
-                r["frame"].pack_forget()
-            except tk.TclError:
-                pass
-        for r in rows_list:
-            r["frame"].pack(fill="x", pady=2)
-
-    def _move_master_row(self, frame, rows_list, delta):
+    def _move_master_row(self, row_rec, rows_list, delta):
         try:
-            idx = next(i for i, r in enumerate(rows_list) if r["frame"] == frame)
+            idx = next(i for i, r in enumerate(rows_list) if r is row_rec)
         except StopIteration:
             return
         j = idx + delta
         if j < 0 or j >= len(rows_list):
             return
         rows_list[idx], rows_list[j] = rows_list[j], rows_list[idx]
-        self._repack_rows_in_list(rows_list)
+        table = self._master_table_for_rows(rows_list)
+        if table is not None:
+            table.refresh()
+            table.see(j)
 
-    def _place_master_row_reorder_grid(self, parent, rows_list, row=0, col=0):
+    def _place_master_row_reorder_grid(self, parent, slot, rows_list, row=0, col=0):
         f_ctl = ctk.CTkFrame(parent, fg_color="transparent")
         f_ctl.grid(row=row, column=col, sticky="nw", padx=(0, 2), pady=2)
         lbl = ctk.CTkLabel(
@@ -1168,14 +1250,14 @@ class SettingsWindow(ctk.CTkToplevel):
             text_color="#95a5a6",
         )
         lbl.pack(side="left", padx=(0, 2))
-        lbl.bind("<Button-1>", lambda e, rl=rows_list, fr=parent: self._master_row_drag_start(e, rl, fr))
+        lbl.bind("<Button-1>", lambda e, rl=rows_list: self._with_slot_row(slot, lambda r: self._master_row_drag_start(e, rl, r)))
         ctk.CTkButton(
             f_ctl,
             text="▲",
             width=24,
             height=24,
             fg_color="#34495e",
-            command=lambda fr=parent, rl=rows_list: self._move_master_row(fr, rl, -1),
+            command=lambda rl=rows_list: self._with_slot_row(slot, lambda r: self._move_master_row(r, rl, -1)),
         ).pack(side="left", padx=1)
         ctk.CTkButton(
             f_ctl,
@@ -1183,14 +1265,14 @@ class SettingsWindow(ctk.CTkToplevel):
             width=24,
             height=24,
             fg_color="#34495e",
-            command=lambda fr=parent, rl=rows_list: self._move_master_row(fr, rl, 1),
+            command=lambda rl=rows_list: self._with_slot_row(slot, lambda r: self._move_master_row(r, rl, 1)),
         ).pack(side="left", padx=1)
 
-    def _master_row_drag_start(self, event, rows_list, frame):
+    def _master_row_drag_start(self, event, rows_list, row_rec):
         if self._master_row_drag is not None:
             return
         try:
-            idx = next(i for i, r in enumerate(rows_list) if r["frame"] == frame)
+            idx = next(i for i, r in enumerate(rows_list) if r is row_rec)
         except StopIteration:
             return
         self._master_row_drag = {"rows": rows_list, "from_idx": idx}
@@ -1221,54 +1303,41 @@ class SettingsWindow(ctk.CTkToplevel):
             return
         rows_list = st["rows"]
         from_idx = st["from_idx"]
-        if not rows_list or from_idx < 0 or from_idx >= len(rows_list):
+        table = self._master_table_for_rows(rows_list)
+        if table is None or not rows_list or from_idx < 0 or from_idx >= len(rows_list):
             return
-        cy = event.y_root
-        new_idx = len(rows_list) - 1
-        for j, r in enumerate(rows_list):
-            fw = r["frame"]
-            try:
-                top = fw.winfo_rooty()
-                h = max(fw.winfo_height(), 1)
-            except tk.TclError:
-                self._repack_rows_in_list(rows_list)
-                return
-            if cy < top + h // 2:
-                new_idx = j
-                break
+        new_idx = table.index_at_y_root(event.y_root)
         if new_idx == from_idx:
-            self._repack_rows_in_list(rows_list)
             return
         row = rows_list.pop(from_idx)
         if new_idx > from_idx:
             new_idx -= 1
         rows_list.insert(new_idx, row)
-        self._repack_rows_in_list(rows_list)
+        table.refresh()
+
+    def _new_attr_table(self, parent, rows_list):
+        table = VirtualRowTable(
+            parent, rows_list,
+            lambda holder: self._build_attr_slot(holder, rows_list),
+            self._bind_attr_slot,
+            self._unbind_master_slot,
+            row_height=MASTER_ROW_HEIGHT,
+        )
+        return table
 
-    def add_attr_row(self, name_jp, name_en, obj_type="loot", attributes=None, use_category_slots=True, obj_key=None,
-                     scroll_parent=None, rows_list=None):
-        if attributes is None:
-            attributes = {}
-        type_stored = obj_type if obj_type in self.object_types else "loot"
-        scroll_parent = scroll_parent or self.scroll_attr
-        rows_list = rows_list or self.attr_rows
-        
-        f = ctk.CTkFrame(scroll_parent, fg_color="transparent")
-        f.pack(fill="x", pady=2)
+    def _build_attr_slot(self, f, rows_list):
+        slot = {}
         rw = 0
-        self._place_master_row_reorder_grid(f, rows_list, rw, 0)
+        self._place_master_row_reorder_grid(f, slot, rows_list, rw, 0)
         s = getattr(self, "_master_col_scale", 1.0)
-        e_name_jp = ctk.CTkEntry(f, width=max(72, int(178 * s)))
-        e_name_jp.insert(0, name_jp)
-        e_name_jp.grid(row=rw, column=1, sticky="ew", padx=4, pady=2)
-        e_name_en = ctk.CTkEntry(f, width=max(72, int(178 * s)))
-        e_name_en.insert(0, name_en)
-        e_name_en.grid(row=rw, column=2, sticky="ew", padx=4, pady=2)
+        slot["name_jp"] = ctk.CTkEntry(f, width=max(72, int(178 * s)))
+        slot["name_jp"].grid(row=rw, column=1, sticky="ew", padx=4, pady=2)
+        slot["name_en"] = ctk.CTkEntry(f, width=max(72, int(178 * s)))
+        slot["name_en"].grid(row=rw, column=2, sticky="ew", padx=4, pady=2)
 
         # 種類(type): 表示のみ（グレーアウト・操作不可）
         type_display_list = [self.object_type_names.get(t, t) for t in self.object_types]
         cmb_type = ctk.CTkComboBox(f, values=type_display_list, width=max(96, int(124 * s)))
-        cmb_type.set(self.object_type_names.get(type_stored, self.object_type_names["loot"]))
         cmb_type.grid(row=rw, column=3, sticky="w", padx=4, pady=2)
         try:
             cmb_type.configure(
@@ -1280,76 +1349,77 @@ class SettingsWindow(ctk.CTkToplevel):
             )
         except Exception:
             cmb_type.configure(state="disabled")
+        slot["type"] = cmb_type
 
-        use_slots_var = tk.BooleanVar(value=bool(use_category_slots))
-        chk_sub = ctk.CTkCheckBox(f, text="", variable=use_slots_var, width=36, checkbox_width=18, checkbox_height=18)
-        chk_sub.grid(row=rw, column=4, sticky="w", padx=4, pady=2)
+        slot["chk_sub"] = ctk.CTkCheckBox(f, text="", width=36, checkbox_width=18, checkbox_height=18)
+        slot["chk_sub"].grid(row=rw, column=4, sticky="w", padx=4, pady=2)
 
         # 属性項目ボタン
-        attr_var = {"data": attributes if attributes else {}}
-        btn_attr = ctk.CTkButton(f, text=f"属性({len(attr_var['data'])})", width=80, fg_color="#8e44ad",
-                                 command=lambda: self.edit_obj_attributes(attr_var, btn_attr))
-        btn_attr.grid(row=rw, column=5, sticky="w", padx=4, pady=2)
+        slot["btn_attr"] = ctk.CTkButton(
+            f, text="属性(0)", width=80, fg_color="#8e44ad",
+            command=lambda: self._with_slot_row(slot, lambda r: self.edit_obj_attributes(r["attr_var"], r)),
+        )
+        slot["btn_attr"].grid(row=rw, column=5, sticky="w", padx=4, pady=2)
 
         # 自動生成ID（読み取り専用）— 保存済みキーがあればそれを表示
-        id_preview = (obj_key or "").strip() or self.generate_id_from_en(name_en)
-        lbl_id = ctk.CTkLabel(f, text=id_preview, width=max(72, int(138 * s)), text_color="#888888", anchor="w")
-        lbl_id.grid(row=rw, column=6, sticky="ew", padx=4, pady=2)
-        
-        def on_en_change(*args):
-            if not (obj_key or "").strip():
-                lbl_id.configure(text=self.generate_id_from_en(e_name_en.get()))
-            self._schedule_category_object_combo_refresh()
-        e_name_en.bind("<KeyRelease>", on_en_change)
-        e_name_jp.bind("<KeyRelease>", lambda e: self._schedule_category_object_combo_refresh())
-
-        pin_marker = self._load_pin_marker_for_key((obj_key or "").strip())
-        f_pin = ctk.CTkFrame(f, fg_color="transparent")
-        f_pin.grid(row=rw, column=7, sticky="w", padx=4, pady=2)
-        lbl_pin_preview = ctk.CTkLabel(
-            f_pin, text="—", width=22, height=22, fg_color="transparent", corner_radius=0, text_color="#bdc3c7"
-        )
-        lbl_pin_preview.pack(side="left", padx=1)
-        pin_swatch_icon = ctk.CTkFrame(f_pin, width=12, height=12, corner_radius=2, fg_color=pin_marker["icon_color"])
-        pin_swatch_icon.pack(side="left", padx=2)
-        pin_swatch_bg = ctk.CTkFrame(f_pin, width=12, height=12, corner_radius=2, fg_color=pin_marker["background_color"])
-        pin_swatch_bg.pack(side="left", padx=2)
-        lbl_pin_mode = ctk.CTkLabel(
-            f_pin, text=self._pin_marker_mode_label_text(pin_marker), font=("Meiryo", 9), text_color="#95a5a6"
-        )
-        lbl_pin_mode.pack(side="left", padx=(4, 2))
+        slot["lbl_id"] = ctk.CTkLabel(f, text="", width=max(72, int(138 * s)), text_color="#888888", anchor="w")
+        slot["lbl_id"].grid(row=rw, column=6, sticky="ew", padx=4, pady=2)
+
+        slot["name_en"].bind("<KeyRelease>", lambda e: self._with_slot_row(slot, self._on_attr_row_name_en_changed))
+        slot["name_jp"].bind("<KeyRelease>", lambda e: self._schedule_category_object_combo_refresh())
+
+        self._build_pin_marker_cells(f, slot, 7, "マーカー（オブジェクト / pin_marker_by_attribute）")
+        ctk.CTkButton(
+            f, text="🗑️", width=30, fg_color="#c0392b",
+            command=lambda: self._with_slot_row(slot, lambda r: self.delete_row(r, rows_list)),
+        ).grid(row=rw, column=8, sticky="e", padx=4, pady=2)
+        self._configure_attr_table_columns(f)
+        return slot
+
+    def _bind_attr_slot(self, slot, row_rec):
+        row_rec["_slot"] = slot
+        slot["name_jp"].configure(textvariable=row_rec["name_jp"])
+        slot["name_en"].configure(textvariable=row_rec["name_en"])
+        cmb_type = slot["type"]
+        cmb_type.configure(state="normal")
+        cmb_type.set(self.object_type_names.get(row_rec["type_stored"], self.object_type_names["loot"]))
+        cmb_type.configure(state="disabled")
+        slot["chk_sub"].configure(variable=row_rec["use_slots_var"])
+        slot["lbl_id"].configure(text=row_rec["id_preview"])
+        self._refresh_row_attr_button(row_rec)
+        self._refresh_pin_marker_row_preview(row_rec)
+
+    def _on_attr_row_name_en_changed(self, row_rec):
+        if not (row_rec.get("obj_key") or "").strip():
+            row_rec["id_preview"] = self.generate_id_from_en(row_rec["name_en"].get())
+            slot = row_rec.get("_slot")
+            if slot is not None:
+                slot["lbl_id"].configure(text=row_rec["id_preview"])
+        self._schedule_category_object_combo_refresh()
+
+    def add_attr_row(self, name_jp, name_en, obj_type="loot", attributes=None, use_category_slots=True, obj_key=None,
+                     table=None):
+        if attributes is None:
+            attributes = {}
+        type_stored = obj_type if obj_type in self.object_types else "loot"
+        table = table or self.table_attr
+        rows_list = table.rows
         row_rec = {
-            "frame": f,
-            "name_jp": e_name_jp,
-            "name_en": e_name_en,
-            "type": cmb_type,
+            "name_jp": tk.StringVar(self, value=name_jp),
+            "name_en": tk.StringVar(self, value=name_en),
             "type_stored": type_stored,
-            "use_slots_var": use_slots_var,
+            "use_slots_var": tk.BooleanVar(self, value=bool(use_category_slots)),
             "obj_key": obj_key,
-            "lbl_id": lbl_id,
-            "attr_var": attr_var,
-            "pin_marker": pin_marker,
-            "lbl_pin_preview": lbl_pin_preview,
-            "pin_swatch_icon": pin_swatch_icon,
-            "pin_swatch_bg": pin_swatch_bg,
-            "lbl_pin_mode": lbl_pin_mode,
-            "_pin_preview_holder": [],
+            "id_preview": (obj_key or "").strip() or self.generate_id_from_en(name_en),
+            "attr_var": {"data": attributes if attributes else {}},
+            "_attr_btn_fmt": "属性({})",
+            "pin_marker": self._load_pin_marker_for_key((obj_key or "").strip()),
+            "_slot": None,
         }
-        ctk.CTkButton(
-            f_pin, text="マーカー", width=68, height=26, fg_color="#2980b9",
-            command=lambda rr=row_rec: self._open_pin_marker_dialog(
-                rr, "マーカー（オブジェクト / pin_marker_by_attribute）",
-            ),
-        ).pack(side="left", padx=4)
-
-        ctk.CTkButton(f, text="🗑️", width=30, fg_color="#c0392b", command=lambda: self.delete_row(f, rows_list)).grid(
-            row=rw, column=8, sticky="e", padx=4, pady=2
-        )
-        self._configure_attr_table_columns(f)
         rows_list.append(row_rec)
-        self._refresh_pin_marker_row_preview(row_rec)
+        self._refresh_master_table_for_rows(rows_list)
 
-    def edit_obj_attributes(self, attr_var, btn):
+    def edit_obj_attributes(self, attr_var, row_rec):
         """オブジェクトの属性項目を編集するウィンドウ"""
         win = ctk.CTkToplevel(self)
         win.title("オブジェクト属性項目の編集")
@@ -1472,14 +1542,14 @@ class SettingsWindow(ctk.CTkToplevel):
                             new_attrs[k] = {"type": "select", "options": options, "options_en": options_en, "affix_position": pos}
                 except: pass
             attr_var["data"] = new_attrs
-            btn.configure(text=f"属性({len(new_attrs)})")
+            self._refresh_row_attr_button(row_rec)
             win.destroy()
         
         ctk.CTkButton(btn_frame, text="✔ 完了", command=apply, fg_color="#27ae60").pack(side="right", padx=10)
 
     def add_cat_row_empty(self):
         self.add_cat_row("", "", "", "item_select", True, "", {})
-        self.after(10, lambda: self.scroll_cat._parent_canvas.yview_moveto(1.0))
+        self.after(10, self.table_cat.scroll_to_end)
 
     def _master_object_options(self):
         rows = list(self.attr_rows)
@@ -1541,22 +1611,28 @@ class SettingsWindow(ctk.CTkToplevel):
         if getattr(self, "_category_obj_combo_values_sig", None) == sig:
             return
         self._category_obj_combo_values_sig = sig
+        label_set = set(labels)
+        first_label_for_id = {}
+        for lb, oid in l2i.items():
+            first_label_for_id.setdefault(oid, lb)
         for r in self.cat_rows:
-            cmb = r.get("obj_group")
-            if not cmb:
+            var = r.get("obj_group")
+            if var is None:
                 continue
             prev_map = r.get("_obj_label_to_id") or {}
-            cur_lab = (cmb.get() or "").strip()
+            cur_lab = (var.get() or "").strip()
             cur_oid = prev_map.get(cur_lab, "")
-            cmb.configure(values=labels)
-            r["_obj_label_to_id"] = dict(l2i)
+            r["_obj_label_to_id"] = l2i
             if cur_oid:
-                pick = next((lb for lb, oid in l2i.items() if oid == cur_oid), "(なし)")
-                cmb.set(pick)
-            elif cur_lab in labels:
-                cmb.set(cur_lab)
+                var.set(first_label_for_id.get(cur_oid, "(なし)"))
+            elif cur_lab in label_set:
+                var.set(cur_lab)
             else:
-                cmb.set("(なし)")
+                var.set("(なし)")
+        table = getattr(self, "table_cat", None)
+        for slot in (table.slots() if table is not None else []):
+            if slot.get("row") is not None:
+                slot["obj_group"].configure(values=labels)
 
     def _schedule_category_object_combo_refresh(self, delay_ms=90):
         tid = getattr(self, "_category_obj_combo_after", None)
@@ -1571,117 +1647,104 @@ class SettingsWindow(ctk.CTkToplevel):
         self._category_obj_combo_after = None
         self._refresh_category_object_combo_values()
 
-    def add_cat_row(self, name_jp, name_en, object_attr_id="", input_type="item_select", show_qty=True, cat_id="", attrs=None):
-        if attrs is None:
-            attrs = {}
-        f = ctk.CTkFrame(self.scroll_cat, fg_color="transparent")
-        f.pack(fill="x", pady=2)
+    def _follow_en_to_auto_id(self, row_rec, en_key):
+        """ID が空、または直前の自動生成値のままなら EN 変更に追従させる（手入力 ID を検知したら追従を止める）。"""
+        cur_id = (row_rec["id"].get() or "").strip()
+        auto_now = self.generate_id_from_en(row_rec[en_key].get().strip())
+        last_auto = row_rec.get("_last_auto_id") or ""
+        can_follow = (cur_id == "") or (last_auto and cur_id == last_auto)
+        if can_follow:
+            row_rec["id"].set(auto_now or "")
+            row_rec["_last_auto_id"] = auto_now
+        elif cur_id:
+            row_rec["_last_auto_id"] = ""
+
+    _CAT_INPUT_TYPE_OPTIONS = ("item_select", "qty_only")
+    _CAT_INPUT_TYPE_NAMES = {"item_select": "アイテム選択", "qty_only": "数量のみ"}
+
+    def _build_cat_slot(self, f):
+        slot = {}
         rw = 0
-        self._place_master_row_reorder_grid(f, self.cat_rows, rw, 0)
+        self._place_master_row_reorder_grid(f, slot, self.cat_rows, rw, 0)
         s = getattr(self, "_master_col_scale", 1.0)
-        obj_labels, obj_l2i = self._master_object_options()
-        cmb_obj = ctk.CTkComboBox(f, values=obj_labels, width=max(88, int(164 * s)))
-        sel_lab = next((lb for lb, oid in obj_l2i.items() if oid == (object_attr_id or "").strip()), "(なし)")
-        cmb_obj.set(sel_lab if sel_lab in obj_labels else "(なし)")
-        cmb_obj.grid(row=rw, column=1, sticky="w", padx=4, pady=2)
-        e_name_jp = ctk.CTkEntry(f, width=max(64, int(148 * s)))
-        e_name_jp.insert(0, name_jp)
-        e_name_jp.grid(row=rw, column=2, sticky="ew", padx=4, pady=2)
-        e_name_en = ctk.CTkEntry(f, width=max(64, int(148 * s)))
-        e_name_en.insert(0, name_en)
-        e_name_en.grid(row=rw, column=3, sticky="ew", padx=4, pady=2)
-        e_id = ctk.CTkEntry(f, width=max(56, int(118 * s)), placeholder_text="ID")
-        e_id.insert(0, cat_id)
-        e_id.grid(row=rw, column=4, sticky="ew", padx=4, pady=2)
-        last_auto_id = {"value": ""}
-
-        def on_en_change(_e=None):
-            cur_id = (e_id.get() or "").strip()
-            auto_now = self.generate_id_from_en(e_name_en.get().strip())
-            # IDが空、または直前の自動生成値のままなら EN 変更に追従させる。
-            can_follow = (cur_id == "") or (last_auto_id["value"] and cur_id == last_auto_id["value"])
-            if can_follow:
-                e_id.delete(0, "end")
-                if auto_now:
-                    e_id.insert(0, auto_now)
-                last_auto_id["value"] = auto_now
-            elif cur_id:
-                # 手入力IDを検知したら自動追従を止める。
-                last_auto_id["value"] = ""
-
-        if not (cat_id or "").strip():
-            on_en_change()
-        e_name_en.bind("<KeyRelease>", on_en_change)
-        input_type_options = ["item_select", "qty_only"]
-        input_type_names = {"item_select": "アイテム選択", "qty_only": "数量のみ"}
-        cmb_input = ctk.CTkComboBox(f, values=[input_type_names[t] for t in input_type_options], width=max(88, int(104 * s)))
-        cmb_input.set(input_type_names.get(input_type, "アイテム選択"))
-        cmb_input.grid(row=rw, column=5, sticky="w", padx=4, pady=2)
-        show_qty_var = tk.BooleanVar(value=show_qty)
-        chk_qty = ctk.CTkCheckBox(f, text="", variable=show_qty_var, width=30)
-        chk_qty.grid(row=rw, column=6, sticky="w", padx=4, pady=2)
-        attr_var = {"data": dict(attrs) if isinstance(attrs, dict) else {}}
-        btn_attr = ctk.CTkButton(
+        slot["obj_group"] = ctk.CTkComboBox(f, values=["(なし)"], width=max(88, int(164 * s)))
+        slot["obj_group"].grid(row=rw, column=1, sticky="w", padx=4, pady=2)
+        slot["name_jp"] = ctk.CTkEntry(f, width=max(64, int(148 * s)))
+        slot["name_jp"].grid(row=rw, column=2, sticky="ew", padx=4, pady=2)
+        slot["name_en"] = ctk.CTkEntry(f, width=max(64, int(148 * s)))
+        slot["name_en"].grid(row=rw, column=3, sticky="ew", padx=4, pady=2)
+        slot["id"] = ctk.CTkEntry(f, width=max(56, int(118 * s)))
+        slot["id"].grid(row=rw, column=4, sticky="ew", padx=4, pady=2)
+        slot["name_en"].bind(
+            "<KeyRelease>", lambda e: self._with_slot_row(slot, lambda r: self._follow_en_to_auto_id(r, "name_en"))
+        )
+        slot["name_jp"].bind("<KeyRelease>", lambda e: self._schedule_item_group_combo_refresh())
+        slot["id"].bind("<KeyRelease>", lambda e: self._schedule_item_group_combo_refresh())
+        slot["input_type"] = ctk.CTkComboBox(
             f,
-            text=f"属性 ({len(attr_var['data'])})",
+            values=[self._CAT_INPUT_TYPE_NAMES[t] for t in self._CAT_INPUT_TYPE_OPTIONS],
+            width=max(88, int(104 * s)),
+        )
+        slot["input_type"].grid(row=rw, column=5, sticky="w", padx=4, pady=2)
+        slot["chk_qty"] = ctk.CTkCheckBox(f, text="", width=30)
+        slot["chk_qty"].grid(row=rw, column=6, sticky="w", padx=4, pady=2)
+        slot["btn_attr"] = ctk.CTkButton(
+            f,
+            text="属性 (0)",
             width=88,
             fg_color="#8e44ad",
-            command=lambda: self.edit_obj_attributes(attr_var, btn_attr),
-        )
-        btn_attr.grid(row=rw, column=7, sticky="w", padx=4, pady=2)
-        eff_cid = (cat_id or "").strip()
-        pin_marker = self._load_pin_marker_for_category_id(eff_cid)
-        f_pin = ctk.CTkFrame(f, fg_color="transparent")
-        f_pin.grid(row=rw, column=8, sticky="w", padx=4, pady=2)
-        lbl_pin_preview = ctk.CTkLabel(
-            f_pin, text="—", width=22, height=22, fg_color="transparent", corner_radius=0, text_color="#bdc3c7"
+            command=lambda: self._with_slot_row(slot, lambda r: self.edit_obj_attributes(r["attr_var"], r)),
         )
-        lbl_pin_preview.pack(side="left", padx=1)
-        pin_swatch_icon = ctk.CTkFrame(f_pin, width=12, height=12, corner_radius=2, fg_color=pin_marker["icon_color"])
-        pin_swatch_icon.pack(side="left", padx=2)
-        pin_swatch_bg = ctk.CTkFrame(f_pin, width=12, height=12, corner_radius=2, fg_color=pin_marker["background_color"])
-        pin_swatch_bg.pack(side="left", padx=2)
-        lbl_pin_mode = ctk.CTkLabel(
-            f_pin, text=self._pin_marker_mode_label_text(pin_marker), font=("Meiryo", 9), text_color="#95a5a6"
-        )
-        lbl_pin_mode.pack(side="left", padx=(4, 2))
+        slot["btn_attr"].grid(row=rw, column=7, sticky="w", padx=4, pady=2)
+        self._build_pin_marker_cells(f, slot, 8, "マーカー（カテゴリ / pin_marker_by_category_id）")
+        ctk.CTkButton(
+            f, text="🗑️", width=30, fg_color="#c0392b",
+            command=lambda: self._with_slot_row(slot, lambda r: self.delete_row(r, self.cat_rows)),
+        ).grid(row=rw, column=9, sticky="e", padx=4, pady=2)
+        self._configure_cat_table_columns(f)
+        return slot
+
+    def _bind_cat_slot(self, slot, row_rec):
+        row_rec["_slot"] = slot
+        labels = list(getattr(self, "_category_obj_combo_values_sig", None) or self._master_object_options()[0])
+        slot["obj_group"].configure(values=labels, variable=row_rec["obj_group"])
+        slot["name_jp"].configure(textvariable=row_rec["name_jp"])
+        slot["name_en"].configure(textvariable=row_rec["name_en"])
+        slot["id"].configure(textvariable=row_rec["id"])
+        slot["input_type"].configure(variable=row_rec["input_type"])
+        slot["chk_qty"].configure(variable=row_rec["show_qty"])
+        self._refresh_row_attr_button(row_rec)
+        self._refresh_pin_marker_row_preview(row_rec)
+
+    def add_cat_row(self, name_jp, name_en, object_attr_id="", input_type="item_select", show_qty=True, cat_id="", attrs=None):
+        if attrs is None:
+            attrs = {}
+        obj_labels, obj_l2i = self._master_object_options()
+        sel_lab = next((lb for lb, oid in obj_l2i.items() if oid == (object_attr_id or "").strip()), "(なし)")
         row_rec = {
-            "frame": f,
-            "name_jp": e_name_jp,
-            "name_en": e_name_en,
-            "id": e_id,
-            "obj_group": cmb_obj,
-            "input_type": cmb_input,
-            "show_qty": show_qty_var,
-            "pin_marker": pin_marker,
-            "lbl_pin_preview": lbl_pin_preview,
-            "pin_swatch_icon": pin_swatch_icon,
-            "pin_swatch_bg": pin_swatch_bg,
-            "lbl_pin_mode": lbl_pin_mode,
+            "name_jp": tk.StringVar(self, value=name_jp),
+            "name_en": tk.StringVar(self, value=name_en),
+            "id": tk.StringVar(self, value=cat_id),
+            "obj_group": tk.StringVar(self, value=sel_lab if sel_lab in obj_labels else "(なし)"),
+            "input_type": tk.StringVar(self, value=self._CAT_INPUT_TYPE_NAMES.get(input_type, "アイテム選択")),
+            "show_qty": tk.BooleanVar(self, value=show_qty),
+            "pin_marker": self._load_pin_marker_for_category_id((cat_id or "").strip()),
             "_obj_label_to_id": obj_l2i,
-            "attr_var": attr_var,
-            "_pin_preview_holder": [],
+            "attr_var": {"data": dict(attrs) if isinstance(attrs, dict) else {}},
+            "_attr_btn_fmt": "属性 ({})",
+            "_last_auto_id": "",
+            "_slot": None,
         }
-        ctk.CTkButton(
-            f_pin, text="マーカー", width=68, height=26, fg_color="#2980b9",
-            command=lambda rr=row_rec: self._open_pin_marker_dialog(
-                rr, "マーカー（カテゴリ / pin_marker_by_category_id）",
-            ),
-        ).pack(side="left", padx=4)
-        ctk.CTkButton(f, text="🗑️", width=30, fg_color="#c0392b", command=lambda: self.delete_row(f, self.cat_rows)).grid(
-            row=rw, column=9, sticky="e", padx=4, pady=2
-        )
-        self._configure_cat_table_columns(f)
+        if not (cat_id or "").strip():
+            self._follow_en_to_auto_id(row_rec, "name_en")
         self.cat_rows.append(row_rec)
-        self._refresh_pin_marker_row_preview(row_rec)
+        self._refresh_master_table_for_rows(self.cat_rows)
         if not getattr(self, "_suspend_master_combo_refresh", False):
             self._refresh_item_group_combo_values()
-        e_name_jp.bind("<KeyRelease>", lambda e: self._schedule_item_group_combo_refresh())
-        e_id.bind("<KeyRelease>", lambda e: self._schedule_item_group_combo_refresh())
 
     def add_item_row_empty(self):
         self.add_item_row("", "", "", "", {})
-        self.after(10, lambda: self.scroll_item._parent_canvas.yview_moveto(1.0))
+        self.after(10, self.table_item.scroll_to_end)
 
     def _master_item_group_values(self):
         sig_rows = tuple(((r.get("name_jp") and r["name_jp"].get()) or "").strip() for r in self.cat_rows)
@@ -1716,16 +1779,25 @@ class SettingsWindow(ctk.CTkToplevel):
         if getattr(self, "_item_group_combo_values_sig", None) == sig:
             return
         self._item_group_combo_values_sig = sig
+        val_set = set(vals)
         for r in self.item_rows:
-            cmb = r.get("grp")
-            if not cmb:
+            var = r.get("grp")
+            if var is None:
                 continue
-            cur = (cmb.get() or "").strip()
-            cmb.configure(values=vals)
-            if cur and cur in vals:
-                cmb.set(cur)
-            elif vals:
-                cmb.set(vals[0])
+            cur = (var.get() or "").strip()
+            if not (cur and cur in val_set) and vals:
+                var.set(vals[0])
+        table = getattr(self, "table_item", None)
+        for slot in (table.slots() if table is not None else []):
+            if slot.get("row") is not None:
+                slot["grp"].configure(values=self._item_group_values_for_row(slot["row"]))
+
+    def _item_group_values_for_row(self, row_rec):
+        vals = list(getattr(self, "_item_group_combo_values_sig", None) or self._master_item_group_values())
+        grp = (row_rec["grp"].get() or "").strip()
+        if grp and grp not in vals:
+            vals.append(grp)
+        return vals
 
     def _schedule_item_group_combo_refresh(self, delay_ms=90):
         tid = getattr(self, "_item_group_combo_after", None)
@@ -1764,118 +1836,81 @@ class SettingsWindow(ctk.CTkToplevel):
         }
         self._refresh_pin_marker_row_preview(row_rec)
 
-    def add_item_row(self, grp, i_id, n_jp, n_en, attrs):
-        f = ctk.CTkFrame(self.scroll_item, fg_color="transparent")
-        f.pack(fill="x", pady=2)
+    def _build_item_slot(self, f):
+        slot = {}
         rw = 0
-        self._place_master_row_reorder_grid(f, self.item_rows, rw, 0)
+        self._place_master_row_reorder_grid(f, slot, self.item_rows, rw, 0)
         s = getattr(self, "_master_col_scale", 1.0)
-
-        current_groups = self._master_item_group_values()
-        if grp and grp not in current_groups:
-            current_groups = current_groups + [grp]
-        e_grp = ctk.CTkComboBox(f, values=current_groups, width=max(72, int(132 * s)))
-        e_grp.set(grp)
-        e_grp.grid(row=rw, column=1, sticky="w", padx=4, pady=2)
-
-        e_id = ctk.CTkEntry(f, width=max(64, int(128 * s)))
-        e_id.insert(0, i_id)
-        e_id.grid(row=rw, column=2, sticky="ew", padx=4, pady=2)
-        e_jp = ctk.CTkEntry(f, width=max(72, int(172 * s)))
-        e_jp.insert(0, n_jp)
-        e_jp.grid(row=rw, column=3, sticky="ew", padx=4, pady=2)
-        e_en = ctk.CTkEntry(f, width=max(72, int(172 * s)))
-        e_en.insert(0, n_en)
-        e_en.grid(row=rw, column=4, sticky="ew", padx=4, pady=2)
-        last_auto_id = {"value": ""}
-
-        def on_en_change(_e=None):
-            cur_id = (e_id.get() or "").strip()
-            auto_now = self.generate_id_from_en(e_en.get().strip())
-            # IDが空、または直前の自動生成値のままなら EN 変更に追従させる。
-            can_follow = (cur_id == "") or (last_auto_id["value"] and cur_id == last_auto_id["value"])
-            if can_follow:
-                e_id.delete(0, "end")
-                if auto_now:
-                    e_id.insert(0, auto_now)
-                last_auto_id["value"] = auto_now
-            elif cur_id:
-                # 手入力IDを検知したら自動追従を止める。
-                last_auto_id["value"] = ""
-
-        if not (i_id or "").strip():
-            on_en_change()
-        e_en.bind("<KeyRelease>", on_en_change)
-
-        attr_var = {"data": attrs}
-        btn_attr = ctk.CTkButton(f, text=f"属性 ({len(attrs)})", width=80, fg_color="#8e44ad",
-                                 command=lambda: self.edit_attributes(attr_var, btn_attr))
-        btn_attr.grid(row=rw, column=5, sticky="w", padx=4, pady=2)
-
-        pin_marker = self._load_pin_marker_for_item_id((i_id or "").strip())
-        f_pin = ctk.CTkFrame(f, fg_color="transparent")
-        f_pin.grid(row=rw, column=6, sticky="w", padx=4, pady=2)
-        lbl_pin_preview = ctk.CTkLabel(
-            f_pin, text="—", width=22, height=22, fg_color="transparent", corner_radius=0, text_color="#bdc3c7"
+        slot["grp"] = ctk.CTkComboBox(
+            f,
+            values=["(なし)"],
+            width=max(72, int(132 * s)),
+            command=lambda v: self._with_slot_row(slot, lambda r: self._on_item_group_changed(r, v)),
         )
-        lbl_pin_preview.pack(side="left", padx=1)
-        pin_swatch_icon = ctk.CTkFrame(f_pin, width=12, height=12, corner_radius=2, fg_color=pin_marker["icon_color"])
-        pin_swatch_icon.pack(side="left", padx=2)
-        pin_swatch_bg = ctk.CTkFrame(f_pin, width=12, height=12, corner_radius=2, fg_color=pin_marker["background_color"])
-        pin_swatch_bg.pack(side="left", padx=2)
-        lbl_pin_mode = ctk.CTkLabel(
-            f_pin, text=self._pin_marker_mode_label_text(pin_marker), font=("Meiryo", 9), text_color="#95a5a6"
+        slot["grp"].grid(row=rw, column=1, sticky="w", padx=4, pady=2)
+        slot["id"] = ctk.CTkEntry(f, width=max(64, int(128 * s)))
+        slot["id"].grid(row=rw, column=2, sticky="ew", padx=4, pady=2)
+        slot["jp"] = ctk.CTkEntry(f, width=max(72, int(172 * s)))
+        slot["jp"].grid(row=rw, column=3, sticky="ew", padx=4, pady=2)
+        slot["en"] = ctk.CTkEntry(f, width=max(72, int(172 * s)))
+        slot["en"].grid(row=rw, column=4, sticky="ew", padx=4, pady=2)
+        slot["en"].bind("<KeyRelease>", lambda e: self._with_slot_row(slot, lambda r: self._follow_en_to_auto_id(r, "en")))
+        slot["btn_attr"] = ctk.CTkButton(
+            f, text="属性 (0)", width=80, fg_color="#8e44ad",
+            command=lambda: self._with_slot_row(slot, lambda r: self.edit_attributes(r["attr_var"], r)),
         )
-        lbl_pin_mode.pack(side="left", padx=(4, 2))
-        row_rec = {
-            "frame": f,
-            "grp": e_grp,
-            "id": e_id,
-            "jp": e_jp,
-            "en": e_en,
-            "attr_var": attr_var,
-            "pin_marker": pin_marker,
-            "lbl_pin_preview": lbl_pin_preview,
-            "pin_swatch_icon": pin_swatch_icon,
-            "pin_swatch_bg": pin_swatch_bg,
-            "lbl_pin_mode": lbl_pin_mode,
-            "_pin_preview_holder": [],
-            "_last_group_name": (grp or "").strip(),
-        }
+        slot["btn_attr"].grid(row=rw, column=5, sticky="w", padx=4, pady=2)
+        self._build_pin_marker_cells(f, slot, 6, "マーカー（アイテム / pin_marker_by_item_id）")
         ctk.CTkButton(
-            f_pin, text="マーカー", width=68, height=26, fg_color="#2980b9",
-            command=lambda rr=row_rec: self._open_pin_marker_dialog(
-                rr, "マーカー（アイテム / pin_marker_by_item_id）",
-            ),
-        ).pack(side="left", padx=4)
+            f, text="🗑️", width=30, fg_color="#c0392b",
+            command=lambda: self._with_slot_row(slot, lambda r: self.delete_row(r, self.item_rows)),
+        ).grid(row=rw, column=7, sticky="e", padx=4, pady=2)
+        self._configure_item_table_columns(f)
+        return slot
+
+    def _bind_item_slot(self, slot, row_rec):
+        row_rec["_slot"] = slot
+        slot["grp"].configure(values=self._item_group_values_for_row(row_rec), variable=row_rec["grp"])
+        slot["id"].configure(textvariable=row_rec["id"])
+        slot["jp"].configure(textvariable=row_rec["jp"])
+        slot["en"].configure(textvariable=row_rec["en"])
+        self._refresh_row_attr_button(row_rec)
+        self._refresh_pin_marker_row_preview(row_rec)
 
-        ctk.CTkButton(f, text="🗑️", width=30, fg_color="#c0392b",
-                      command=lambda: self.delete_row(f, self.item_rows)).grid(
-            row=rw, column=7, sticky="e", padx=4, pady=2
-        )
+    def _on_item_group_changed(self, row_rec, v):
+        new_grp = (v or "").strip()
+        old_grp = (row_rec.get("_last_group_name") or "").strip()
+        row_rec["_last_group_name"] = new_grp
+        if not new_grp or new_grp == old_grp:
+            return
+        if messagebox.askyesno(
+            "対応カテゴリ変更",
+            "選択した対応カテゴリのマーカー設定をこのアイテムに引き継ぎますか？",
+            parent=self,
+        ):
+            self._inherit_marker_from_category_to_item(row_rec, new_grp)
 
-        self._configure_item_table_columns(f)
+    def add_item_row(self, grp, i_id, n_jp, n_en, attrs):
+        row_rec = {
+            "grp": tk.StringVar(self, value=grp),
+            "id": tk.StringVar(self, value=i_id),
+            "jp": tk.StringVar(self, value=n_jp),
+            "en": tk.StringVar(self, value=n_en),
+            "attr_var": {"data": attrs},
+            "_attr_btn_fmt": "属性 ({})",
+            "pin_marker": self._load_pin_marker_for_item_id((i_id or "").strip()),
+            "_last_group_name": (grp or "").strip(),
+            "_last_auto_id": "",
+            "_slot": None,
+        }
+        if not (i_id or "").strip():
+            self._follow_en_to_auto_id(row_rec, "en")
         self.item_rows.append(row_rec)
-        self._refresh_pin_marker_row_preview(row_rec)
+        self._refresh_master_table_for_rows(self.item_rows)
         if not getattr(self, "_suspend_master_combo_refresh", False):
             self._refresh_item_group_combo_values()
 
-        def on_group_changed(v, rr=row_rec):
-            new_grp = (v or "").strip()
-            old_grp = (rr.get("_last_group_name") or "").strip()
-            rr["_last_group_name"] = new_grp
-            if not new_grp or new_grp == old_grp:
-                return
-            if messagebox.askyesno(
-                "対応カテゴリ変更",
-                "選択した対応カテゴリのマーカー設定をこのアイテムに引き継ぎますか？",
-                parent=self,
-            ):
-                self._inherit_marker_from_category_to_item(rr, new_grp)
-
-        e_grp.configure(command=on_group_changed)
-
-    def edit_attributes(self, attr_var, btn):
+    def edit_attributes(self, attr_var, row_rec):
         win = ctk.CTkToplevel(self)
         win.title("属性編集")
         win.geometry("480x520")
@@ -1972,7 +2007,7 @@ class SettingsWindow(ctk.CTkToplevel):
                 except Exception:
                     pass
             attr_var["data"] = new_attrs
-            btn.configure(text=f"属性 ({len(new_attrs)})")
+            self._refresh_row_attr_button(row_rec)
             win.destroy()
         ctk.CTkButton(win, text="完了", command=apply, fg_color="#27ae60").pack(pady=10)
 
@@ -1982,6 +2017,10 @@ class SettingsWindow(ctk.CTkToplevel):
             return
             
         csv_path = os.path.join(self.parent.game_path, self.config.get("save_file", "master_data.csv"))
+        # ピンストア利用時は CSV が派生物なので、読む前に最新にしておく。
+        # 保存ジャーナルに残っている保存済みのピン変更も CSV へ畳んでから読む
+        self.parent.export_pin_csv_if_needed()
+        self.parent.compact_save_journal()
         if not os.path.exists(csv_path):
             messagebox.showerror("エラー", f"CSVファイルが見つかりません:\n{csv_path}")
             return
@@ -2055,10 +2094,10 @@ class SettingsWindow(ctk.CTkToplevel):
         
         messagebox.showinfo("完了", f"{added_count} 個のアイテムを新規追加しました。")
 
-    def delete_row(self, frame, list_ref):
-        frame.destroy()
+    def delete_row(self, row_rec, list_ref):
         for i in range(len(list_ref)-1, -1, -1):
-            if list_ref[i]["frame"] == frame: del list_ref[i]
+            if list_ref[i] is row_rec: del list_ref[i]
+        self._refresh_master_table_for_rows(list_ref)
         if list_ref in (self.attr_rows, self.route_attr_rows):
             self._refresh_category_object_combo_values()
         if list_ref is self.cat_rows:
@@ -2274,6 +2313,8 @@ class SettingsWindow(ctk.CTkToplevel):
         self.config["item_master"] = new_master
 
         category_special_rules_builder.sync_category_special_rules_from_master(self.config)
+        # config は MapEditor と同じ dict をその場で書き換えているので、保存の時点でプレビュー用の表を捨てる
+        self.parent._bump_config_revision()
         try:
             with open(self.config_path, "w", encoding="utf-8") as f:
                 json.dump(self.config, f, indent=4, ensure_ascii=False)
@@ -2397,6 +2438,12 @@ class WpRestGuidePickerWindow(ctk.CTkToplevel):
         self._sources = sources or []
         self._rows = list(rows_prefill or [])
         self._filtered = []
+        game_path = getattr(parent, "game_path", "") or ""
+        self._rest_cache_dir = wp_rest_cache_dir_for_game(game_path) if game_path else None
+        # 差分同期の索引（guide_page_links.json の隣）。前回の結果があれば取得を待たずに一覧を出す
+        self._sync_index_path = parent._guide_sync_index_path() if hasattr(parent, "_guide_sync_index_path") else None
+        if not self._rows and self._sources and self._sync_index_path:
+            self._rows = cached_guide_rows(self._sync_index_path, self._sources)
 
         f_top = ctk.CTkFrame(self, fg_color="transparent")
         f_top.pack(fill="x", padx=10, pady=8)
@@ -2438,14 +2485,22 @@ class WpRestGuidePickerWindow(ctk.CTkToplevel):
         if self._rows:
             self._apply_filter()
             self.lbl_status.configure(text=f"候補 {len(self._rows)} 件")
-        elif self._sources:
-            self.lbl_status.configure(text="記事一覧を取得しています…")
+        if self._sources:
+            if self._rows:
+                self.lbl_status.configure(text=f"候補 {len(self._rows)} 件（更新を確認しています…）")
+            else:
+                self.lbl_status.configure(text="記事一覧を取得しています…")
             threading.Thread(target=self._fetch_thread, daemon=True).start()
         else:
             self.lbl_status.configure(text="config に wp_rest_guide_sources がありません。")
 
     def _fetch_thread(self):
-        rows, err = wp_rest_guide.collect_paired_from_sources(self._sources)
+        if self._sync_index_path:
+            rows, err, _stats = sync_guide_sources(
+                self._sources, self._sync_index_path, cache_dir=self._rest_cache_dir
+            )
+        else:
+            rows, err = wp_rest_guide.collect_paired_from_sources(self._sources, cache_dir=self._rest_cache_dir)
 
         def done():
             self._rows = rows
@@ -2903,6 +2958,14 @@ class MapEditor(ctk.CTkToplevel):
         self.tile_dir = os.path.join(self.game_path, "tiles")
         self.config_path = os.path.join(self.game_path, "config.json")
         self.areas_path = os.path.join(self.game_path, "areas.json")
+        # SVG アイコンのラスタ結果はゲームフォルダ配下に残す（次回起動・設定再読込でもラスタ化しない）
+        svg_icon_assets.set_raster_cache_dir(raster_cache_dir_for_game(self.game_path))
+        # アイコンアトラス（scripts/build_icon_atlas.py）があれば裏でマスクを読み込んでおく
+        threading.Thread(
+            target=warm_raster_cache_from_atlas, args=(PROJECT_ROOT, self.game_path, EDITOR_ICON_SIZES), daemon=True
+        ).start()
+        # ピンの解決済みスタイル（マーカーマスタが変わったときだけ捨てる）
+        self._pin_style_cache = ResolvedPinStyleCache()
         
         self.load_config()
         
@@ -2946,6 +3009,8 @@ class MapEditor(ctk.CTkToplevel):
         self.geometry("1780x950")
         
         self.data_list = []
+        # ピンの空間インデックス（クリック当たり判定・ビューポート外ピンの描画スキップ用）
+        self._pin_spatial_index = PinSpatialIndex()
         self.current_uid = None
         # エリア編集用の状態
         self.area_list = []
@@ -2960,10 +3025,10 @@ class MapEditor(ctk.CTkToplevel):
         self.area_edit_enabled = tk.BooleanVar(value=True)
         self.temp_coords = None
         self.is_autoscrolling = False
-        self.tile_cache = OrderedDict()
-        self._tile_cache_max = 384
-        self._editor_pin_photo_cache = OrderedDict()
-        self._editor_pin_photo_cache_max = 200
+        # タイル・ピンの画像キャッシュは 1 つのバイト予算（config の image_cache_budget_mb）で共有する
+        self._image_cache = ImageCacheManager(self._image_cache_budget_bytes())
+        self.tile_cache = self._image_cache.region("tile_photo")
+        self._editor_pin_photo_cache = self._image_cache.region("pin_photo")
         self._throttle_refresh_after = None
         self._canvas_configure_after = None
         self._refresh_map_retry_after = None
@@ -2973,9 +3038,15 @@ class MapEditor(ctk.CTkToplevel):
         self._zoom_wheel_anchor_ey = 0
         self._suppress_configure_refresh_until = 0.0
         self._pending_scroll_after_zoom = None
-        self._tile_pil_cache = OrderedDict()
-        self._tile_pil_cache_max = 320
+        self._tile_pil_cache = self._image_cache.region("tile_pil")
         self._map_viewport_photo = None
+        # タイルのバックグラウンドデコード（初回描画時に作る）と、表示待ちのキャッシュキー
+        self._tile_prefetcher = None
+        self._tile_prefetch_wanted = set()
+        self._tile_prefetch_poll_id = None
+        # 最後に合成した地図ビットマップの条件（同じなら合成を省く）と、タイル到着ごとに上がる版数
+        self._map_layer_state = None
+        self._map_tiles_version = 0
         self.category_slots = []
         self._pin_preview_after_id = None
         
@@ -2990,15 +3061,34 @@ class MapEditor(ctk.CTkToplevel):
         self._pin_editor_panel_open = False
         self._editing_pin_drag_active = False
         self._pin_filter_window = None
+        # PinFilterWindow のチェック状態をコンパイルした述語（チェック変更で None に戻す）
+        self._pin_display_filter = None
         self._pin_edit_baseline = None
         self._pin_save_last_ok = False
         self._parent_pick_mode = False
+        # config の pin_store が "sqlite" のときのピンストア（load_csv で開く）
+        self._pin_store = None
+        # 保存ジャーナル（config の save_journal が false なら使わず、従来どおり毎回全体を書く）
+        self._save_journal = (
+            SaveJournal(save_journal_path(self.game_path)) if self.config.get("save_journal", True) else None
+        )
+        self._pin_snapshot = new_pin_snapshot()
+        self._area_snapshot = new_area_snapshot()
+        # 自動保存: 編集のたびに進む世代と、保存済みの世代（保存処理は _save_lock で直列化）
+        self._edit_gen = 0
+        self._persisted_gen = 0
+        self._save_lock = threading.Lock()
+        self._pin_freezer = RowFreezer()
+        self._area_freezer = RowFreezer()
+        self._autosave = None
+        self._autosave_after_id = None
 
         self.setup_ui()
         self.load_csv()
         self.load_areas()
         self.is_dirty = False
         self.update_title_dirty()
+        self._start_autosave()
         self.update_idletasks()
         self.after(100, self.refresh_map)
         self.run_autoscroll_loop()
@@ -3018,6 +3108,23 @@ class MapEditor(ctk.CTkToplevel):
         if not isinstance(sm, (list, dict)):
             self.config["skill_name_master"] = []
         category_special_rules_builder.sync_category_special_rules_from_master(self.config)
+        self._pin_style_cache.sync_master(self.config)
+        # ピンプレビュー用の表示名索引（config を読み直したときだけ作り直す）
+        self._pin_display_resolver = PinDisplayResolver(self.config)
+        self._bump_config_revision()
+
+    def _bump_config_revision(self):
+        """config が変わった（読み直し・設定保存）。config から作ったプレビュー用の表は次に使うとき作り直す。"""
+        self._config_revision = getattr(self, "_config_revision", 0) + 1
+        self._preview_rule_tables = None
+
+    def _pin_preview_rule_tables(self):
+        """特殊ルール・スキル名の表（config の revision ごとに 1 回だけ作る）。"""
+        cached = self._preview_rule_tables
+        if cached is None or cached[0] != self._config_revision:
+            cached = (self._config_revision, pin_site_preview.compile_preview_rule_tables(self.config))
+            self._preview_rule_tables = cached
+        return cached[1]
 
     def _parse_pin_http_url_base_fragment(self, raw):
         """
@@ -3066,6 +3173,9 @@ class MapEditor(ctk.CTkToplevel):
         name = self.config.get("guide_page_links_file", GUIDE_PAGE_LINKS_DEFAULT_FILE)
         return os.path.join(self.game_path, name)
 
+    def _guide_sync_index_path(self):
+        return guide_sync_index_path(self.game_path, self._guide_page_links_path())
+
     def _load_guide_page_links_raw(self):
         path = self._guide_page_links_path()
         if not os.path.isfile(path):
@@ -3156,33 +3266,23 @@ class MapEditor(ctk.CTkToplevel):
             return f"{head} {body} · {hint}"[:260]
         return f"{head} {body}"[:260]
 
-    def _page_matches_link_pick_filter(self, pg, q: str) -> bool:
-        if not isinstance(pg, dict):
-            return False
-        ql = (q or "").strip().lower()
-        if not ql:
-            return True
-        parts = [
-            str(pg.get("slug") or ""),
-            str(pg.get("title_jp") or ""),
-            str(pg.get("title_en") or ""),
-            str(pg.get("url_jp") or ""),
-            str(pg.get("url_en") or ""),
-        ]
-        lab = self._guide_link_combo_label_for_page(pg, None)
-        if lab:
-            parts.append(lab)
-        blob = " ".join(parts).lower()
-        return ql in blob
-
     def _get_wp_rest_guide_sources(self):
         src = self.config.get("wp_rest_guide_sources")
         if isinstance(src, list) and src:
             return src
         return list(wp_rest_guide.DEFAULT_WP_REST_GUIDE_SOURCES)
 
-    def _sync_link_combo_values_for_side(self, side: str):
+    def _guide_link_search_index(self):
+        """候補一覧の検索索引。_guide_page_links_cache が差し替わったら（同期・再読込）作り直す。"""
         pages = self._guide_page_links_cache or []
+        idx = getattr(self, "_guide_link_index", None)
+        if idx is None or idx.pages is not pages:
+            pick = {"jp": self._guide_row_pick_url_jp, "en": self._guide_row_pick_url_en}
+            idx = GuideLinkSearchIndex(pages, self._guide_link_combo_label_for_page, lambda pg, side: pick[side](pg))
+            self._guide_link_index = idx
+        return idx
+
+    def _sync_link_combo_values_for_side(self, side: str):
         q = ""
         ent = getattr(self, f"ent_link_pick_search_{side}", None)
         if ent is not None:
@@ -3190,28 +3290,10 @@ class MapEditor(ctk.CTkToplevel):
                 q = ent.get() or ""
             except Exception:
                 q = ""
-        pick_url = self._guide_row_pick_url_jp if side == "jp" else self._guide_row_pick_url_en
-        labels = [GUIDE_LINK_PICK_NONE]
-        ordered = []
-        for pg in pages:
-            if not isinstance(pg, dict):
-                continue
-            if not pick_url(pg):
-                continue
-            if not self._page_matches_link_pick_filter(pg, q):
-                continue
-            lab_base = self._guide_link_combo_label_for_page(pg, side)
-            if not lab_base:
-                continue
-            lab = lab_base
-            n = 2
-            while lab in labels:
-                lab = f"{lab_base} ({n})"
-                n += 1
-            labels.append(lab)
-            ordered.append(pg)
+        hits = self._guide_link_search_index().search(side, q)
+        labels = [GUIDE_LINK_PICK_NONE] + [lab for _pg, lab in hits]
         setattr(self, f"_guide_link_combo_labels_{side}", labels)
-        setattr(self, f"_guide_link_combo_pages_{side}", [None] + ordered)
+        setattr(self, f"_guide_link_combo_pages_{side}", [None] + [pg for pg, _lab in hits])
         combo = self.cmb_link_pick_jp if side == "jp" else self.cmb_link_pick_en
         if combo is not None:
             combo.configure(values=labels)
@@ -3233,13 +3315,21 @@ class MapEditor(ctk.CTkToplevel):
             self.lbl_link_toggle.configure(text="▶ リンク設定")
 
     def _refresh_guide_page_links_from_disk(self):
-        """JSON を読み、wp_rest_guide_sources があれば REST も取得して候補をマージ（取得は別スレッド）。"""
+        """
+        JSON を読み、wp_rest_guide_sources があれば前回同期した索引の行をすぐマージし、
+        REST の差分同期（変わった投稿だけ取得）を別スレッドで行ってから候補を差し替える。
+        """
         json_pages = self._load_guide_page_links_raw().get("pages", [])
-        self._guide_page_links_cache = [dict(p) for p in json_pages if isinstance(p, dict)]
-        self._sync_link_combo_values()
         sources = self._get_wp_rest_guide_sources()
+        if sources:
+            cached = cached_guide_rows(self._guide_sync_index_path(), sources)
+            self._guide_page_links_cache = self._merge_guide_link_json_pages_with_rest_rows(json_pages, cached)
+        else:
+            self._guide_page_links_cache = [dict(p) for p in json_pages if isinstance(p, dict)]
+        self._sync_link_combo_values()
         if not sources:
             return
+        index_path = self._guide_sync_index_path()
 
         def set_btn_busy(busy: bool):
             b = getattr(self, "_btn_guide_links_refresh", None)
@@ -3258,9 +3348,12 @@ class MapEditor(ctk.CTkToplevel):
         def worker():
             rows = []
             try:
-                rows, _err = wp_rest_guide.collect_paired_from_sources(sources)
+                rows, _err, _stats = sync_guide_sources(
+                    sources, index_path, cache_dir=wp_rest_cache_dir_for_game(self.game_path)
+                )
             except Exception:
-                pass
+                # 同期できなくても、前回の索引の行は候補に残す
+                rows = cached_guide_rows(index_path, sources)
 
             def apply_merge():
                 try:
@@ -3372,7 +3465,7 @@ class MapEditor(ctk.CTkToplevel):
         new_o = {}
         for aid in self.cat_mapping.keys():
             old = self.pin_filter_object_vars.get(aid)
-            new_o[aid] = old if old is not None else tk.BooleanVar(value=True)
+            new_o[aid] = old if old is not None else self._new_pin_filter_var()
         self.pin_filter_object_vars = new_o
         new_c = {}
         for cat_name, info in (self.category_master or {}).items():
@@ -3380,7 +3473,7 @@ class MapEditor(ctk.CTkToplevel):
                 continue
             cid = (info.get("id") or "").strip() or cat_name
             old = self.pin_filter_cat_vars.get(cid)
-            new_c[cid] = old if old is not None else tk.BooleanVar(value=True)
+            new_c[cid] = old if old is not None else self._new_pin_filter_var()
         self.pin_filter_cat_vars = new_c
         new_i = {}
         for grp, items in (self.item_master or {}).items():
@@ -3389,74 +3482,37 @@ class MapEditor(ctk.CTkToplevel):
             for iid in items.keys():
                 key = f"{grp}\t{iid}"
                 old = self.pin_filter_item_vars.get(key)
-                new_i[key] = old if old is not None else tk.BooleanVar(value=True)
+                new_i[key] = old if old is not None else self._new_pin_filter_var()
         self.pin_filter_item_vars = new_i
+        # マスタ（カテゴリ名→ID 等）も述語に焼き込むため作り直す
+        self._invalidate_pin_display_filter()
+
+    def _new_pin_filter_var(self):
+        """フィルタ用 BooleanVar（オン）。値が変わったらコンパイル済み述語を捨てる。"""
+        var = tk.BooleanVar(value=True)
+        var.trace_add("write", self._invalidate_pin_display_filter)
+        return var
+
+    def _invalidate_pin_display_filter(self, *_args):
+        self._pin_display_filter = None
+
+    def _compiled_pin_display_filter(self):
+        """現在のチェック状態の述語。BooleanVar はコンパイル時に 1 回ずつしか読まない。"""
+        flt = self._pin_display_filter
+        if flt is None:
+            flt = compile_pin_display_filter(
+                {k: v.get() for k, v in self.pin_filter_object_vars.items()},
+                {k: v.get() for k, v in self.pin_filter_cat_vars.items()},
+                {k: v.get() for k, v in self.pin_filter_item_vars.items()},
+                self.show_incomplete_only.get(),
+                self.category_master or {},
+            )
+            self._pin_display_filter = flt
+        return flt
 
     def _pin_passes_display_filters(self, d):
         """オブジェクト・カテゴリ・アイテム・未完成フィルタをすべて満たすか。"""
-        if self._is_draft_pin_row(d):
-            return True
-        attr_key = (d.get("attribute") or d.get("category_pin") or "").strip() or "MISC_OTHER"
-        ov = self.pin_filter_object_vars.get(attr_key)
-        if ov is not None and not ov.get():
-            return False
-        cats = self._parse_categories_for_pin(d)
-        cv = self.pin_filter_cat_vars
-        if cv:
-            all_c_on = all(v.get() for v in cv.values())
-            if not all_c_on:
-                enabled_c = {cid for cid, v in cv.items() if v.get()}
-                if cats:
-                    ok = False
-                    for c in cats:
-                        if not isinstance(c, dict):
-                            continue
-                        cid = (c.get("cat_id") or "").strip()
-                        if cid and cid in enabled_c:
-                            ok = True
-                            break
-                        cname = (c.get("category") or "").strip()
-                        if cname:
-                            resolved = self._get_cat_id(cname)
-                            if resolved in enabled_c or cname in enabled_c:
-                                ok = True
-                                break
-                    if not ok:
-                        return False
-        iv = self.pin_filter_item_vars
-        if iv:
-            all_i_on = all(v.get() for v in iv.values())
-            if not all_i_on:
-                enabled_i = {k for k, v in iv.items() if v.get()}
-                if cats:
-                    ok = False
-                    for c in cats:
-                        if not isinstance(c, dict):
-                            continue
-                        iid = (c.get("item_id") or "").strip()
-                        if not iid:
-                            continue
-                        cname = (c.get("category") or "").strip()
-                        if cname:
-                            key = f"{cname}\t{iid}"
-                            if key in enabled_i:
-                                ok = True
-                                break
-                        for grp in (self.item_master or {}).keys():
-                            key2 = f"{grp}\t{iid}"
-                            if key2 in enabled_i:
-                                ok = True
-                                break
-                        if ok:
-                            break
-                    if not ok:
-                        return False
-        if self.show_incomplete_only.get():
-            has_name = bool(d.get("name_jp"))
-            has_categories = bool(d.get("categories"))
-            if has_name and has_categories:
-                return False
-        return True
+        return self._compiled_pin_display_filter().passes(d)
 
     def _open_pin_filter_window(self):
         self._sync_pin_filter_vars_from_masters()
@@ -4324,6 +4380,11 @@ class MapEditor(ctk.CTkToplevel):
         self.grid_rowconfigure(0, weight=1)
         self.canvas = tk.Canvas(self, bg="#12131a", highlightthickness=0)
         self.canvas.grid(row=0, column=1, sticky="nsew")
+        # 地図 → エリア → ピン → オーバーレイの順に重なる保持モードのレイヤ
+        self._canvas_layers = CanvasLayerStack(
+            self.canvas,
+            (MapEditor._CTAG_MAP, MapEditor._CTAG_AREA, MapEditor._CTAG_PIN, MapEditor._CTAG_OVERLAY),
+        )
         # サイドバーはやや細くして、マップエリアを広く確保
         self.sidebar = ctk.CTkFrame(self, width=420, corner_radius=0)
         self.sidebar.grid(row=0, column=0, sticky="nsew")
@@ -4362,6 +4423,9 @@ class MapEditor(ctk.CTkToplevel):
             self.f_coords_bar, text="座標: ---", font=("Meiryo", 16, "bold"),
         )
         self.lbl_coords.pack(pady=(14, 14), padx=12)
+        # 保存・自動保存の状態
+        self.lbl_save_status = ctk.CTkLabel(self.f_coords_bar, text="", font=("Meiryo", 10), text_color="#bdc3c7")
+        self.lbl_save_status.pack(pady=(0, 6), padx=12)
 
         self.scroll_body = ctk.CTkScrollableFrame(self.sidebar, fg_color="transparent")
         self.scroll_body.pack(expand=True, fill="both", padx=10, pady=10)
@@ -4483,6 +4547,7 @@ class MapEditor(ctk.CTkToplevel):
         self.item_master = self.config.get("item_master", {})
         self.display_names = list(self.cat_mapping.values())
         self.show_incomplete_only = tk.BooleanVar(value=False)
+        self.show_incomplete_only.trace_add("write", self._invalidate_pin_display_filter)
         self.pin_filter_object_vars = {}
         self.pin_filter_cat_vars = {}
         self.pin_filter_item_vars = {}
@@ -4717,6 +4782,7 @@ class MapEditor(ctk.CTkToplevel):
         self.ent_link_anchor.pack(side="left", fill="x", expand=True)
         self.ent_link_anchor.bind("<KeyRelease>", lambda e: self.mark_dirty())
         self._guide_page_links_cache = []
+        self._guide_link_index = None
         self._refresh_guide_page_links_from_disk()
 
         self.txt_memo_jp = self.create_textbox("▼ 詳細メモ（日本語）", parent=self.f_pin_editor)
@@ -4969,18 +5035,7 @@ class MapEditor(ctk.CTkToplevel):
     def get_ratio(self): return ((2 ** self.zoom) * 256) / self.orig_max_dim
 
     def _parse_categories_for_pin(self, d):
-        raw = d.get("categories")
-        if not raw:
-            return []
-        if isinstance(raw, list):
-            return raw
-        if isinstance(raw, str) and raw.strip():
-            try:
-                data = json.loads(raw)
-                return data if isinstance(data, list) else []
-            except json.JSONDecodeError:
-                return []
-        return []
+        return pin_category_slots(d)
 
     def _editor_apply_pin_marker_partial(self, pin, pm):
         if not isinstance(pm, dict):
@@ -5055,6 +5110,10 @@ class MapEditor(ctk.CTkToplevel):
         pin["importance"] = str(d.get("importance") or "").strip()
         return pin
 
+    def _resolved_pin_style(self, d):
+        """(style_id, style)。行のスタイル列とマーカーマスタが前回と同じなら再解決しない。style は共有物（書き換え禁止）。"""
+        return self._pin_style_cache.resolve(d, self._merge_pin_style_from_data)
+
     def _pin_hex_rgba(self, h, default="#95a5a6"):
         s = (h or "").strip()
         if not re.match(r"^#[0-9a-fA-F]{6}$", s):
@@ -5185,7 +5244,7 @@ class MapEditor(ctk.CTkToplevel):
 
     def _pin_anchor_offsets(self, d: dict) -> tuple[int, int]:
         """create_image(px-ax, py-ay) と同じアンカーずれ（キャンバスピクセル）。"""
-        st = self._merge_pin_style_from_data(d)
+        _sid, st = self._resolved_pin_style(d)
         if self._importance_level(st.get("importance")) == 1:
             W = self._PIN_MARKER_PX
             return (W // 2, W // 2)
@@ -5209,7 +5268,7 @@ class MapEditor(ctk.CTkToplevel):
         W = self._PIN_MARKER_PX
         vb = float(self._PIN_VIEWBOX)
         s = W / vb
-        st = self._merge_pin_style_from_data(d)
+        _style_id, st = self._resolved_pin_style(d)
         disp = normalize_marker_display_style(st.get("marker_display_style"))
         if disp == "icon_only":
             sid = (st.get("svg_icon_id") or "").strip()
@@ -5231,6 +5290,41 @@ class MapEditor(ctk.CTkToplevel):
         L, T, R, B = bounds
         return L <= mx <= R and T <= my <= B
 
+    def _pin_index(self) -> PinSpatialIndex:
+        """data_list に追随した空間インデックス。list の差し替え・件数変化を検知したら作り直す。"""
+        idx = self._pin_spatial_index
+        if idx.is_stale_for(self.data_list):
+            idx.rebuild(self.data_list)
+        return idx
+
+    def _pins_near_canvas_point(self, r: float, mx: float, my: float):
+        """キャンバス座標 (mx,my) の当たり判定候補（描画順）。マーカー 1 個分の余白で画像座標に換算。"""
+        if r <= 0:
+            return list(self.data_list)
+        return self._pin_index().query_near(mx / r, my / r, self._PIN_MARKER_PX / r)
+
+    def _pins_in_canvas_viewport(self, r: float, vl: float, vt: float, cw: float, ch: float):
+        """ビューポート（キャンバス座標）に一部でも掛かり得るピン（描画順）。"""
+        if r <= 0:
+            return list(self.data_list)
+        m = self._PIN_MARKER_PX / r
+        return self._pin_index().query_rect(vl / r - m, vt / r - m, (vl + cw) / r + m, (vt + ch) / r + m)
+
+    def _remove_pin_rows_where(self, pred):
+        """data_list から条件に合う行を除く（list は差し替えずインデックスも差分更新）。戻り値: 除いた件数。"""
+        idx = self._pin_spatial_index
+        keep = []
+        removed = 0
+        for d in self.data_list:
+            if pred(d):
+                idx.remove(d)
+                removed += 1
+            else:
+                keep.append(d)
+        if removed:
+            self.data_list[:] = keep
+        return removed
+
     def _cancel_throttled_refresh(self):
         tid = getattr(self, "_throttle_refresh_after", None)
         if tid is not None:
@@ -5277,36 +5371,118 @@ class MapEditor(ctk.CTkToplevel):
         self._refresh_map_request_after = None
         self._refresh_map_do()
 
-    @staticmethod
-    def _blit_tile_to_viewport(vp, tile_rgba, tx, ty, ts, vl, vt, cw, ch):
-        """1タイルをビューポートRGBA画像へ。キャンバス座標 (vl,vt)-(vl+cw, vt+ch) に合わせて切り出し貼り付け。"""
-        tlx, tly = tx * ts, ty * ts
-        ix0 = max(tlx, vl)
-        iy0 = max(tly, vt)
-        ix1 = min(tlx + ts, vl + cw)
-        iy1 = min(tly + ts, vt + ch)
-        if ix0 >= ix1 or iy0 >= iy1:
-            return
-        sx0 = int(ix0 - tlx)
-        sy0 = int(iy0 - tly)
-        sw = int(ix1 - ix0)
-        sh = int(iy1 - iy0)
-        dx0 = int(ix0 - vl)
-        dy0 = int(iy0 - vt)
-        if sw <= 0 or sh <= 0:
-            return
-        dx0 = max(0, dx0)
-        dy0 = max(0, dy0)
-        if dx0 >= vp.width or dy0 >= vp.height:
-            return
-        sw = min(sw, vp.width - dx0)
-        sh = min(sh, vp.height - dy0)
-        if sw <= 0 or sh <= 0:
-            return
-        crop = tile_rgba.crop((sx0, sy0, sx0 + sw, sy0 + sh))
-        if crop.size != (sw, sh):
-            crop = crop.resize((sw, sh), Image.Resampling.NEAREST)
-        vp.paste(crop, (dx0, dy0), crop)
+    def _image_cache_budget_bytes(self):
+        try:
+            mb = float(self.config.get("image_cache_budget_mb", DEFAULT_IMAGE_CACHE_BUDGET_MB))
+        except (TypeError, ValueError):
+            mb = DEFAULT_IMAGE_CACHE_BUDGET_MB
+        return int(max(16.0, mb) * 1024 * 1024)
+
+    def image_cache_stats(self):
+        """タイル・ピン画像キャッシュの使用量とヒット・ミス・追い出し件数（region ごと）。"""
+        return self._image_cache.stats()
+
+    def _cached_pin_photo(self, pkey, st, selected=False, parent_highlight=False):
+        """(PhotoImage, ax, ay)。同じ見た目のピン・エリア中央アイコンは共有する。"""
+        return self._editor_pin_photo_cache.get_or_create(
+            pkey, lambda: self._editor_pin_photoimage(st, selected, parent_highlight)
+        )
+
+    def _tile_prefetch(self):
+        """タイルデコード用ワーカー。config の tile_prefetch_workers が 0 なら None（同期デコード）。"""
+        if self._tile_prefetcher is None:
+            try:
+                workers = int(self.config.get("tile_prefetch_workers", 2))
+            except (TypeError, ValueError):
+                workers = 2
+            if workers <= 0:
+                return None
+            self._tile_prefetcher = TilePrefetcher(workers=workers)
+        return self._tile_prefetcher
+
+    def _cached_base_tile(self, path):
+        """等倍タイル（RGB）。キャッシュに無ければ、ワーカーがある場合は None（デコードは先読みへ回す）。"""
+        pil_cache = self._tile_pil_cache
+        k = tile_cache_key(path)
+        tile_im = pil_cache.get(k)
+        if tile_im is not None:
+            return tile_im
+        if self._tile_prefetch() is not None:
+            return None
+        return pil_cache.put(k, decode_tile(path))
+
+    def _map_resample(self):
+        """地図拡大時の補間（config の map_resample: nearest / bilinear）。"""
+        return normalize_resample(self.config.get("map_resample"))
+
+    def _request_tile_prefetch(self, missing, z_src, tx_a, tx_b, ty_a, ty_b):
+        """
+        表示中の欠けタイル → 周辺リング → 隣のズーム、の順でデコードを依頼する。
+        リング幅は config の tile_prefetch_ring（タイル数、既定 1）。
+        """
+        pf = self._tile_prefetch()
+        self._tile_prefetch_wanted = {job[0] for job in missing}
+        if pf is None:
+            return
+        try:
+            ring = max(0, int(self.config.get("tile_prefetch_ring", 1)))
+        except (TypeError, ValueError):
+            ring = 1
+        pil_cache = self._tile_pil_cache
+        # 先読みで表示中のタイルを追い出さないよう、依頼はキャッシュ予算の半分に収まる件数まで
+        budget = max(len(missing), self._image_cache.budget_bytes // 2 // (256 * 256 * 3))
+        jobs = list(missing)
+
+        def add(z, tx, ty):
+            if len(jobs) >= budget or tx < 0 or ty < 0:
+                return
+            path = os.path.join(self.tile_dir, str(z), str(tx), f"{ty}.webp")
+            k = tile_cache_key(path)
+            if k in pil_cache or not os.path.exists(path):
+                return
+            jobs.append((k, path))
+
+        if ring:
+            for tx in range(tx_a - ring, tx_b + ring):
+                for ty in range(ty_a - ring, ty_b + ring):
+                    if tx_a <= tx < tx_b and ty_a <= ty < ty_b:
+                        continue
+                    add(z_src, tx, ty)
+        for z in (z_src + 1, z_src - 1):
+            if z < 0 or z > self.max_zoom:
+                continue
+            scale = 2.0 ** (z - z_src)
+            for tx in range(int(tx_a * scale), int(math.ceil(tx_b * scale))):
+                for ty in range(int(ty_a * scale), int(math.ceil(ty_b * scale))):
+                    add(z, tx, ty)
+        pf.request(jobs)
+        if jobs and self._tile_prefetch_poll_id is None:
+            self._tile_prefetch_poll_id = self.after(TILE_PREFETCH_POLL_MS, self._poll_prefetched_tiles)
+
+    def _poll_prefetched_tiles(self):
+        """先読みが終わるまで一定間隔でデコード済みタイルを取り込む（ワーカーからは Tk を呼ばない）。"""
+        self._tile_prefetch_poll_id = None
+        pf = self._tile_prefetcher
+        if pf is None:
+            return
+        busy = pf.busy
+        self._apply_prefetched_tiles()
+        if busy:
+            self._tile_prefetch_poll_id = self.after(TILE_PREFETCH_POLL_MS, self._poll_prefetched_tiles)
+
+    def _apply_prefetched_tiles(self):
+        pf = self._tile_prefetcher
+        if pf is None:
+            return
+        pil_cache = self._tile_pil_cache
+        need_redraw = False
+        for k, im in pf.take_ready():
+            pil_cache.put(k, im)
+            if k in self._tile_prefetch_wanted:
+                need_redraw = True
+        if need_redraw:
+            self._map_tiles_version += 1
+            self.refresh_map()
 
     def _refresh_map_do(self):
         self._cancel_throttled_refresh()
@@ -5328,13 +5504,10 @@ class MapEditor(ctk.CTkToplevel):
                 self.canvas.yview_moveto(fy)
             # update_idletasks はしない。ここで描画をflushすると、まだ古い地図画像のまま
             # 新スクロールが一瞬見えてずれる／地図を先に消した場合は真っ暗が長く見える。
-        self._map_pin_photo_refs = []
         r = self.get_ratio()
         z_src = min(int(math.floor(self.zoom)), self.max_zoom)
         ts = int(256 * (2 ** (self.zoom - z_src)))
         vl, vt = self.canvas.canvasx(0), self.canvas.canvasy(0)
-        tc = self.tile_cache
-        tmax = getattr(self, "_tile_cache_max", 384)
         tx_a = int(vl // ts)
         tx_b = int((vl + cw) // ts) + 1
         ty_a = int(vt // ts)
@@ -5349,83 +5522,71 @@ class MapEditor(ctk.CTkToplevel):
             and n_tile_slots <= 900
         )
         drew_vp = False
-        if use_vp:
+        layers = self._canvas_layers
+        map_layer = layers.layer(MapEditor._CTAG_MAP)
+        # ビューポート・ズーム・届いたタイルが前回と同じなら合成し直さない（ピンの移動・選択だけの再描画）
+        map_state = (self.tile_dir, z_src, ts, vl, vt, icw, ich, self._map_tiles_version, self._map_resample())
+        if use_vp and map_state == self._map_layer_state and map_layer.has("viewport"):
+            drew_vp = True
+        elif use_vp:
             try:
-                pil_cache = self._tile_pil_cache
-                pmax = getattr(self, "_tile_pil_cache_max", 320)
-                vp = Image.new("RGBA", (icw, ich), (28, 29, 36, 255))
+                tiles = {}
+                missing = []
                 for tx in range(tx_a, tx_b):
                     for ty in range(ty_a, ty_b):
                         path = os.path.join(self.tile_dir, str(z_src), str(tx), f"{ty}.webp")
                         if not os.path.exists(path):
                             continue
-                        k = f"{path}_{ts}"
-                        if k not in pil_cache:
-                            pil_cache[k] = Image.open(path).convert("RGBA").resize(
-                                (ts, ts), Image.Resampling.NEAREST
-                            )
-                        else:
-                            pil_cache.move_to_end(k)
-                        tile_im = pil_cache[k]
-                        self._blit_tile_to_viewport(vp, tile_im, tx, ty, ts, vl, vt, cw, ch)
-                        if k not in tc:
-                            tc[k] = ImageTk.PhotoImage(tile_im)
-                        else:
-                            tc.move_to_end(k)
-                while len(pil_cache) > pmax:
-                    pil_cache.popitem(last=False)
-                while len(tc) > tmax:
-                    tc.popitem(last=False)
-                self._map_viewport_photo = ImageTk.PhotoImage(vp.copy())
-                self._map_pin_photo_refs.append(self._map_viewport_photo)
+                        tile_im = self._cached_base_tile(path)
+                        if tile_im is None:
+                            # デコード待ちは背景色のまま。出来たら _apply_prefetched_tiles が再描画する
+                            missing.append((tile_cache_key(path), path))
+                            continue
+                        tiles[(tx, ty)] = tile_im
+                # 等倍タイルのモザイクからビューポートへ 1 回で拡大（タイルごとの拡大コピーは作らない）
+                vp = compose_viewport(
+                    tiles, tx_a, tx_b, ty_a, ty_b, ts, vl, vt, icw, ich, resample=self._map_resample()
+                )
+                self._request_tile_prefetch(missing, z_src, tx_a, tx_b, ty_a, ty_b)
+                self._map_viewport_photo = ImageTk.PhotoImage(vp)
+                self._map_layer_state = map_state
                 drew_vp = True
             except Exception:
                 drew_vp = False
-                while len(tc) > tmax:
-                    tc.popitem(last=False)
-        # タイル合成が終わってからまとめて消す。先に地図だけ消すと合成中ずっと暗く見える。
-        self.canvas.delete(
-            MapEditor._CTAG_AREA,
-            MapEditor._CTAG_PIN,
-            MapEditor._CTAG_OVERLAY,
-            MapEditor._CTAG_MAP,
-        )
+                self._map_layer_state = None
+        # タイル合成が終わってから既存アイテムを差し替える（地図は itemconfig なので暗転しない）
+        layers.begin_frame()
         if drew_vp:
             try:
-                self.canvas.create_image(
-                    vl,
-                    vt,
-                    anchor="nw",
-                    image=self._map_viewport_photo,
-                    tags=(MapEditor._CTAG_MAP,),
-                )
+                map_layer.draw("image", vl, vt, key="viewport", anchor="nw", image=self._map_viewport_photo)
             except tk.TclError:
                 pass
         else:
+            self._map_layer_state = None
+            # 合成できない巨大ビューポート等: タイルごとの PhotoImage を並べる（この経路だけ tile_cache を使う）
+            tc = self.tile_cache
             for tx in range(tx_a, tx_b):
                 for ty in range(ty_a, ty_b):
                     path = os.path.join(self.tile_dir, str(z_src), str(tx), f"{ty}.webp")
                     if os.path.exists(path):
-                        k = f"{path}_{ts}"
-                        if k not in tc:
-                            tc[k] = ImageTk.PhotoImage(
-                                Image.open(path).resize((ts, ts), Image.Resampling.NEAREST)
-                            )
-                        else:
-                            tc.move_to_end(k)
-                        self.canvas.create_image(
+                        photo = tc.get_or_create(
+                            (path, ts),
+                            lambda p=path: ImageTk.PhotoImage(
+                                Image.open(p).resize((ts, ts), Image.Resampling.NEAREST)
+                            ),
+                        )
+                        # キャッシュから追い出されても表示中はレイヤが参照を持つので消えない
+                        map_layer.draw(
+                            "image",
                             tx * ts,
                             ty * ts,
+                            key=(z_src, tx, ty, ts),
                             anchor="nw",
-                            image=tc[k],
-                            tags=(MapEditor._CTAG_MAP,),
+                            image=photo,
                         )
-            while len(tc) > tmax:
-                tc.popitem(last=False)
         # エリアをタイルの上・ピンの下に描画
         self._draw_areas(r)
-        pcache = self._editor_pin_photo_cache
-        pmax = getattr(self, "_editor_pin_photo_cache_max", 200)
+        pin_layer = layers.layer(MapEditor._CTAG_PIN)
         parent_for_highlight = ""
         cur_uid_hl = (getattr(self, "current_uid", None) or "").strip()
         if cur_uid_hl and not getattr(self, "_parent_pick_mode", False):
@@ -5433,35 +5594,27 @@ class MapEditor(ctk.CTkToplevel):
                 if dx.get("uid") == cur_uid_hl:
                     parent_for_highlight = (dx.get("parent_uid") or "").strip()
                     break
-        for d in self.data_list:
+        for d in self._pins_in_canvas_viewport(r, vl, vt, cw, ch):
             if not self._pin_passes_display_filters(d):
                 continue
             px, py = d["x"] * r, d["y"] * r
-            st = self._merge_pin_style_from_data(d)
+            style_id, st = self._resolved_pin_style(d)
             sel = d["uid"] == self.current_uid
             par_hi = bool(parent_for_highlight) and (d.get("uid") or "") == parent_for_highlight
-            try:
-                pkey = (d.get("uid"), sel, par_hi, json.dumps(st, sort_keys=True, default=str))
-            except TypeError:
-                pkey = (d.get("uid"), sel, par_hi, str(st))
-            if pkey in pcache:
-                pcache.move_to_end(pkey)
-                photo, ax, ay = pcache[pkey]
-            else:
-                photo, ax, ay = self._editor_pin_photoimage(st, sel, par_hi)
-                pcache[pkey] = (photo, ax, ay)
-                pcache.move_to_end(pkey)
-            self._map_pin_photo_refs.append(photo)
-            # 尻尾先（または icon_only の中心）を地図座標 (px,py) に一致させる
-            self.canvas.create_image(
+            # 同じ見た目のピンは PhotoImage を共有する
+            photo, ax, ay = self._cached_pin_photo((style_id, sel, par_hi), st, sel, par_hi)
+            # 尻尾先（または icon_only の中心）を地図座標 (px,py) に一致させる。
+            # 行ごとのキーなので、ドラッグ中のピンは coords、選択切替は itemconfig だけで済む
+            pin_layer.draw(
+                "image",
                 px - ax,
                 py - ay,
+                key=id(d),
                 image=photo,
                 anchor="nw",
-                tags=(MapEditor._CTAG_PIN,),
             )
-        while len(pcache) > pmax:
-            pcache.popitem(last=False)
+        self._pin_style_cache.prune(len(self.data_list))
+        self._compiled_pin_display_filter().prune(len(self.data_list))
         # 未保存の新規ピン（旧: temp_coords のみ。現行は data_list のドラフト行 + current_uid）
         if self.temp_coords and not self.current_uid:
             try:
@@ -5472,32 +5625,23 @@ class MapEditor(ctk.CTkToplevel):
             try:
                 preview_row = self._preview_csv_row_from_ui()
                 st = self._merge_pin_style_from_data(preview_row)
-                try:
-                    pkey = ("__temp_pin__", False, json.dumps(st, sort_keys=True, default=str))
-                except TypeError:
-                    pkey = ("__temp_pin__", False, str(st))
-                if pkey in pcache:
-                    pcache.move_to_end(pkey)
-                    photo, ax, ay = pcache[pkey]
-                else:
-                    photo, ax, ay = self._editor_pin_photoimage(st, selected=False)
-                    pcache[pkey] = (photo, ax, ay)
-                    pcache.move_to_end(pkey)
-                self._map_pin_photo_refs.append(photo)
-                self.canvas.create_image(
+                pkey = (self._pin_style_cache.intern(st), False, False)
+                photo, ax, ay = self._cached_pin_photo(pkey, st)
+                pin_layer.draw(
+                    "image",
                     tx - ax,
                     ty - ay,
+                    key="draft_preview",
                     image=photo,
                     anchor="nw",
-                    tags=(MapEditor._CTAG_PIN,),
                 )
-                while len(pcache) > pmax:
-                    pcache.popitem(last=False)
             except Exception:
                 pass
+        overlay = layers.layer(MapEditor._CTAG_OVERLAY)
         if self.is_crop_mode:
             bx, by, bw, bh = self.crop_box["x"] * r, self.crop_box["y"] * r, self.crop_box["w"] * r, self.crop_box["h"] * r
-            self.canvas.create_rectangle(
+            overlay.draw(
+                "rectangle",
                 bx,
                 by,
                 bx + bw,
@@ -5505,28 +5649,28 @@ class MapEditor(ctk.CTkToplevel):
                 outline="#2ecc71",
                 width=3,
                 dash=(10, 5),
-                tags=(MapEditor._CTAG_OVERLAY,),
             )
             if self.here_pos:
                 hx, hy = self.here_pos["x"] * r, self.here_pos["y"] * r
-                self.canvas.create_oval(
+                overlay.draw(
+                    "oval",
                     hx - 20,
                     hy - 20,
                     hx + 20,
                     hy + 20,
                     outline="white",
                     width=4,
-                    tags=(MapEditor._CTAG_OVERLAY,),
                 )
-                self.canvas.create_oval(
+                overlay.draw(
+                    "oval",
                     hx - 20,
                     hy - 20,
                     hx + 20,
                     hy + 20,
                     outline="#e74c3c",
                     width=3,
-                    tags=(MapEditor._CTAG_OVERLAY,),
                 )
+        layers.end_frame()
         self.canvas.config(scrollregion=(0, 0, self.orig_w * r, self.orig_h * r))
 
     def _try_start_editing_pin_drag(self, cx, cy, r, event_x, event_y) -> bool:
@@ -5574,6 +5718,7 @@ class MapEditor(ctk.CTkToplevel):
             for d in self.data_list:
                 if d.get("uid") == uid:
                     d["x"], d["y"] = float(cx), float(cy)
+                    self._pin_spatial_index.upsert(d)
                     break
         elif getattr(self, "temp_coords", None) is not None:
             self.temp_coords = (float(cx), float(cy))
@@ -5778,7 +5923,7 @@ class MapEditor(ctk.CTkToplevel):
                 return
             # 親ピン選択モード: 別ピンをクリックして親を設定（座標は変更しない）
             if getattr(self, "_parent_pick_mode", False) and (getattr(self, "current_uid", None) or "").strip():
-                for d in reversed(self.data_list):
+                for d in reversed(self._pins_near_canvas_point(r, mx, my)):
                     if self._is_draft_pin_row(d):
                         continue
                     if not self._pin_passes_display_filters(d):
@@ -5792,7 +5937,7 @@ class MapEditor(ctk.CTkToplevel):
                         return
                 return
             # まずピン当たり判定（後から描いたピンを優先＝描画順と一致）
-            for d in reversed(self.data_list):
+            for d in reversed(self._pins_near_canvas_point(r, mx, my)):
                 if not self._pin_passes_display_filters(d):
                     continue
                 if self._pin_hit_test_canvas(d, r, mx, my):
@@ -5818,6 +5963,7 @@ class MapEditor(ctk.CTkToplevel):
                 uid_new = self._gen_new_pin_uid()
                 draft = self._make_empty_pin_row(uid_new, cx, cy, draft=True)
                 self.data_list.append(draft)
+                self._pin_spatial_index.upsert(draft)
                 self.current_uid = uid_new
                 self._sync_draft_pin_row_core_from_ui()
                 self._show_pin_editor_panel()
@@ -5898,6 +6044,7 @@ class MapEditor(ctk.CTkToplevel):
 
     def mark_dirty(self):
         self.is_dirty = True
+        self._edit_gen += 1
         self.update_title_dirty()
 
     def mark_clean(self):
@@ -5911,19 +6058,43 @@ class MapEditor(ctk.CTkToplevel):
         elif not self.is_dirty:
             self.title(base_title)
 
-    def save_all_changes(self):
-        self.write_files()
-        self.save_areas()
-        self.mark_clean()
+    def save_all_changes(self) -> bool:
+        """保存できたら True（失敗時はエラーを表示して False）。"""
+        snap = self._freeze_save_snapshot()
+        try:
+            self._persist_save_snapshot(snap)
+        except Exception as ex:
+            messagebox.showerror("保存エラー", f"変更内容の保存に失敗しました。\n{ex}", parent=self)
+            return False
+        self._mark_saved(snap["gen"])
+        self._set_save_status(f"保存 {datetime.now().strftime('%H:%M:%S')}")
         messagebox.showinfo("保存", "変更内容を保存しました。")
+        return True
 
     def on_close(self):
+        self._stop_autosave()
+        # 書き終えた自動保存の結果はまだ after で取り込まれていないことがあるので、ここで反映する
+        self._mark_saved(self._persisted_gen)
         if self.is_dirty:
             ans = messagebox.askyesnocancel("終了確認", "未保存の変更があります。保存して終了しますか？")
             if ans is None:
+                self._start_autosave()
                 return
-            if ans:
-                self.save_all_changes()
+            if ans and not self.save_all_changes():
+                # 保存に失敗したら閉じない（メモリ上の編集を捨てない）
+                self._start_autosave()
+                return
+        self.compact_save_journal()
+        if self._pin_store is not None:
+            self.export_pin_csv_if_needed()
+            self._pin_store.close()
+            self._pin_store = None
+        if self._tile_prefetch_poll_id is not None:
+            self.after_cancel(self._tile_prefetch_poll_id)
+            self._tile_prefetch_poll_id = None
+        if self._tile_prefetcher is not None:
+            self._tile_prefetcher.close()
+            self._tile_prefetcher = None
         self.destroy()
         self.master.deiconify()
 
@@ -6006,13 +6177,7 @@ class MapEditor(ctk.CTkToplevel):
 
     def _area_synthetic_pin_dict_for_marker(self, area):
         """エリアをピンと同じマスタ解決に載せるための擬似ピン辞書。"""
-        cats = area.get("categories")
-        if isinstance(cats, list):
-            cat_field = json.dumps(cats, ensure_ascii=False) if cats else ""
-        elif isinstance(cats, str):
-            cat_field = cats
-        else:
-            cat_field = ""
+        cat_field = pin_category_slots(area)
         attr = (area.get("attribute") or "").strip()
         return {
             "attribute": attr,
@@ -6025,8 +6190,7 @@ class MapEditor(ctk.CTkToplevel):
 
     def _draw_area_center_icons(self, r):
         """map.js のエリア中央アイコン（マーカー）をエディタでも表示。ピン描画より手前に重ねるため _draw_areas の最後で呼ぶ。"""
-        pcache = self._editor_pin_photo_cache
-        pmax = getattr(self, "_editor_pin_photo_cache_max", 200)
+        areas = self._canvas_layers.layer(MapEditor._CTAG_AREA)
         for area in self.area_list:
             if not self._area_wants_center_icon(area):
                 continue
@@ -6041,30 +6205,18 @@ class MapEditor(ctk.CTkToplevel):
                 px, py = float(ix) * r, float(iy) * r
             except (TypeError, ValueError):
                 continue
-            uid = area.get("uid")
-            try:
-                pkey = ("__area_ctr__", uid, json.dumps(st, sort_keys=True, default=str))
-            except TypeError:
-                pkey = ("__area_ctr__", uid, str(st))
-            if pkey in pcache:
-                pcache.move_to_end(pkey)
-                photo, ax, ay = pcache[pkey]
-            else:
-                photo, ax, ay = self._editor_pin_photoimage(st, selected=False)
-                pcache[pkey] = (photo, ax, ay)
-                pcache.move_to_end(pkey)
-            self._map_pin_photo_refs.append(photo)
-            self.canvas.create_image(
+            pkey = (self._pin_style_cache.intern(st), False, False)
+            photo, ax, ay = self._cached_pin_photo(pkey, st)
+            areas.draw(
+                "image",
                 px - ax,
                 py - ay,
                 image=photo,
                 anchor="nw",
-                tags=(MapEditor._CTAG_AREA,),
             )
-        while len(pcache) > pmax:
-            pcache.popitem(last=False)
 
     def _draw_areas(self, r):
+        areas = self._canvas_layers.layer(MapEditor._CTAG_AREA)
         for area in self.area_list:
             shape = area.get("shape", "polygon")
             fill = self._get_area_fill_color(area)
@@ -6087,13 +6239,13 @@ class MapEditor(ctk.CTkToplevel):
                     px = cx + radius * math.cos(theta)
                     py = cy + radius * math.sin(theta)
                     flat.extend([px, py])
-                self.canvas.create_polygon(
+                areas.draw(
+                    "polygon",
                     *flat,
                     outline=outline,
                     width=width,
                     fill=fill,
                     stipple=stipple,
-                    tags=(MapEditor._CTAG_AREA,),
                 )
             elif shape == "rect":
                 x = float(area.get("x", 0))*r
@@ -6102,7 +6254,8 @@ class MapEditor(ctk.CTkToplevel):
                 h = float(area.get("height", 0))*r
                 if w <= 0 or h <= 0:
                     continue
-                self.canvas.create_rectangle(
+                areas.draw(
+                    "rectangle",
                     x,
                     y,
                     x + w,
@@ -6111,7 +6264,6 @@ class MapEditor(ctk.CTkToplevel):
                     width=width,
                     fill=fill,
                     stipple=stipple,
-                    tags=(MapEditor._CTAG_AREA,),
                 )
             else:
                 pts = area.get("points") or []
@@ -6120,27 +6272,27 @@ class MapEditor(ctk.CTkToplevel):
                 flat = []
                 for (ax, ay) in pts:
                     flat.extend([ax*r, ay*r])
-                self.canvas.create_polygon(
+                areas.draw(
+                    "polygon",
                     *flat,
                     outline=outline,
                     width=width,
                     fill=fill,
                     stipple=stipple,
-                    tags=(MapEditor._CTAG_AREA,),
                 )
                 # 制御点の可視化（編集モード時）
                 if self.area_show_points.get() and self.area_mode == "edit_polygon" and is_selected:
                     for idx, (ax, ay) in enumerate(pts):
                         px, py = ax*r, ay*r
                         c = "#ff4757" if idx == 0 else "#ffffff"
-                        self.canvas.create_oval(
+                        areas.draw(
+                            "oval",
                             px - 7,
                             py - 7,
                             px + 7,
                             py + 7,
                             fill=c,
                             outline="#000000",
-                            tags=(MapEditor._CTAG_AREA,),
                         )
         # 作成中ポリゴンのプレビュー（始点強調＋閉路ガイド）
         if self.area_mode == "create_polygon" and self.area_temp_points:
@@ -6149,10 +6301,11 @@ class MapEditor(ctk.CTkToplevel):
                 flat = []
                 for (ax, ay) in pts:
                     flat.extend([ax*r, ay*r])
-                self.canvas.create_line(*flat, fill="#00d2d3", width=2, tags=(MapEditor._CTAG_AREA,))
+                areas.draw("line", *flat, fill="#00d2d3", width=2)
                 sx, sy = pts[0][0]*r, pts[0][1]*r
                 ex, ey = pts[-1][0]*r, pts[-1][1]*r
-                self.canvas.create_line(
+                areas.draw(
+                    "line",
                     ex,
                     ey,
                     sx,
@@ -6160,27 +6313,27 @@ class MapEditor(ctk.CTkToplevel):
                     fill="#00d2d3",
                     width=1,
                     dash=(4, 3),
-                    tags=(MapEditor._CTAG_AREA,),
                 )
             if self.area_show_points.get():
                 for idx, (ax, ay) in enumerate(pts):
                     px, py = ax*r, ay*r
                     c = "#ff4757" if idx == 0 else "#ffffff"
-                    self.canvas.create_oval(
+                    areas.draw(
+                        "oval",
                         px - 7,
                         py - 7,
                         px + 7,
                         py + 7,
                         fill=c,
                         outline="#000000",
-                        tags=(MapEditor._CTAG_AREA,),
                     )
         # 円/四角のドラッグ作成プレビュー
         if self.area_preview_shape:
             shp = self.area_preview_shape
             x0, y0, x1, y1 = shp["x0"]*r, shp["y0"]*r, shp["x1"]*r, shp["y1"]*r
             if shp["shape"] == "create_rect":
-                self.canvas.create_rectangle(
+                areas.draw(
+                    "rectangle",
                     min(x0, x1),
                     min(y0, y1),
                     max(x0, x1),
@@ -6188,11 +6341,11 @@ class MapEditor(ctk.CTkToplevel):
                     outline="#00d2d3",
                     width=2,
                     dash=(6, 4),
-                    tags=(MapEditor._CTAG_AREA,),
                 )
             elif shp["shape"] == "create_circle":
                 radius = ((x1 - x0) ** 2 + (y1 - y0) ** 2) ** 0.5
-                self.canvas.create_oval(
+                areas.draw(
+                    "oval",
                     x0 - radius,
                     y0 - radius,
                     x0 + radius,
@@ -6200,7 +6353,6 @@ class MapEditor(ctk.CTkToplevel):
                     outline="#00d2d3",
                     width=2,
                     dash=(6, 4),
-                    tags=(MapEditor._CTAG_AREA,),
                 )
         self._draw_area_center_icons(r)
 
@@ -6932,8 +7084,8 @@ class MapEditor(ctk.CTkToplevel):
             "attribute": attribute_id,
             "category_pin": attribute_id,
             "obj_name_en": (self.ent_obj_en.get() or "").strip() if getattr(self, "ent_obj_en", None) else "",
-            "obj_attributes": json.dumps(obj_attributes, ensure_ascii=False) if obj_attributes else "",
-            "categories": json.dumps(categories_data, ensure_ascii=False) if categories_data else "",
+            "obj_attributes": obj_attributes,
+            "categories": categories_data,
             "category": main_category,
             "memo_jp": self.txt_memo_jp.get("1.0", "end-1c").replace("\n", "<br>"),
             "memo_en": self.txt_memo_en.get("1.0", "end-1c").replace("\n", "<br>"),
@@ -6964,8 +7116,10 @@ class MapEditor(ctk.CTkToplevel):
             return
         try:
             row = self._preview_csv_row_from_ui()
-            resolved = resolve_pin_for_display(row, self.config)
-            bundle = pin_site_preview.build_preview_bundle(resolved, row, self.config)
+            resolved = self._pin_display_resolver.resolve(row)
+            bundle = pin_site_preview.build_preview_bundle(
+                resolved, row, self.config, rule_tables=self._pin_preview_rule_tables()
+            )
             self._set_pin_preview_text(self._pin_preview_hover_jp, bundle.get("hover_tooltip_jp", ""))
             self._set_pin_preview_text(self._pin_preview_hover_en, bundle.get("hover_tooltip_en", ""))
             self._set_pin_preview_text(self._pin_preview_popup_jp, bundle.get("popup_plain_jp", ""))
@@ -7379,9 +7533,9 @@ class MapEditor(ctk.CTkToplevel):
             'name_en': name_en,
             'attribute': attribute_id,
             'obj_name_en': obj_name_en_override or "",
-            'obj_attributes': json.dumps(obj_attributes, ensure_ascii=False) if obj_attributes else "",
+            'obj_attributes': obj_attributes,
             'category': main_category,
-            'categories': json.dumps(categories_data, ensure_ascii=False) if categories_data else "",
+            'categories': categories_data,
             'importance': importance,
             'memo_jp': self.txt_memo_jp.get("1.0", "end-1c").replace("\n", "<br>"),
             'memo_en': self.txt_memo_en.get("1.0", "end-1c").replace("\n", "<br>"),
@@ -7411,16 +7565,19 @@ class MapEditor(ctk.CTkToplevel):
                     d.update({k: v for k, v in dr.items() if v is not None})
                     if self._is_draft_pin_row(d):
                         d.pop("__draft__", None)
+                    self._pin_spatial_index.upsert(d)
                     break
         else:
+            dr = PinRecord(dr)
             self.data_list.append(dr)
+            self._pin_spatial_index.upsert(dr)
         self._pin_save_last_ok = True
         self.mark_dirty(); self.current_uid = self.temp_coords = None; self.refresh_map(); self.clear_ui()
 
     def delete_data(self):
         if not self.current_uid or not messagebox.askyesno("確認", "削除しますか？"): return
         del_uid = self.current_uid
-        self.data_list = [d for d in self.data_list if d['uid'] != del_uid]
+        self._remove_pin_rows_where(lambda d: d['uid'] == del_uid)
         for d in self.data_list:
             if (d.get("parent_uid") or "").strip() == del_uid:
                 d["parent_uid"] = ""
@@ -7449,16 +7606,15 @@ class MapEditor(ctk.CTkToplevel):
     def _remove_draft_pin_row_if_any(self):
         """未保存の新規ドラフト行を data_list から除去（編集中断・別操作開始時）。"""
         cu = (getattr(self, "current_uid", None) or "").strip()
-        before = len(self.data_list)
-        self.data_list = [d for d in self.data_list if not self._is_draft_pin_row(d)]
-        if before != len(self.data_list) and cu:
+        removed = self._remove_pin_rows_where(self._is_draft_pin_row)
+        if removed and cu:
             # current_uid がドラフトなら掃除後は無効
             row = self._get_pin_row_by_uid(cu)
             if row is None:
                 self.current_uid = None
 
     def _make_empty_pin_row(self, uid: str, x: float, y: float, draft: bool = True) -> dict:
-        return {
+        return PinRecord({
             "uid": uid,
             "x": float(x),
             "y": float(y),
@@ -7466,9 +7622,9 @@ class MapEditor(ctk.CTkToplevel):
             "name_en": "",
             "attribute": "",
             "obj_name_en": "",
-            "obj_attributes": "",
+            "obj_attributes": {},
             "category": "",
-            "categories": "",
+            "categories": [],
             "importance": "",
             "category_pin": "",
             "contents": "",
@@ -7482,7 +7638,7 @@ class MapEditor(ctk.CTkToplevel):
             "parent_uid": "",
             "parent_type": "",
             **({"__draft__": True} if draft else {}),
-        }
+        })
 
     def _sync_draft_pin_row_core_from_ui(self):
         """ドラフト新規ピン行に、座標以外の最小フィールドを UI から反映（マップ描画・親設定の整合用）。"""
@@ -7500,9 +7656,10 @@ class MapEditor(ctk.CTkToplevel):
     def _purge_stale_draft_pins(self, keep_uid: str = ""):
         """別ピンへ切り替えるなどで、取り残されたドラフト新規行を掃除する。"""
         ku = (keep_uid or "").strip()
-        before = len(self.data_list)
-        self.data_list = [d for d in self.data_list if (not self._is_draft_pin_row(d)) or ((d.get("uid") or "").strip() == ku)]
-        if before != len(self.data_list):
+        removed = self._remove_pin_rows_where(
+            lambda d: self._is_draft_pin_row(d) and (d.get("uid") or "").strip() != ku
+        )
+        if removed:
             cu = (getattr(self, "current_uid", None) or "").strip()
             if cu and self._get_pin_row_by_uid(cu) is None:
                 self.current_uid = None
@@ -7713,55 +7870,234 @@ class MapEditor(ctk.CTkToplevel):
             else:
                 d["parent_type"] = self._normalize_saved_parent_type(p, d.get("parent_type"))
 
-    def write_files(self):
-        p = os.path.join(self.game_path, self.config.get("save_file", "master_data.csv"))
-        # 新しいフィールドと後方互換性のためのフィールドを含める
-        flds = ["uid", "x", "y", "name_jp", "name_en", "attribute", "obj_name_en", "obj_attributes", "category", "categories", "importance", "category_pin", "contents", "memo_jp", "memo_en", "updated_at", "link_url_jp", "link_url_en", "link_anchor", "marker_display_style", "parent_uid", "parent_type"]
-        with open(p, "w", newline="", encoding="utf-8-sig") as f:
-            writer = csv.DictWriter(f, fieldnames=flds, extrasaction='ignore')
-            writer.writeheader(); writer.writerows(self.data_list)
+    def _pin_csv_path(self):
+        return os.path.join(self.game_path, self.config.get("save_file", "master_data.csv"))
+
+    def _pin_store_enabled(self) -> bool:
+        return str(self.config.get("pin_store") or "").strip().lower() == PIN_STORE_SQLITE
+
+    def write_files(self, rows=None):
+        rows = self.data_list if rows is None else rows
+        if self._pin_store is not None:
+            # 変わった行だけストアへ。CSV は閉じるとき等に export_pin_csv_if_needed で書き出す
+            self._pin_store.save(rows)
+            return
+        # categories / obj_attributes は pin_row_to_csv で初めて JSON 文字列に戻す
+        write_pin_csv_atomic(self._pin_csv_path(), rows)
+
+    def _save_journal_compact_bytes(self) -> int:
+        try:
+            kb = float(self.config.get("save_journal_compact_kb", DEFAULT_SAVE_JOURNAL_COMPACT_KB))
+        except (TypeError, ValueError):
+            kb = DEFAULT_SAVE_JOURNAL_COMPACT_KB
+        return max(0, int(kb * 1024))
+
+    def _compact_journal_on_disk(self) -> bool:
+        csv_path = None if self._pin_store is not None else self._pin_csv_path()
+        return compact_save_journal(self._save_journal, csv_path, self.areas_path)
+
+    def _save_via_journal(self, pins, areas) -> bool:
+        """
+        前回保存からの差分だけをジャーナルに追記する。全体書き直しが要るとき（ジャーナル無効・並び替え・追記失敗）は
+        False を返し、呼び出し側が全体を書く。
+        """
+        journal = self._save_journal
+        if journal is None:
+            return False
+        # ピンストア利用時、ピンはストア側で行単位に保存されるのでジャーナルはエリアだけ
+        pin_ops = [] if self._pin_store is not None else self._pin_snapshot.diff(pins)
+        area_ops = self._area_snapshot.diff(areas)
+        if pin_ops is None or area_ops is None:
+            # 先にジャーナルを本体へ畳んでおく（全体書き直しの後に古い操作が当て直されないように）
+            self._compact_journal_on_disk()
+            return False
+        if self._pin_store is not None:
+            self.write_files(pins)
+        try:
+            journal.append(pin_ops + area_ops)
+        except OSError:
+            self._compact_journal_on_disk()
+            return False
+        self._pin_snapshot.commit()
+        self._area_snapshot.commit()
+        if journal.size() > self._save_journal_compact_bytes():
+            self._compact_journal_on_disk()
+        return True
+
+    def _freeze_save_snapshot(self):
+        """保存用の凍結コピー（変わった行だけ複製）。メインスレッドで呼ぶ。"""
+        pins, _ = self._pin_freezer.freeze(self.data_list)
+        areas, _ = self._area_freezer.freeze(self.area_list or [])
+        return {"gen": self._edit_gen, "pins": pins, "areas": areas}
+
+    def _persist_save_snapshot(self, snap):
+        """
+        凍結コピーを保存する。自動保存ワーカーからも呼ぶので Tk には触らない（失敗は例外で返す）。
+        手動保存と自動保存が前後しても、古いスナップショットで新しい保存を上書きしない。
+        """
+        gen, pins, areas = snap["gen"], snap["pins"], snap["areas"]
+        with self._save_lock:
+            if gen < self._persisted_gen:
+                return {"gen": gen, "skipped": True}
+            journaled = self._save_via_journal(pins, areas)
+            if not journaled:
+                self.write_files(pins)
+                write_areas_atomic(self.areas_path, areas)
+                self._pin_snapshot.reset(pins)
+                self._area_snapshot.reset(areas)
+            self._persisted_gen = gen
+        return {"gen": gen, "skipped": False, "journaled": journaled, "pins": len(pins), "areas": len(areas)}
+
+    def compact_save_journal(self) -> bool:
+        """ジャーナルを master_data.csv / areas.json に畳む（一時ファイル + rename）。ディスク上の保存済み内容だけが対象。"""
+        if self._save_journal is None:
+            return False
+        try:
+            with self._save_lock:
+                return self._compact_journal_on_disk()
+        except (OSError, ValueError) as ex:
+            # ジャーナルは残るので、次回起動時の読込で当て直される
+            messagebox.showerror("保存ジャーナル", f"保存ジャーナルの圧縮に失敗しました。\n{ex}", parent=self)
+            return False
+
+    # --- 自動保存 ---
+    def _autosave_interval_ms(self) -> int:
+        try:
+            sec = float(self.config.get("autosave_interval_sec", DEFAULT_AUTOSAVE_INTERVAL_SEC))
+        except (TypeError, ValueError):
+            sec = DEFAULT_AUTOSAVE_INTERVAL_SEC
+        return int(sec * 1000) if sec > 0 else 0
+
+    def _start_autosave(self):
+        """config の autosave_interval_sec（秒、0 で無効）ごとに、未保存の変更をワーカースレッドで保存する。"""
+        if self._autosave_interval_ms() <= 0:
+            return
+        self._autosave = AutosaveWorker(self._persist_save_snapshot)
+        self._autosave_after_id = self.after(self._autosave_interval_ms(), self._autosave_tick)
+        self.after_idle(self._prime_save_freezers)
+
+    def _prime_save_freezers(self, start=0):
+        """読込済みの行の凍結コピーを 500 行ずつアイドル時に作る（初回の自動保存で全行コピーしないように）。"""
+        if self._autosave is None:
+            return
+        nxt = self._pin_freezer.prime(self.data_list, start, 500)
+        if nxt < len(self.data_list):
+            self.after(1, lambda: self._prime_save_freezers(nxt))
+        else:
+            self._area_freezer.prime(self.area_list or [], 0, len(self.area_list or []))
+
+    def _autosave_tick(self):
+        self._autosave_after_id = None
+        worker = self._autosave
+        if worker is None:
+            return
+        if self.is_dirty and self._persisted_gen < self._edit_gen and not worker.busy:
+            # メインスレッドでは凍結コピーを作るだけ（変わっていない行は前回のコピーを共有）
+            worker.submit(self._freeze_save_snapshot())
+            self._set_save_status("自動保存中…")
+            self.after(200, self._poll_autosave_results)
+        self._autosave_after_id = self.after(self._autosave_interval_ms(), self._autosave_tick)
+
+    def _poll_autosave_results(self):
+        """書き終わるまで 200ms ごとに結果を見に行く（ワーカーからは Tk を呼ばない）。"""
+        worker = self._autosave
+        if worker is None:
+            return
+        busy = worker.busy
+        for result, error in worker.take_results():
+            self._apply_autosave_result(result, error)
+        if busy:
+            self.after(200, self._poll_autosave_results)
+
+    def _apply_autosave_result(self, result, error):
+        if error is not None:
+            self._set_save_status(f"自動保存に失敗しました: {error}", error=True)
+            return
+        if result.get("skipped"):
+            return
+        self._mark_saved(result["gen"])
+        self._set_save_status(
+            f"自動保存 {datetime.now().strftime('%H:%M:%S')}（ピン {result['pins']} 件・エリア {result['areas']} 件）"
+        )
+
+    def _stop_autosave(self):
+        """予約を止め、書きかけ・未着手の自動保存を書き終えるまで待つ。"""
+        if self._autosave_after_id is not None:
+            try:
+                self.after_cancel(self._autosave_after_id)
+            except tk.TclError:
+                pass
+            self._autosave_after_id = None
+        worker, self._autosave = self._autosave, None
+        if worker is not None:
+            worker.close()
+
+    def _mark_saved(self, gen):
+        """gen 時点の内容が保存された。その後に編集が無ければクリーンにする。"""
+        if gen == self._edit_gen:
+            self.mark_clean()
+
+    def _set_save_status(self, text, error=False):
+        self.lbl_save_status.configure(text=text, text_color="#e74c3c" if error else "#bdc3c7")
+
+    def export_pin_csv_if_needed(self):
+        """ピンストア利用時、CSV へ書き出していない保存済み変更があれば CSV を書き直す。"""
+        store = self._pin_store
+        if store is None or not store.csv_dirty:
+            return
+        try:
+            store.export_csv(self._pin_csv_path())
+        except OSError as ex:
+            messagebox.showerror("CSV 書き出しエラー", f"master_data.csv の書き出しに失敗しました。\n{ex}", parent=self)
+
+    def _load_pins_from_store(self, p):
+        """ピンストアから読む。CSV が外で書き換えられていて、ストアに未書き出しの変更が無ければ CSV を取り込み直す。"""
+        if self._pin_store is None:
+            self._pin_store = SqlitePinStore(pin_store_path(p))
+        store = self._pin_store
+        csv_exists = os.path.exists(p)
+        if csv_exists and (store.is_empty() or store.csv_changed_externally(p)):
+            if not store.csv_dirty:
+                return store.import_csv(p)
+            messagebox.showwarning(
+                "ピンストア",
+                "master_data.csv がエディタの外で変更されていますが、ピンストアに CSV 未書き出しの変更があるため"
+                "ストアの内容を読み込みます。\n閉じるときに CSV はストアの内容で書き直されます。",
+                parent=self,
+            )
+        return store.load()
 
     def load_csv(self):
-        p = os.path.join(self.game_path, self.config.get("save_file", "master_data.csv"))
+        p = self._pin_csv_path()
+        if self._pin_store_enabled():
+            self.data_list = self._load_pins_from_store(p)
+            self._sanitize_pin_parent_refs()
+            self._pin_spatial_index.rebuild(self.data_list)
+            return
+        rows = []
         if os.path.exists(p):
             with open(p, "r", encoding="utf-8-sig") as f:
-                reader = csv.DictReader(f); rows = []
-                for row in reader:
-                    d = dict(row); d['x'] = float(row['x']); d['y'] = float(row['y'])
-                    
-                    # 後方互換性：旧形式のデータを新形式に変換
-                    if 'category_main' in row and not row.get('category_pin'): 
-                        d['category_pin'] = row['category_main']
-                    if 'category_pin' in row and 'attribute' not in row:
-                        d['attribute'] = d.get('category_pin', 'MISC_OTHER')
-                    
-                    if 'contents' not in row: d['contents'] = ""
-                    if 'category' not in row: d['category'] = ""
-                    if 'categories' not in row: d['categories'] = ""
-                    if 'obj_name_en' not in row: d.setdefault('obj_name_en', '')
-                    if 'importance' not in row: d['importance'] = ""
-                    if 'obj_attributes' not in row: d['obj_attributes'] = ""
-                    if 'updated_at' not in row: d['updated_at'] = ""
-                    if 'link_url_jp' not in row: d.setdefault('link_url_jp', '')
-                    if 'link_url_en' not in row: d.setdefault('link_url_en', '')
-                    if 'link_anchor' not in row: d.setdefault('link_anchor', '')
-                    if 'marker_display_style' not in row: d.setdefault('marker_display_style', '')
-                    if 'parent_uid' not in row: d.setdefault('parent_uid', '')
-                    if 'parent_type' not in row: d.setdefault('parent_type', '')
-                    rows.append(d)
-                self.data_list = rows
-                self._sanitize_pin_parent_refs()
+                reader = csv.DictReader(f)
+                # 後方互換の列補完と categories / obj_attributes のパースは PinRecord 側で 1 回だけ行う
+                rows = [PinRecord.from_csv_row(row) for row in reader]
+        if self._save_journal is not None:
+            rows = apply_ops(rows, self._save_journal.read(KIND_PIN), pin_record_from_blob)
+        self._pin_snapshot.reset(rows)
+        if rows or os.path.exists(p):
+            self.data_list = rows
+            self._sanitize_pin_parent_refs()
+            self._pin_spatial_index.rebuild(self.data_list)
 
     # --- エリアデータの保存・読込（areas.json） ---
     def load_areas(self):
         """areas.json からエリア情報を読み込む"""
         self.area_list = []
-        if not os.path.exists(self.areas_path):
-            return
         try:
-            with open(self.areas_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            areas = data.get("areas", [])
+            areas = []
+            if os.path.exists(self.areas_path):
+                with open(self.areas_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                areas = data.get("areas", [])
             norm_areas = []
             for a in areas:
                 if not isinstance(a, dict):
@@ -7785,20 +8121,14 @@ class MapEditor(ctk.CTkToplevel):
                 if "uid" not in a and norm_pts:
                     a["uid"] = f"AREA_{len(norm_areas)+1}"
                 norm_areas.append(a)
+            if self._save_journal is not None:
+                # ジャーナルの行は保存時点の（正規化済みの）エリアそのもの
+                norm_areas = apply_ops(norm_areas, self._save_journal.read(KIND_AREA), dict)
             self.area_list = norm_areas
         except Exception:
             # 壊れていてもエディタ自体は動くようにする
             self.area_list = []
-
-    def save_areas(self):
-        """エリア情報を areas.json に保存する"""
-        data = {"areas": self.area_list or []}
-        try:
-            with open(self.areas_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception:
-            # 保存エラーはメッセージだけに留める
-            messagebox.showerror("エリア保存エラー", "areas.json の保存に失敗しました。")
+        self._area_snapshot.reset(self.area_list)
 
     def load_to_ui(self, d) -> bool:
         if self._pin_edit_has_unsaved_changes():
@@ -7831,10 +8161,9 @@ class MapEditor(ctk.CTkToplevel):
                 self.on_attribute_changed()
         
             # オブジェクト属性を読み込み
-            obj_attrs_json = d.get('obj_attributes', '')
-            if obj_attrs_json:
+            obj_attrs = pin_object_attributes(d)
+            if obj_attrs:
                 try:
-                    obj_attrs = json.loads(obj_attrs_json)
                     extras = {}
                     for attr_key, attr_val in obj_attrs.items():
                         if attr_key in self.obj_attr_widgets:
@@ -7872,10 +8201,9 @@ class MapEditor(ctk.CTkToplevel):
                 if cid:
                     category_id_to_name[cid] = n
                     category_id_ci[cid.lower()] = n
-            categories_json = d.get('categories', '')
-            if categories_json:
+            categories_data = pin_category_slots(d)
+            if categories_data:
                 try:
-                    categories_data = json.loads(categories_json)
                     for cat_data in categories_data:
                         slot = self.add_category_slot()
                         cat_id = (cat_data.get('cat_id', '') or '').strip()
@@ -7983,7 +8311,7 @@ class MapEditor(ctk.CTkToplevel):
                     pass
         
             # 後方互換性：旧形式のデータから読み込む
-            if not categories_json:
+            if not categories_data:
                 category = d.get('category', '')
                 item_id = d.get('item_id', '')
             
@@ -8129,8 +8457,8 @@ class MapEditor(ctk.CTkToplevel):
         aid = (tpl.get("attribute_id") or "").strip()
         d = {
             "attribute": aid,
-            "obj_attributes": json.dumps(tpl.get("obj_attributes", {})),
-            "categories": json.dumps(tpl.get("categories", [])),
+            "obj_attributes": tpl.get("obj_attributes", {}),
+            "categories": tpl.get("categories", []),
             "importance": tpl.get("importance", ""),
             "memo_jp": "",
             "memo_en": "",
@@ -1,10 +1,31 @@
 # -*- coding: utf-8 -*-
 """
 ブログ出力レイヤー: ピンデータの ID をマスタから表示名に解決し、ブログ用にエクスポートする。
+
+pins_export.json は CSV を 1 行ずつ読んで解決したそばから書き出す（全件のリストを持たない）。
+incremental=True では出力の隣のマニフェスト（pins_export.json.manifest.json）に
+ピンごとの「行ハッシュ・出力内の位置・参照したマスタ項目」を残し、次回は行も参照マスタも
+変わっていないピンを解決せずに前回出力のバイト列からそのまま写す。マニフェストは incremental=True のときか、
+既にある場合（出力と食い違わないよう更新する）だけ書く。
+
+write_sharded_pins_export は同じ解決結果を tiles/{z}/{x}/{y} と同じ格子で分け、
+pins_shards/{z}/{x}/{y}.json（compact）と pins_shards/index.json（範囲・件数）に書き出す。
+サイトは表示範囲に掛かる区画だけ取りに行けばよい。
+
+どちらもエディタの保存ジャーナル（.save_journal.jsonl）に確定済みのピン操作があれば CSV に当ててから読む
+（圧縮されるまで、直近の保存は CSV に入っていない）。
 """
 import os
 import json
 import csv
+import hashlib
+import tempfile
+from contextlib import contextmanager
+
+from .pin_record import PIN_CSV_FIELDS, PinRecord, pin_category_slots, pin_object_attributes, pin_row_to_csv
+from .pin_store import pin_record_from_blob, read_pin_csv
+from .save_journal import KIND_PIN, SaveJournal, apply_ops, save_journal_path
+from .tile_pyramid import TILE_SIZE, pyramid_geometry
 
 
 def link_url_with_anchor_fragment(base_url: str, anchor_fragment: str) -> str:
@@ -27,67 +48,96 @@ def _load_config(game_path):
         return json.load(f)
 
 
-def _load_pins_csv(game_path, save_file="master_data.csv"):
-    path = os.path.join(game_path, save_file)
-    if not os.path.exists(path):
-        return []
-    rows = []
-    with open(path, "r", encoding="utf-8-sig") as f:
+def _pin_csv_cells(pin):
+    """PinRecord → DictReader で読んだのと同じ「列名 → 文字列」の行。"""
+    row = pin_row_to_csv(pin)
+    return {k: "" if row.get(k) is None else str(row[k]) for k in PIN_CSV_FIELDS}
+
+
+@contextmanager
+def _open_pin_csv_rows(game_path, csv_path):
+    """
+    (列名, 行の iterable)。行は DictReader と同じ「列名 → 文字列」の dict。
+    保存ジャーナルに確定済みのピン操作があれば CSV に当てた結果（この場合だけ全行をメモリに読む）、
+    無ければ CSV をそのまま 1 行ずつ流す。CSV もジャーナルも無ければ行は空。
+    """
+    ops = SaveJournal(save_journal_path(game_path)).read(KIND_PIN)
+    if ops:
+        rows = read_pin_csv(csv_path) if os.path.exists(csv_path) else []
+        yield list(PIN_CSV_FIELDS), (_pin_csv_cells(d) for d in apply_ops(rows, ops, pin_record_from_blob))
+        return
+    if not os.path.exists(csv_path):
+        yield [], iter(())
+        return
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
         reader = csv.DictReader(f)
+        yield list(reader.fieldnames or []), reader
+
+
+def _iter_pins_csv(game_path, save_file="master_data.csv"):
+    """CSV（+ 保存ジャーナル）のピンを 1 行ずつ PinRecord で返す（座標が不正な行は飛ばす）。"""
+    path = os.path.join(game_path, save_file)
+    with _open_pin_csv_rows(game_path, path) as (_columns, reader):
         for row in reader:
             try:
-                row["x"] = float(row["x"])
-                row["y"] = float(row["y"])
-            except (ValueError, KeyError):
+                yield PinRecord.from_csv_row(row)
+            except ValueError:
                 continue
-            rows.append(dict(row))
-    return rows
 
 
-def resolve_pin_for_display(pin, config):
+def _load_pins_csv(game_path, save_file="master_data.csv"):
+    return list(_iter_pins_csv(game_path, save_file))
+
+
+class PinDisplayResolver:
     """
-    1本のピンを、マスタから表示名を解決した「ブログ用」の辞書に変換する。
-    pin: CSV 1行相当の辞書（uid, x, y, attribute, obj_attributes, categories, ...）
-    config: config.json の内容
-    戻り値: id, coords, obj_id, obj_jp, obj_en, obj_props, contents[], importance, memo_jp, memo_en, updated_at, link_url_jp, link_url_en
+    config.json のマスタから表示名の索引（カテゴリ ID → JP/EN、分類名 → アイテム、
+    オブジェクト ID → JP/EN）を 1 回だけ作り、ピンを何本でも解決する。
+    エディタ（ピンプレビュー）・エクスポートで共有する。config を読み直したら作り直すこと。
     """
-    attr_mapping = config.get("attr_mapping", {})
-    category_master = config.get("category_master", {})
-    item_master = config.get("item_master", {})
-
-    # cat_id → 表示名
-    cat_id_to_jp = {}
-    cat_id_to_en = {}
-    for name_jp, info in category_master.items():
-        if isinstance(info, dict) and info.get("id"):
-            cat_id_to_jp[info["id"]] = name_jp
-            cat_id_to_en[info["id"]] = info.get("name_en", name_jp)
-
-    obj_id = pin.get("attribute") or pin.get("category_pin") or ""
-    obj_info = attr_mapping.get(obj_id, {})
-    if isinstance(obj_info, dict):
-        obj_jp = obj_info.get("name_jp", obj_id)
-        obj_en = (pin.get("obj_name_en") or "").strip() or obj_info.get("name_en", "")
-    else:
-        obj_jp = obj_id
-        obj_en = (pin.get("obj_name_en") or "").strip() or ""
 
-    obj_props = {}
-    raw = pin.get("obj_attributes", "")
-    if raw:
-        try:
-            obj_props = json.loads(raw)
-        except (TypeError, json.JSONDecodeError):
-            pass
+    def __init__(self, config):
+        config = config if isinstance(config, dict) else {}
+        attr_mapping = config.get("attr_mapping", {}) or {}
+        category_master = config.get("category_master", {}) or {}
+        item_master = config.get("item_master", {}) or {}
 
-    contents = []
-    raw_cat = pin.get("categories", "")
-    if raw_cat:
-        try:
-            cat_list = json.loads(raw_cat)
-        except (TypeError, json.JSONDecodeError):
-            cat_list = []
-        for slot in cat_list:
+        # オブジェクト ID → (JP, マスタの EN)。dict でない定義は ID をそのまま JP にする
+        self._objects = {}
+        for obj_id, info in attr_mapping.items():
+            if isinstance(info, dict):
+                self._objects[obj_id] = (info.get("name_jp", obj_id), info.get("name_en", ""))
+            else:
+                self._objects[obj_id] = (obj_id, "")
+
+        # cat_id → 表示名
+        self.cat_id_to_jp = {}
+        self.cat_id_to_en = {}
+        for name_jp, info in category_master.items():
+            if isinstance(info, dict) and info.get("id"):
+                self.cat_id_to_jp[info["id"]] = name_jp
+                self.cat_id_to_en[info["id"]] = info.get("name_en", name_jp)
+
+        # 分類名 → {アイテム ID: 定義}（マスタの入れ子のまま引く）
+        self._items = {c: items for c, items in item_master.items() if isinstance(items, dict)}
+
+    def resolve(self, pin):
+        """
+        1本のピンを、マスタから表示名を解決した「ブログ用」の辞書に変換する。
+        pin: CSV 1行相当の辞書（uid, x, y, attribute, obj_attributes, categories, ...）。
+             categories / obj_attributes はパース済み（PinRecord）でも JSON 文字列でもよい。
+        戻り値: id, coords, obj_id, obj_jp, obj_en, obj_props, contents[], importance, memo_jp, memo_en, updated_at, link_url_jp, link_url_en
+        """
+        obj_id = pin.get("attribute") or pin.get("category_pin") or ""
+        obj_jp, obj_en_master = self._objects.get(obj_id, (obj_id, ""))
+        obj_en = (pin.get("obj_name_en") or "").strip() or obj_en_master
+
+        obj_props = dict(pin_object_attributes(pin))
+
+        cat_id_to_jp = self.cat_id_to_jp
+        cat_id_to_en = self.cat_id_to_en
+        contents = []
+        for slot in pin_category_slots(pin):
             cat_id = slot.get("cat_id", "")
             category = slot.get("category", "")
             cat_jp = cat_id_to_jp.get(cat_id) or category
@@ -97,10 +147,11 @@ def resolve_pin_for_display(pin, config):
             item_jp = slot.get("item_name_jp", "")
             # ピン側のアイテム(EN)上書きがあればそのまま、なければマスタから解決
             item_en = (slot.get("item_name_en") or "").strip()
-            if item_id and category in item_master and item_id in item_master.get(category, {}):
-                item_jp = item_master[category][item_id].get("name_jp", item_jp)
+            item = self._items.get(category, {}).get(item_id) if item_id else None
+            if isinstance(item, dict):
+                item_jp = item.get("name_jp", item_jp)
                 if not item_en:
-                    item_en = item_master[category][item_id].get("name_en", "")
+                    item_en = item.get("name_en", "")
             contents.append({
                 "cat_id": cat_id,
                 "cat_jp": cat_jp,
@@ -112,48 +163,404 @@ def resolve_pin_for_display(pin, config):
                 "props": slot.get("attributes", {})
             })
 
-    out = {
-        "id": pin.get("uid", ""),
-        "coords": [pin.get("x", 0), pin.get("y", 0)],
-        "obj_id": obj_id,
-        "obj_jp": obj_jp,
-        "obj_en": obj_en,
-        "obj_props": obj_props,
-        "contents": contents,
-        "importance": pin.get("importance", ""),
-        "memo_jp": pin.get("memo_jp", ""),
-        "memo_en": pin.get("memo_en", ""),
-        "updated_at": pin.get("updated_at", ""),
-        "link_url_jp": link_url_with_anchor_fragment(
-            (pin.get("link_url_jp") or "").strip(),
-            (pin.get("link_anchor") or "").strip(),
-        ),
-        "link_url_en": link_url_with_anchor_fragment(
-            (pin.get("link_url_en") or "").strip(),
-            (pin.get("link_anchor") or "").strip(),
-        ),
+        link_anchor = (pin.get("link_anchor") or "").strip()
+        out = {
+            "id": pin.get("uid", ""),
+            "coords": [pin.get("x", 0), pin.get("y", 0)],
+            "obj_id": obj_id,
+            "obj_jp": obj_jp,
+            "obj_en": obj_en,
+            "obj_props": obj_props,
+            "contents": contents,
+            "importance": pin.get("importance", ""),
+            "memo_jp": pin.get("memo_jp", ""),
+            "memo_en": pin.get("memo_en", ""),
+            "updated_at": pin.get("updated_at", ""),
+            "link_url_jp": link_url_with_anchor_fragment((pin.get("link_url_jp") or "").strip(), link_anchor),
+            "link_url_en": link_url_with_anchor_fragment((pin.get("link_url_en") or "").strip(), link_anchor),
+        }
+        puid = (pin.get("parent_uid") or "").strip()
+        if puid:
+            out["parent_uid"] = puid
+        ptype = (pin.get("parent_type") or "").strip()
+        if ptype:
+            out["parent_type"] = ptype
+        return out
+
+    def dependencies(self, pin):
+        """
+        このピンの解決結果が依存するマスタ項目のキー（増分エクスポートの無効化判定用）。
+        "o:<オブジェクト ID>" / "c:<cat_id>" / "i:<分類名>\x1f<アイテム ID>"
+        """
+        obj_id = pin.get("attribute") or pin.get("category_pin") or ""
+        deps = {"o:" + obj_id}
+        for slot in pin_category_slots(pin):
+            deps.add("c:" + str(slot.get("cat_id", "")))
+            item_id = slot.get("item_id", "")
+            if item_id:
+                deps.add("i:" + str(slot.get("category", "")) + "\x1f" + str(item_id))
+        return sorted(deps)
+
+    def master_entry(self, key):
+        """dependencies() のキーに対応する、解決に使うマスタの値（JSON 化できる形。無ければ None）。"""
+        kind, _, ref = key.partition(":")
+        if kind == "o":
+            obj = self._objects.get(ref)
+            return list(obj) if obj is not None else None
+        if kind == "c":
+            if ref not in self.cat_id_to_jp:
+                return None
+            return [self.cat_id_to_jp[ref], self.cat_id_to_en.get(ref)]
+        if kind == "i":
+            category, _, item_id = ref.partition("\x1f")
+            item = self._items.get(category, {}).get(item_id)
+            if not isinstance(item, dict):
+                return None
+            return [item.get("name_jp"), item.get("name_en")]
+        return None
+
+    def resolve_many(self, pins):
+        """複数ピンをまとめて解決（索引は共有）。"""
+        resolve = self.resolve
+        return [resolve(p) for p in pins]
+
+
+def resolve_pin_for_display(pin, config):
+    """
+    1本のピンを表示用に解決する（互換用）。索引を毎回作るので、複数本・繰り返しなら PinDisplayResolver を使う。
+    """
+    return PinDisplayResolver(config).resolve(pin)
+
+
+PINS_EXPORT_MANIFEST_VERSION = 1
+
+
+def pins_export_manifest_path(out_path):
+    return out_path + ".manifest.json"
+
+
+def _csv_row_hash(row):
+    h = hashlib.blake2b(digest_size=8)
+    for k, v in row.items():
+        h.update(f"{k}\x1e{v}\x1f".encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+def _pin_json_chunk(out, compact):
+    """出力ファイル中の 1 ピン分（区切りのカンマ・改行は含まない）。indent=2 の json.dump と同じ見た目にする。"""
+    if compact:
+        text = json.dumps(out, ensure_ascii=False, separators=(",", ":"))
+    else:
+        # 文字列中の改行はエスケープされるので、生の改行は構造上のものだけ
+        text = "    " + json.dumps(out, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+    return text.encode("utf-8")
+
+
+def _load_export_manifest(manifest_path, out_path, compact, fieldnames_key):
+    """前回のマニフェスト。出力ファイルが書き換わっている・形式が違うなら None（全件出し直し）。"""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            m = json.load(f)
+        st = os.stat(out_path)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(m, dict) or m.get("version") != PINS_EXPORT_MANIFEST_VERSION:
+        return None
+    if bool(m.get("compact")) != bool(compact) or m.get("columns") != fieldnames_key:
+        return None
+    if m.get("output_size") != st.st_size or m.get("output_mtime_ns") != st.st_mtime_ns:
+        return None
+    if not isinstance(m.get("pins"), dict) or not isinstance(m.get("masters"), list):
+        return None
+    return m
+
+
+def _write_json_atomic(path, data):
+    d = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_pins_export(game_path, output_filename="pins_export.json", compact=False, incremental=False):
+    """
+    CSV（+ 保存ジャーナル）を 1 行ずつ読み、解決したピンをその場で書き出す（一時ファイル + rename）。
+    compact: 改行・インデント無しの本番用。incremental: マニフェストを使い、変わっていないピンは前回出力から写す。
+    戻り値: {"path", "pins", "resolved", "reused", "incremental"}。ピンが 0 本なら path は None（ファイルは書かない）。
+    """
+    config = _load_config(game_path)
+    save_file = config.get("save_file", "master_data.csv")
+    csv_path = os.path.join(game_path, save_file)
+    out_path = os.path.join(game_path, output_filename)
+    manifest_path = pins_export_manifest_path(out_path)
+    keep_manifest = incremental or os.path.exists(manifest_path)
+    stats = {"path": None, "pins": 0, "resolved": 0, "reused": 0, "incremental": False}
+
+    resolver = PinDisplayResolver(config)
+    if compact:
+        head, sep, tail = b'{"pins":[', b",", b"]}"
+    else:
+        head, sep, tail = b'{\n  "pins": [\n', b",\n", b"\n  ]\n}"
+
+    # マスタ項目キー → 今の値（参照されたものだけ引く）
+    master_now = {}
+
+    def master_value(key):
+        if key not in master_now:
+            master_now[key] = resolver.master_entry(key)
+        return master_now[key]
+
+    # 今回のマニフェスト: マスタ項目は番号で参照する
+    masters_keys = []
+    masters_index = {}
+    pins_manifest = {}
+
+    def master_ref(key):
+        i = masters_index.get(key)
+        if i is None:
+            i = len(masters_keys)
+            masters_index[key] = i
+            masters_keys.append(key)
+        return i
+
+    prev = None
+    prev_out = None
+    d = os.path.dirname(out_path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=d)
+    try:
+        with _open_pin_csv_rows(game_path, csv_path) as (columns, reader), os.fdopen(fd, "wb") as f:
+            if incremental:
+                prev = _load_export_manifest(manifest_path, out_path, compact, columns)
+            changed_masters = set()
+            if prev is not None:
+                for i, (key, value) in enumerate(prev["masters"]):
+                    if master_value(key) != value:
+                        changed_masters.add(i)
+                try:
+                    prev_out = open(out_path, "rb")
+                except OSError:
+                    prev = None
+            stats["incremental"] = prev is not None
+
+            pos = 0
+            for row in reader:
+                uid = row.get("uid") or ""
+                row_hash = _csv_row_hash(row)
+                chunk = None
+                hit = prev["pins"].get(uid) if (prev is not None and uid) else None
+                if hit is not None and hit[0] == row_hash and not changed_masters.intersection(hit[3]):
+                    prev_out.seek(hit[1])
+                    chunk = prev_out.read(hit[2])
+                    if len(chunk) == hit[2]:
+                        deps = [prev["masters"][i][0] for i in hit[3]]
+                        stats["reused"] += 1
+                    else:
+                        chunk = None
+                if chunk is None:
+                    try:
+                        pin = PinRecord.from_csv_row(row)
+                    except ValueError:
+                        continue
+                    chunk = _pin_json_chunk(resolver.resolve(pin), compact)
+                    deps = resolver.dependencies(pin)
+                    stats["resolved"] += 1
+                delim = head if stats["pins"] == 0 else sep
+                f.write(delim)
+                pos += len(delim)
+                f.write(chunk)
+                if uid and keep_manifest:
+                    pins_manifest[uid] = [row_hash, pos, len(chunk), [master_ref(k) for k in deps]]
+                pos += len(chunk)
+                stats["pins"] += 1
+            if stats["pins"]:
+                f.write(tail)
+        if prev_out is not None:
+            prev_out.close()
+            prev_out = None
+        if stats["pins"]:
+            # mkstemp は 0600 で作るので、サイトに載せる成果物として通常のファイル権限に戻す
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, out_path)
+            tmp = None
+    finally:
+        if prev_out is not None:
+            prev_out.close()
+        if tmp is not None:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+    if not stats["pins"]:
+        return stats
+
+    stats["path"] = out_path
+    if not keep_manifest:
+        return stats
+    st = os.stat(out_path)
+    manifest = {
+        "version": PINS_EXPORT_MANIFEST_VERSION,
+        "compact": bool(compact),
+        "columns": columns,
+        "output_size": st.st_size,
+        "output_mtime_ns": st.st_mtime_ns,
+        "masters": [[k, master_value(k)] for k in masters_keys],
+        "pins": pins_manifest,
     }
-    puid = (pin.get("parent_uid") or "").strip()
-    if puid:
-        out["parent_uid"] = puid
-    ptype = (pin.get("parent_type") or "").strip()
-    if ptype:
-        out["parent_type"] = ptype
-    return out
+    try:
+        _write_json_atomic(manifest_path, manifest)
+    except OSError:
+        pass
+    return stats
 
 
-def export_pins_to_json(game_path, output_filename="pins_export.json"):
+def export_pins_to_json(game_path, output_filename="pins_export.json", compact=False, incremental=False):
     """
-    game_path の CSV と config を読み、全ピンを表示名解決して JSON に書き出す。
+    game_path の CSV と config を読み、全ピンを表示名解決して JSON に書き出す（write_pins_export の簡易版）。
     戻り値: (出力ファイルの絶対パス, ピン数) または (None, 0) で失敗。
     """
+    stats = write_pins_export(game_path, output_filename, compact=compact, incremental=incremental)
+    if stats["path"] is None:
+        return None, 0
+    return stats["path"], stats["pins"]
+
+
+PIN_SHARDS_DIRNAME = "pins_shards"
+PIN_SHARDS_INDEX_VERSION = 1
+# 既定の区画: 最大ズームのタイル 8×8 枚分（一辺 2048px）
+DEFAULT_PIN_SHARD_ZOOM_OFFSET = 3
+
+
+def map_max_zoom(game_path, config):
+    """地図タイルの最大ズーム（tiles/ の数字フォルダ。無ければ orig_w / orig_h から計算）。"""
+    tile_dir = os.path.join(game_path, "tiles")
+    if os.path.isdir(tile_dir):
+        zooms = [int(d) for d in os.listdir(tile_dir) if d.isdigit()]
+        if zooms:
+            return max(zooms)
+    try:
+        w = int(float(config.get("orig_w") or 0))
+        h = int(float(config.get("orig_h") or 0))
+    except (TypeError, ValueError):
+        w = h = 0
+    return pyramid_geometry(w, h)[0]
+
+
+def _write_bytes_atomic(path, data):
+    d = os.path.dirname(path)
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=d)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_sharded_pins_export(game_path, shard_zoom=None, output_dirname=PIN_SHARDS_DIRNAME):
+    """
+    全ピンを表示名解決し（export_pins_to_json と同じ PinDisplayResolver）、地図タイルと同じ
+    {z}/{x}/{y} の区画ごとに compact JSON で書き出す。索引 index.json には区画ごとの
+    ピンの外接矩形（ピン座標＝最大ズームの画素）と件数を入れる。
+    shard_zoom: 区画のズーム（None なら config の pin_shard_zoom、無ければ最大ズーム − 3）。
+    戻り値: {"path"（索引）, "pins", "shards", "zoom", "removed"}。ピンが 0 本なら path は None。
+    """
     config = _load_config(game_path)
     save_file = config.get("save_file", "master_data.csv")
-    pins = _load_pins_csv(game_path, save_file)
-    if not pins:
-        return None, 0
-    resolved = [resolve_pin_for_display(p, config) for p in pins]
-    out_path = os.path.join(game_path, output_filename)
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump({"pins": resolved}, f, indent=2, ensure_ascii=False)
-    return out_path, len(resolved)
+    max_zoom = map_max_zoom(game_path, config)
+    if shard_zoom is None:
+        shard_zoom = config.get("pin_shard_zoom")
+    try:
+        shard_zoom = int(shard_zoom)
+    except (TypeError, ValueError):
+        shard_zoom = max_zoom - DEFAULT_PIN_SHARD_ZOOM_OFFSET
+    shard_zoom = min(max(0, shard_zoom), max_zoom)
+    # 区画一辺（ピン座標）と区画数
+    shard_px = TILE_SIZE * (2 ** (max_zoom - shard_zoom))
+    n_side = 2 ** shard_zoom
+
+    resolver = PinDisplayResolver(config)
+    # (tx, ty) -> [バイト列の list, 件数, minx, miny, maxx, maxy]
+    buckets = {}
+    total = 0
+    for pin in _iter_pins_csv(game_path, save_file):
+        out = resolver.resolve(pin)
+        x, y = float(pin["x"]), float(pin["y"])
+        # 台紙の外（負の座標など）は端の区画に入れる
+        tx = min(max(int(x // shard_px), 0), n_side - 1)
+        ty = min(max(int(y // shard_px), 0), n_side - 1)
+        b = buckets.get((tx, ty))
+        if b is None:
+            b = buckets[(tx, ty)] = [[], 0, x, y, x, y]
+        b[0].append(json.dumps(out, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+        b[1] += 1
+        b[2], b[3] = min(b[2], x), min(b[3], y)
+        b[4], b[5] = max(b[4], x), max(b[5], y)
+        total += 1
+
+    out_dir = os.path.join(game_path, output_dirname)
+    index_path = os.path.join(out_dir, "index.json")
+    stats = {"path": None, "pins": total, "shards": len(buckets), "zoom": shard_zoom, "removed": 0}
+    if not total:
+        return stats
+
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            old_index = json.load(f)
+        old_files = {s["path"] for s in old_index.get("shards", []) if isinstance(s, dict) and s.get("path")}
+    except (OSError, ValueError, AttributeError, TypeError):
+        old_files = set()
+
+    shards = []
+    for (tx, ty) in sorted(buckets):
+        chunks, count, minx, miny, maxx, maxy = buckets[(tx, ty)]
+        rel = f"{shard_zoom}/{tx}/{ty}.json"
+        _write_bytes_atomic(os.path.join(out_dir, *rel.split("/")), b'{"pins":[' + b",".join(chunks) + b"]}")
+        shards.append({
+            "x": tx,
+            "y": ty,
+            "path": rel,
+            "count": count,
+            "bounds": [minx, miny, maxx, maxy],
+        })
+
+    index = {
+        "version": PIN_SHARDS_INDEX_VERSION,
+        "zoom": shard_zoom,
+        "max_zoom": max_zoom,
+        "tile_size": TILE_SIZE,
+        "shard_px": shard_px,
+        "total": total,
+        "shards": shards,
+    }
+    _write_bytes_atomic(index_path, json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+    # 前回あって今回無い区画ファイルを消す（索引を書き換えた後なので参照されない）
+    live = {s["path"] for s in shards}
+    for rel in old_files - live:
+        p = os.path.normpath(os.path.join(out_dir, *str(rel).split("/")))
+        if not p.startswith(os.path.normpath(out_dir) + os.sep):
+            continue
+        try:
+            os.remove(p)
+            stats["removed"] += 1
+            # 空になった {z}/{x} フォルダも片付ける（索引のある out_dir 自体は空にならない）
+            os.removedirs(os.path.dirname(p))
+        except OSError:
+            pass
+    stats["path"] = index_path
+    return stats
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+ガイドページ候補（リンク欄のページ選択コンボ）の検索索引。
+
+候補一覧（guide_page_links.json + REST 同期結果）が変わったときに 1 回だけ作り、検索欄のキー入力ごとには
+索引を引くだけにする。
+
+- 正規化: NFKC + 小文字（全角英数・半角カナの揺れを吸収）。検索対象は slug・日英タイトル・URL・一覧ラベル。
+- 照合: 従来どおり部分一致。日本語は単語区切りが無いので、文字 2-gram の転置索引で候補を絞ってから
+  部分一致を確かめる（1 文字の検索はどうせ大半に当たるので、正規化済みの文字列を順に見るだけにする）。
+- 順位: タイトルの先頭一致 → タイトル中の語頭一致 → タイトルの部分一致 → その他（slug・URL など）。
+  同順位は元の並び順。空の検索は元の並び順のまま全件。
+- ラベル: コンボ用のラベル（重複時の「 (2)」付け）は作成時に全件まとめて振る（検索ごとに振り直さない）。
+"""
+from __future__ import annotations
+
+import operator
+import re
+import unicodedata
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+SIDES = ("jp", "en")
+_WORD_START = re.compile(r"(?:^|[\s\-_/·｜|【】()（）\[\]「」『』、。,.:;!?！？])(?=\S)")
+
+
+def normalize_search_text(s: Any) -> str:
+    return unicodedata.normalize("NFKC", "" if s is None else str(s)).lower()
+
+
+def _bigrams(s: str) -> Set[str]:
+    return set(map(operator.add, s, s[1:]))
+
+
+class GuideLinkSearchIndex:
+    """
+    pages: 候補ページ（dict）のリスト。label(pg, side) は一覧ラベル（side=None は検索用の日英併記）、
+    pick_url(pg, side) はその欄に入れる URL（空ならその欄の候補にしない）。
+    """
+
+    def __init__(
+        self,
+        pages: Sequence[Dict[str, Any]],
+        label: Callable[[Dict[str, Any], Optional[str]], str],
+        pick_url: Callable[[Dict[str, Any], str], str],
+    ):
+        self.pages = pages
+        self._blobs: List[str] = []
+        self._titles: Dict[str, List[str]] = {s: [] for s in SIDES}
+        # タイトル中の語頭位置（先頭以外）。語頭一致の順位付けに使う
+        self._word_starts: Dict[str, List[Tuple[int, ...]]] = {s: [] for s in SIDES}
+        # side -> [(ページ番号, ラベル)]（元の並び順）
+        self._entries: Dict[str, List[Tuple[int, str]]] = {s: [] for s in SIDES}
+        # 2-gram -> ページ番号（昇順）
+        self._postings: Dict[str, List[int]] = {}
+        # 使用済みラベルと、ラベルごとに次に試す番号（重複のたびに先頭から数え直さない）
+        used: Dict[str, Set[str]] = {s: set() for s in SIDES}
+        next_no: Dict[str, Dict[str, int]] = {s: {} for s in SIDES}
+        for i, pg in enumerate(pages):
+            if not isinstance(pg, dict):
+                self._blobs.append("")
+                for s in SIDES:
+                    self._titles[s].append("")
+                    self._word_starts[s].append(())
+                continue
+            parts = [
+                str(pg.get("slug") or ""),
+                str(pg.get("title_jp") or ""),
+                str(pg.get("title_en") or ""),
+                str(pg.get("url_jp") or ""),
+                str(pg.get("url_en") or ""),
+                label(pg, None) or "",
+            ]
+            blob = normalize_search_text(" ".join(parts))
+            self._blobs.append(blob)
+            for g in _bigrams(blob):
+                lst = self._postings.get(g)
+                if lst is None:
+                    self._postings[g] = [i]
+                else:
+                    lst.append(i)
+            tj = normalize_search_text(pg.get("title_jp"))
+            te = normalize_search_text(pg.get("title_en"))
+            self._titles["jp"].append(tj or te)
+            self._titles["en"].append(te or tj)
+            for s in SIDES:
+                t = self._titles[s][-1]
+                self._word_starts[s].append(tuple(m.end() for m in _WORD_START.finditer(t) if m.end() > 0))
+            for s in SIDES:
+                if not pick_url(pg, s):
+                    continue
+                base = label(pg, s)
+                if not base:
+                    continue
+                lab = base
+                if lab in used[s]:
+                    n = next_no[s].get(base, 2)
+                    lab = f"{base} ({n})"
+                    while lab in used[s]:
+                        n += 1
+                        lab = f"{base} ({n})"
+                    next_no[s][base] = n + 1
+                used[s].add(lab)
+                self._entries[s].append((i, lab))
+        self._entry_pos: Dict[str, Dict[int, int]] = {
+            s: {i: k for k, (i, _lab) in enumerate(self._entries[s])} for s in SIDES
+        }
+
+    def _candidates(self, q: str) -> Iterable[int]:
+        """q を含みうるページ番号。"""
+        if len(q) < 2:
+            return range(len(self._blobs))
+        lists = []
+        for g in _bigrams(q):
+            p = self._postings.get(g)
+            if not p:
+                return ()
+            lists.append(p)
+        lists.sort(key=len)
+        out = set(lists[0])
+        for p in lists[1:]:
+            out.intersection_update(p)
+            if not out:
+                break
+        return out
+
+    def _rank(self, i: int, q: str, side: str) -> int:
+        t = self._titles[side][i]
+        if t.startswith(q):
+            return 0
+        if q not in t:
+            return 3
+        for p in self._word_starts[side][i]:
+            if t.startswith(q, p):
+                return 1
+        return 2
+
+    def search(self, side: str, query: str) -> List[Tuple[Dict[str, Any], str]]:
+        """side（"jp" / "en"）のコンボ候補を [(ページ, ラベル)] で返す。"""
+        entries = self._entries[side]
+        q = normalize_search_text(query).strip()
+        if not q:
+            return [(self.pages[i], lab) for i, lab in entries]
+        cand = self._candidates(q)
+        pos = self._entry_pos[side]
+        hits = [i for i in cand if i in pos and q in self._blobs[i]]
+        hits.sort(key=lambda i: (self._rank(i, q, side), pos[i]))
+        return [(self.pages[i], entries[pos[i]][1]) for i in hits]
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+エディタの画像キャッシュ（地図タイルの PIL 画像・タイル PhotoImage・ピン PhotoImage）を
+1 つのバイト予算で管理する LRU。
+
+以前は種類ごとに件数上限（384 / 320 / 200）だったが、56px のピンと拡大済みタイル（一辺 362px 以上の RGBA）
+では 1 件の重さが 100 倍以上違うため、実際の画素バイト数で数えて全体の合計を予算内に収める。
+追い出しは種類をまたいだ最終利用順。種類（region）ごとにヒット・ミス・追い出し件数を数える。
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_BUDGET_MB = 256
+
+_BYTES_PER_PIXEL = {"1": 1, "L": 1, "P": 1, "LA": 2, "RGB": 3, "RGBA": 4, "RGBX": 4, "I": 4, "F": 4}
+
+
+def image_nbytes(value: Any) -> int:
+    """PIL 画像 / Tk PhotoImage（およびそれを先頭に含むタプル）の画素バイト数の見積もり。"""
+    if isinstance(value, (tuple, list)):
+        return sum(image_nbytes(v) for v in value)
+    size = getattr(value, "size", None)
+    mode = getattr(value, "mode", None)
+    if isinstance(size, tuple) and len(size) == 2 and isinstance(mode, str):
+        return int(size[0]) * int(size[1]) * _BYTES_PER_PIXEL.get(mode, 4)
+    w = getattr(value, "width", None)
+    h = getattr(value, "height", None)
+    if callable(w) and callable(h):
+        # Tk の写真イメージは 1 画素 4 バイトで持つ
+        try:
+            return int(w()) * int(h()) * 4
+        except Exception:
+            return 0
+    return 0
+
+
+class ImageCacheRegion:
+    """1 種類分の窓口。dict 風に使えるが、get / get_or_create だけがヒット・ミスを数える。"""
+
+    def __init__(self, manager: "ImageCacheManager", name: str):
+        self._manager = manager
+        self.name = name
+        self.entries = 0
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _key(self, key: Hashable) -> Tuple[str, Hashable]:
+        return (self.name, key)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._key(key) in self._manager._entries
+
+    def __len__(self) -> int:
+        return self.entries
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """利用順も統計も変えずに見る（先読み対象の判定など）。"""
+        hit = self._manager._entries.get(self._key(key))
+        return default if hit is None else hit[0]
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        value = self._manager._touch(self._key(key))
+        if value is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, nbytes: Optional[int] = None) -> Any:
+        size = image_nbytes(value) if nbytes is None else int(nbytes)
+        self._manager._put(self, self._key(key), value, size)
+        return value
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, factory())
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        return self._manager._remove(self._key(key), default)
+
+    def clear(self) -> None:
+        for k in [k for k in self._manager._entries if k[0] == self.name]:
+            self._manager._remove(k, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": self.entries,
+            "bytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class ImageCacheManager:
+    """全 region 共通の LRU。合計バイト数が budget_bytes を超えたら最終利用の古いものから捨てる。"""
+
+    def __init__(self, budget_bytes: int = DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.budget_bytes = max(1, int(budget_bytes))
+        self.total_bytes = 0
+        # (region 名, キー) -> (値, バイト数, region)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[Any, int, ImageCacheRegion]]" = OrderedDict()
+        self._regions: Dict[str, ImageCacheRegion] = {}
+
+    def region(self, name: str) -> ImageCacheRegion:
+        reg = self._regions.get(name)
+        if reg is None:
+            reg = ImageCacheRegion(self, name)
+            self._regions[name] = reg
+        return reg
+
+    def set_budget(self, budget_bytes: int) -> None:
+        self.budget_bytes = max(1, int(budget_bytes))
+        self._evict(keep=None)
+
+    def _touch(self, full_key: Tuple[str, Hashable]) -> Any:
+        hit = self._entries.get(full_key)
+        if hit is None:
+            return None
+        self._entries.move_to_end(full_key)
+        return hit[0]
+
+    def _put(self, reg: ImageCacheRegion, full_key: Tuple[str, Hashable], value: Any, nbytes: int) -> None:
+        self._remove(full_key, None)
+        self._entries[full_key] = (value, nbytes, reg)
+        reg.entries += 1
+        reg.nbytes += nbytes
+        self.total_bytes += nbytes
+        self._evict(keep=full_key)
+
+    def _remove(self, full_key: Tuple[str, Hashable], default: Any) -> Any:
+        hit = self._entries.pop(full_key, None)
+        if hit is None:
+            return default
+        value, nbytes, reg = hit
+        reg.entries -= 1
+        reg.nbytes -= nbytes
+        self.total_bytes -= nbytes
+        return value
+
+    def _evict(self, keep: Optional[Tuple[str, Hashable]]) -> None:
+        # 入れた直後の 1 件は予算より大きくても残す（今の描画で使うため）
+        while self.total_bytes > self.budget_bytes and self._entries:
+            oldest = next(iter(self._entries))
+            if oldest == keep:
+                break
+            reg = self._entries[oldest][2]
+            self._remove(oldest, None)
+            reg.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "budget_bytes": self.budget_bytes,
+            "total_bytes": self.total_bytes,
+            "regions": {name: reg.stats() for name, reg in self._regions.items()},
+        }
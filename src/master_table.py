@@ -0,0 +1,207 @@
+# -*- coding: utf-8 -*-
+"""
+環境設定（マスタ管理）の表を仮想化して描く。
+
+行ごとにウィジェットを作る代わりに、行のデータは「行モデル」（tk 変数と素の値の dict）で持ち、
+ウィジェットは画面に見えている行数ぶんの「スロット」だけ作る。スクロールしたらスロットに別の行モデルを
+結び直す（entry / combobox / checkbox は textvariable / variable を差し替えるだけなので、入力内容は
+行モデル側に残る）。アイテムが 1000 行を超えても、開くときに作るウィジェットは数十行分で済む。
+
+- rows: 表示する行モデルのリスト。呼び出し側のリストをそのまま持つので、追加・削除・並び替えの後は refresh()。
+- build_slot(parent) -> dict: スロット 1 つ分のウィジェットを作る（"frame" は表側で用意して渡す）。
+- bind_slot(slot, row): スロットに行モデルを結ぶ。unbind_slot(slot, row): 外す（任意）。
+スクロールは行単位。スロットの並び・高さは固定（row_height）。
+"""
+from __future__ import annotations
+
+import math
+import tkinter as tk
+from typing import Any, Callable, Dict, List, Optional
+
+import customtkinter as ctk
+
+Slot = Dict[str, Any]
+Row = Dict[str, Any]
+
+_WHEEL_ROWS = 3
+
+
+class VirtualRowTable(ctk.CTkFrame):
+    def __init__(
+        self,
+        master,
+        rows: List[Row],
+        build_slot: Callable[[tk.Frame], Slot],
+        bind_slot: Callable[[Slot, Row], None],
+        unbind_slot: Optional[Callable[[Slot, Row], None]] = None,
+        row_height: int = 36,
+        bg: str = "#2b2b2b",
+        **kwargs,
+    ):
+        kwargs.setdefault("fg_color", bg)
+        super().__init__(master, **kwargs)
+        self.rows = rows
+        self._build_slot = build_slot
+        self._bind_slot = bind_slot
+        self._unbind_slot = unbind_slot
+        self._row_h_base = row_height
+        self._bg = bg
+        self._slots: List[Slot] = []
+        self._first = 0
+        self._body = tk.Frame(self, bg=bg, highlightthickness=0, bd=0)
+        self._body.pack(side="left", fill="both", expand=True, padx=(4, 0), pady=4)
+        self._bar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self._bar.pack(side="right", fill="y", padx=2, pady=4)
+        self._body.bind("<Configure>", lambda _e: self.refresh())
+        # CTkScrollableFrame と同じく bind_all で受け、ポインタがこの表の中にあるときだけ動かす
+        self.bind_all("<MouseWheel>", self._on_wheel, add="+")
+        self.bind_all("<Button-4>", self._on_wheel, add="+")
+        self.bind_all("<Button-5>", self._on_wheel, add="+")
+
+    # --- 寸法 ---
+
+    def _row_px(self) -> int:
+        return max(1, int(round(self._apply_widget_scaling(self._row_h_base))))
+
+    def _body_height(self) -> int:
+        try:
+            return max(0, self._body.winfo_height())
+        except tk.TclError:
+            return 0
+
+    def _full_rows(self) -> int:
+        """欠けずに見える行数。"""
+        return max(1, self._body_height() // self._row_px())
+
+    def _max_first(self) -> int:
+        return max(0, len(self.rows) - self._full_rows())
+
+    # --- スロット ---
+
+    def _ensure_slots(self) -> None:
+        need = max(1, math.ceil(self._body_height() / self._row_px()))
+        while len(self._slots) < need:
+            holder = tk.Frame(self._body, bg=self._bg, highlightthickness=0, bd=0)
+            slot = self._build_slot(holder)
+            slot["frame"] = holder
+            slot["row"] = None
+            self._slots.append(slot)
+
+    def _attach(self, slot: Slot, row: Optional[Row]) -> None:
+        old = slot.get("row")
+        if old is row:
+            return
+        if old is not None and self._unbind_slot is not None:
+            self._unbind_slot(slot, old)
+        slot["row"] = row
+        if row is not None:
+            self._bind_slot(slot, row)
+
+    def slots(self) -> List[Slot]:
+        """作ってあるスロット（見えていないものも含む）。列幅の更新などに使う。"""
+        return list(self._slots)
+
+    def refresh(self, rebind: bool = False) -> None:
+        """rows の今の内容でスロットを結び直す。rebind=True なら同じ行のままのスロットも結び直す。"""
+        try:
+            if not self._body.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        self._ensure_slots()
+        self._first = min(max(0, self._first), self._max_first())
+        h = self._row_px()
+        n = len(self.rows)
+        for k, slot in enumerate(self._slots):
+            i = self._first + k
+            row = self.rows[i] if i < n and k * h < max(h, self._body_height()) else None
+            if rebind and row is not None and slot.get("row") is row:
+                self._bind_slot(slot, row)
+            else:
+                self._attach(slot, row)
+            if row is None:
+                slot["frame"].place_forget()
+            else:
+                slot["frame"].place(x=0, y=k * h, relwidth=1.0, height=h)
+        if n == 0:
+            self._bar.set(0.0, 1.0)
+        else:
+            self._bar.set(self._first / n, min(1.0, (self._first + self._full_rows()) / n))
+
+    def clear(self) -> None:
+        """全スロットから行モデルを外す（rows を入れ替える前に呼ぶ）。"""
+        for slot in self._slots:
+            self._attach(slot, None)
+            slot["frame"].place_forget()
+        self._first = 0
+
+    # --- スクロール ---
+
+    def _scroll_to_first(self, first: int) -> None:
+        first = min(max(0, int(first)), self._max_first())
+        if first == self._first:
+            return
+        # 入力中の欄が別の行に結び直されるので、フォーカスは表の外へ逃がす
+        try:
+            focus = self.focus_get()
+        except (tk.TclError, KeyError):
+            focus = None
+        if focus is not None and str(focus).startswith(str(self._body)):
+            self._body.focus_set()
+        self._first = first
+        self.refresh()
+
+    def _on_scrollbar(self, *args) -> None:
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to_first(round(float(args[1]) * len(self.rows)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= self._full_rows()
+            self._scroll_to_first(self._first + step)
+
+    def _on_wheel(self, event) -> None:
+        try:
+            if not self.winfo_exists() or not self.winfo_ismapped():
+                return
+            w = self.winfo_containing(event.x_root, event.y_root)
+        except (tk.TclError, KeyError):
+            return
+        if w is None or not str(w).startswith(str(self)):
+            return
+        if getattr(event, "num", None) == 4:
+            delta = -1
+        elif getattr(event, "num", None) == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self._scroll_to_first(self._first + delta * _WHEEL_ROWS)
+
+    def scroll_to_end(self) -> None:
+        self._scroll_to_first(self._max_first())
+
+    def see(self, index: int) -> None:
+        """rows[index] が見える位置までスクロールする。"""
+        full = self._full_rows()
+        if index < self._first:
+            self._scroll_to_first(index)
+        elif index >= self._first + full:
+            self._scroll_to_first(index - full + 1)
+
+    def index_at_y_root(self, y_root: int) -> int:
+        """
+        画面上の y に行を落としたときの挿入位置（行の中央より上なら、その行の位置）。
+        見えていない行も等間隔に並んでいるものとして数える。
+        """
+        n = len(self.rows)
+        if n == 0:
+            return 0
+        h = self._row_px()
+        try:
+            top = self._body.winfo_rooty()
+        except tk.TclError:
+            return n - 1
+        k = math.floor((y_root - top - h / 2) / h) + 1
+        return min(max(0, self._first + k), n - 1)
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+ピン表示フィルタ（PinFilterWindow のチェック状態）をコンパイルした述語。
+
+Tk の BooleanVar はチェック変更時に 1 回だけ読み、オン/オフを frozenset に固めておく。
+描画のたびのピン判定は集合の所属チェックだけになり、結果は行ごとにキャッシュする
+（フィルタが変わるとオブジェクトごと作り直されるのでキャッシュも自動的に捨てられる）。
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple
+
+from .pin_record import pin_category_slots
+
+# 空オブジェクト ID のピンはこの ID としてオブジェクトフィルタに掛ける
+DEFAULT_OBJECT_ID = "MISC_OTHER"
+
+
+def _row_signature(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (
+        row.get("__draft__"),
+        row.get("attribute"),
+        row.get("category_pin"),
+        row.get("categories"),
+        row.get("name_jp"),
+    )
+
+
+@dataclass(frozen=True)
+class PinDisplayFilter:
+    """
+    disabled_objects: 非表示にするオブジェクト ID
+    enabled_cat_ids / enabled_item_ids: None はその種別のフィルタ無効（すべてオン）
+    cat_name_to_id: カテゴリ表示名 → cat_id（旧データの category 名だけのスロット用）
+    """
+
+    disabled_objects: FrozenSet[str] = frozenset()
+    enabled_cat_ids: Optional[FrozenSet[str]] = None
+    cat_name_to_id: Mapping[str, str] = field(default_factory=dict)
+    enabled_item_ids: Optional[FrozenSet[str]] = None
+    incomplete_only: bool = False
+    _results: Dict[int, Tuple[Tuple[Any, ...], bool]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    def _evaluate(self, row: Dict[str, Any]) -> bool:
+        if row.get("__draft__"):
+            return True
+        attr_key = (row.get("attribute") or row.get("category_pin") or "").strip() or DEFAULT_OBJECT_ID
+        if attr_key in self.disabled_objects:
+            return False
+        enabled_c = self.enabled_cat_ids
+        enabled_i = self.enabled_item_ids
+        if enabled_c is not None or enabled_i is not None:
+            cats = [c for c in pin_category_slots(row) if isinstance(c, dict)]
+            if cats and enabled_c is not None:
+                ok = False
+                for c in cats:
+                    cid = (c.get("cat_id") or "").strip()
+                    if cid and cid in enabled_c:
+                        ok = True
+                        break
+                    cname = (c.get("category") or "").strip()
+                    if cname and (self.cat_name_to_id.get(cname, cname) in enabled_c or cname in enabled_c):
+                        ok = True
+                        break
+                if not ok:
+                    return False
+            if cats and enabled_i is not None:
+                if not any((c.get("item_id") or "").strip() in enabled_i for c in cats):
+                    return False
+        if self.incomplete_only:
+            if row.get("name_jp") and row.get("categories"):
+                return False
+        return True
+
+    def passes(self, row: Dict[str, Any]) -> bool:
+        """row を表示するか。行の関連列が前回判定時と同じならキャッシュを返す。"""
+        sig = _row_signature(row)
+        key = id(row)
+        hit = self._results.get(key)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+        ok = self._evaluate(row)
+        self._results[key] = (sig, ok)
+        return ok
+
+    def prune(self, live_rows: int) -> None:
+        if len(self._results) > max(1024, 2 * int(live_rows)):
+            self._results.clear()
+
+
+def compile_pin_display_filter(
+    object_flags: Mapping[str, bool],
+    cat_flags: Mapping[str, bool],
+    item_flags: Mapping[str, bool],
+    incomplete_only: bool,
+    category_master: Mapping[str, Any],
+) -> PinDisplayFilter:
+    """
+    object_flags: オブジェクト ID → 表示
+    cat_flags: cat_id（id 無しはカテゴリ名）→ 表示
+    item_flags: "グループ\\tアイテムID" → 表示。アイテム ID がどれかのグループでオンなら表示扱い
+    """
+    disabled_objects = frozenset(k for k, on in object_flags.items() if not on)
+
+    enabled_cat_ids: Optional[FrozenSet[str]] = None
+    if cat_flags and not all(cat_flags.values()):
+        enabled_cat_ids = frozenset(k for k, on in cat_flags.items() if on)
+
+    enabled_item_ids: Optional[FrozenSet[str]] = None
+    if item_flags and not all(item_flags.values()):
+        enabled_item_ids = frozenset(
+            k.split("\t", 1)[-1] for k, on in item_flags.items() if on
+        )
+
+    cat_name_to_id: Dict[str, str] = {}
+    for name, info in (category_master or {}).items():
+        if isinstance(info, dict) and info.get("id"):
+            cat_name_to_id[name] = info["id"]
+
+    return PinDisplayFilter(
+        disabled_objects=disabled_objects,
+        enabled_cat_ids=enabled_cat_ids,
+        cat_name_to_id=cat_name_to_id,
+        enabled_item_ids=enabled_item_ids,
+        incomplete_only=bool(incomplete_only),
+    )
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+メモリ上のピン 1 件（master_data.csv の 1 行）。
+
+CSV では categories / obj_attributes を JSON 文字列のセルで持つが、メモリ上では
+読込時に一度だけパースして list / dict で保持し、JSON へ戻すのは CSV 書き出し時だけにする。
+JSON として読めないセルは元の文字列のまま持ち、書き出し時もそのまま戻す。
+エディタ・プレビュー・エクスポートで共通に使う。
+
+既存コードは行を dict として d.get(...) で読むため、PinRecord は dict のサブクラスにしている
+（列の追加・並びは CSV と同じ。__slots__ で余計なインスタンス辞書は持たない）。
+旧来の「JSON 文字列のまま」の行も pin_category_slots / pin_object_attributes で同じように読める。
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List
+
+# CSV の列（書き出し順）。新しいフィールドと後方互換性のためのフィールドを含める。
+PIN_CSV_FIELDS: List[str] = [
+    "uid", "x", "y", "name_jp", "name_en", "attribute", "obj_name_en", "obj_attributes",
+    "category", "categories", "importance", "category_pin", "contents", "memo_jp", "memo_en",
+    "updated_at", "link_url_jp", "link_url_en", "link_anchor", "marker_display_style",
+    "parent_uid", "parent_type",
+]
+
+# 旧 CSV に列が無い場合に補う既定値（categories / obj_attributes は構造化データ側で補う）
+_MISSING_COLUMN_DEFAULTS = (
+    "contents", "category", "obj_name_en", "importance", "updated_at",
+    "link_url_jp", "link_url_en", "link_anchor", "marker_display_style",
+    "parent_uid", "parent_type",
+)
+
+
+def parse_category_slots(value: Any) -> List[Dict[str, Any]]:
+    """categories セル（list または JSON 文字列）→ スロット list。不正・空は []。"""
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str) and value.strip():
+        try:
+            data = json.loads(value)
+        except (TypeError, ValueError):
+            return []
+        return data if isinstance(data, list) else []
+    return []
+
+
+def parse_object_attributes(value: Any) -> Dict[str, Any]:
+    """obj_attributes セル（dict または JSON 文字列）→ dict。不正・空は {}。"""
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, str) and value.strip():
+        try:
+            data = json.loads(value)
+        except (TypeError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+    return {}
+
+
+def pin_category_slots(pin: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """ピン行のカテゴリスロット。PinRecord ならパース済みをそのまま返す（書き換え禁止）。"""
+    if not isinstance(pin, dict):
+        return []
+    return parse_category_slots(pin.get("categories"))
+
+
+def pin_object_attributes(pin: Dict[str, Any]) -> Dict[str, Any]:
+    """ピン行のオブジェクト属性。PinRecord ならパース済みをそのまま返す（書き換え禁止）。"""
+    if not isinstance(pin, dict):
+        return {}
+    return parse_object_attributes(pin.get("obj_attributes"))
+
+
+def _parsed_or_raw(value: Any, parse: Any, typ: type) -> Any:
+    """
+    セルを parse した結果。JSON として読めない（または型が違う）セルは元の文字列のまま返す
+    （手で直した CSV の壊れたセルを、保存のたびに空へ潰さないため。読む側は parse_* が [] / {} 扱いにする）。
+    """
+    if isinstance(value, str) and value.strip():
+        try:
+            data = json.loads(value)
+        except (TypeError, ValueError):
+            return value
+        return data if isinstance(data, typ) else value
+    return parse(value)
+
+
+def _json_cell(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if not value:
+        return ""
+    return json.dumps(value, ensure_ascii=False)
+
+
+class PinRecord(dict):
+    """categories は list、obj_attributes は dict（読めないセルは元の文字列）、x / y は float で持つピン行。"""
+
+    __slots__ = ()
+
+    @classmethod
+    def from_csv_row(cls, row: Dict[str, Any]) -> "PinRecord":
+        """
+        csv.DictReader の 1 行から作る。旧形式の列名・欠損列もここで吸収する。
+        座標が数値でない行は ValueError（呼び出し側でスキップ等を決める）。
+        """
+        d = cls(row)
+        try:
+            d["x"] = float(row["x"])
+            d["y"] = float(row["y"])
+        except (TypeError, KeyError) as e:
+            raise ValueError(f"invalid pin coordinates: {e}") from e
+
+        # 後方互換性：旧形式のデータを新形式に変換
+        if "category_main" in row and not row.get("category_pin"):
+            d["category_pin"] = row["category_main"]
+        if "category_pin" in row and "attribute" not in row:
+            d["attribute"] = d.get("category_pin", "MISC_OTHER")
+        for k in _MISSING_COLUMN_DEFAULTS:
+            if k not in row:
+                d[k] = ""
+        d["categories"] = _parsed_or_raw(row.get("categories"), parse_category_slots, list)
+        d["obj_attributes"] = _parsed_or_raw(row.get("obj_attributes"), parse_object_attributes, dict)
+        return d
+
+    @property
+    def category_slots(self) -> List[Dict[str, Any]]:
+        return pin_category_slots(self)
+
+    @property
+    def object_attributes(self) -> Dict[str, Any]:
+        return pin_object_attributes(self)
+
+
+def pin_row_to_csv(pin: Dict[str, Any]) -> Dict[str, Any]:
+    """CSV 書き出し用の行（categories / obj_attributes を JSON 文字列へ）。"""
+    out = dict(pin)
+    out["categories"] = _json_cell(pin.get("categories"))
+    out["obj_attributes"] = _json_cell(pin.get("obj_attributes"))
+    return out
@@ -7,7 +7,7 @@ from __future__ import annotations
 
 import html
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
 def _s(v: Any) -> str:
@@ -595,22 +595,33 @@ def normalize_resolved_content_for_map_js(c: Dict) -> Dict:
     return out
 
 
+def compile_preview_rule_tables(config: Dict) -> Tuple[Optional[Dict], Dict]:
+    """
+    ポップアップ用の (category_special_rules, skill_name_master の id→名前) を config から作る。
+    ピンに依存しないので、呼び出し側は config が変わるまで使い回せる（build_preview_bundle の rule_tables）。
+    """
+    from . import category_special_rules_builder as _csrb
+
+    cfg = dict(config) if isinstance(config, dict) else {}
+    _csrb.sync_category_special_rules_from_master(cfg)
+    csr = cfg.get("category_special_rules") if isinstance(cfg.get("category_special_rules"), dict) else None
+    snm = _csrb.skill_name_master_to_dict(cfg)
+    return csr, snm
+
+
 def build_preview_bundle(
     resolved_pin: Dict,
     csv_row: Dict,
     config: Dict,
     filter_mode: bool = False,
     filter_tooltip_text: str = "",
+    rule_tables: Optional[Tuple[Optional[Dict], Dict]] = None,
 ) -> Dict[str, str]:
     """
     戻り値: hover_tooltip_jp/en, popup_plain_jp/en（サイト相当テキスト）
+    rule_tables: compile_preview_rule_tables(config) の結果。省略時はその場で作る。
     """
-    from . import category_special_rules_builder as _csrb
-
-    cfg = dict(config) if isinstance(config, dict) else {}
-    _csrb.sync_category_special_rules_from_master(cfg)
-    csr = cfg.get("category_special_rules") if isinstance(cfg.get("category_special_rules"), dict) else None
-    snm = _csrb.skill_name_master_to_dict(cfg)
+    csr, snm = rule_tables if rule_tables is not None else compile_preview_rule_tables(config)
 
     contents = [
         normalize_resolved_content_for_map_js(dict(x))
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+ピンの空間インデックス（画像座標の一様グリッド）。
+
+エディタのクリック当たり判定とビューポート外ピンの描画スキップに使う。
+行は data_list の dict をそのまま参照し、描画順（data_list の並び）を ordinal で保持する。
+追加・移動・削除・ドラッグ時は upsert / remove で差分更新し、data_list が作り直された場合は rebuild する。
+"""
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# 1 セルの一辺（画像座標 px）。地図 8k〜16k 四方で 32〜64 セル四方程度。
+DEFAULT_CELL_SIZE = 256.0
+
+Cell = Tuple[int, int]
+
+
+def _row_key(row: Dict[str, Any]) -> int:
+    # uid は保存前に重複し得る（ドラフト等）ため、行オブジェクトの同一性で管理する
+    return id(row)
+
+
+def _row_xy(row: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    try:
+        x = float(row["x"])
+        y = float(row["y"])
+    except (TypeError, ValueError, KeyError):
+        return None
+    if math.isnan(x) or math.isnan(y):
+        return None
+    return x, y
+
+
+class PinSpatialIndex:
+    """ピン行をグリッドセルに振り分け、点近傍・矩形内の候補を描画順で返す。"""
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = float(cell_size) if cell_size and cell_size > 0 else DEFAULT_CELL_SIZE
+        self._cells: Dict[Cell, Dict[int, Dict[str, Any]]] = {}
+        # key -> (cell, ordinal)
+        self._entries: Dict[int, Tuple[Cell, int]] = {}
+        self._next_ordinal = 0
+        # rebuild 元の list と想定件数（作り直し・追加削除の検知用）
+        self.source: Optional[List[Dict[str, Any]]] = None
+        self._source_len = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _cell_of(self, x: float, y: float) -> Cell:
+        cs = self.cell_size
+        return int(math.floor(x / cs)), int(math.floor(y / cs))
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._entries.clear()
+        self._next_ordinal = 0
+        self.source = None
+        self._source_len = 0
+
+    def rebuild(self, rows: List[Dict[str, Any]]) -> None:
+        """rows（data_list）の並び順を描画順として全件を登録し直す。"""
+        self.clear()
+        for row in rows:
+            self.upsert(row)
+        self.source = rows
+        self._source_len = len(rows)
+
+    def is_stale_for(self, rows: List[Dict[str, Any]]) -> bool:
+        """data_list が差し替え・追加削除されていて、このインデックスが追随していないか。"""
+        return self.source is not rows or self._source_len != len(rows)
+
+    def upsert(self, row: Dict[str, Any]) -> None:
+        """行を追加、または座標変更を反映する（既存行の描画順は維持）。"""
+        if not isinstance(row, dict):
+            return
+        key = _row_key(row)
+        xy = _row_xy(row)
+        old = self._entries.get(key)
+        if xy is None:
+            if old is not None:
+                self.remove(row)
+            return
+        cell = self._cell_of(*xy)
+        if old is not None:
+            old_cell, ordinal = old
+            if old_cell == cell:
+                return
+            bucket = self._cells.get(old_cell)
+            if bucket is not None:
+                bucket.pop(key, None)
+                if not bucket:
+                    del self._cells[old_cell]
+        else:
+            ordinal = self._next_ordinal
+            self._next_ordinal += 1
+            self._source_len += 1
+        self._cells.setdefault(cell, {})[key] = row
+        self._entries[key] = (cell, ordinal)
+
+    def remove(self, row: Dict[str, Any]) -> None:
+        key = _row_key(row)
+        old = self._entries.pop(key, None)
+        if old is None:
+            return
+        self._source_len = max(0, self._source_len - 1)
+        bucket = self._cells.get(old[0])
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._cells[old[0]]
+
+    def _collect(self, x0: float, y0: float, x1: float, y1: float) -> List[Dict[str, Any]]:
+        if x1 < x0:
+            x0, x1 = x1, x0
+        if y1 < y0:
+            y0, y1 = y1, y0
+        cx0, cy0 = self._cell_of(x0, y0)
+        cx1, cy1 = self._cell_of(x1, y1)
+        found: List[Tuple[int, Dict[str, Any]]] = []
+        n_cells = (cx1 - cx0 + 1) * (cy1 - cy0 + 1)
+        if n_cells > len(self._cells):
+            # 広域（全体表示など）は空セルを舐めず、占有セルだけを見る
+            cells: Iterable[Tuple[Cell, Dict[int, Dict[str, Any]]]] = (
+                (c, b) for c, b in self._cells.items() if cx0 <= c[0] <= cx1 and cy0 <= c[1] <= cy1
+            )
+        else:
+            cells = (
+                ((cx, cy), self._cells[(cx, cy)])
+                for cx in range(cx0, cx1 + 1)
+                for cy in range(cy0, cy1 + 1)
+                if (cx, cy) in self._cells
+            )
+        for _cell, bucket in cells:
+            for key, row in bucket.items():
+                xy = _row_xy(row)
+                if xy is None:
+                    continue
+                if x0 <= xy[0] <= x1 and y0 <= xy[1] <= y1:
+                    found.append((self._entries[key][1], row))
+        found.sort(key=lambda t: t[0])
+        return [row for _o, row in found]
+
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float) -> List[Dict[str, Any]]:
+        """画像座標の矩形内にあるピン（描画順）。"""
+        return self._collect(x0, y0, x1, y1)
+
+    def query_near(self, x: float, y: float, radius: float) -> List[Dict[str, Any]]:
+        """画像座標 (x, y) から各軸 radius 以内のピン（描画順。当たり判定の候補用）。"""
+        rad = max(0.0, float(radius))
+        return self._collect(x - rad, y - rad, x + rad, y + rad)
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+ピンの SQLite ストア（master_data.csv の隣に置く任意の保存先）。
+
+CSV 保存は毎回全行を書き直し、読込は全行の JSON セルのパースと旧形式の列補完をやり直す。
+config の pin_store を "sqlite" にすると、エディタはこのストアを正本として使う。
+
+- 列: seq（並び順）, uid, x, y, attribute と、行全体の JSON（categories / obj_attributes はパース済みの形）
+- 読込: 行 JSON を 1 回 loads するだけで PinRecord になる（列補完は取り込み時に済んでいる）
+- 保存: 前回保存時の行 JSON と比べ、変わった行だけ UPSERT、消えた行だけ DELETE（1 トランザクション）
+- CSV は派生物: export_csv で一時ファイル + rename で書き出す（エディタは閉じるとき等）。
+  ストアは「最後に同期した CSV の署名（mtime, サイズ）」と「未書き出しの変更があるか」を覚えていて、
+  CSV が外部で書き換えられ、ストアに未書き出しの変更が無ければ CSV から取り込み直す。
+"""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .pin_record import PIN_CSV_FIELDS, PinRecord, pin_row_to_csv
+
+PIN_STORE_SCHEMA_VERSION = 1
+PIN_STORE_SQLITE = "sqlite"
+
+
+def pin_store_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".sqlite3"
+
+
+def file_signature(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [int(st.st_mtime_ns), int(st.st_size)]
+
+
+_STRUCTURED_EMPTY = {"categories": list, "obj_attributes": dict}
+_COORD_FIELDS = ("x", "y")
+
+
+def pin_row_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    ストア・ジャーナルに残す列。CSV に書いて PinRecord.from_csv_row で読み直したのと同じ形にする
+    （CSV の列だけ・無い列は空・x / y は float・それ以外は文字列。categories / obj_attributes はパース済みのまま）。
+    __draft__ などメモリ上だけの印や旧形式の余分な列はここで落ちる。
+    """
+    out: Dict[str, Any] = {}
+    get = row.get
+    for k in PIN_CSV_FIELDS:
+        v = get(k)
+        if type(v) is str and k not in _STRUCTURED_EMPTY and k not in _COORD_FIELDS:
+            out[k] = v
+        elif k in _STRUCTURED_EMPTY:
+            out[k] = v if v else _STRUCTURED_EMPTY[k]()
+        elif k in _COORD_FIELDS:
+            n = _num(v)
+            out[k] = n if n is not None else ("" if v is None else str(v))
+        else:
+            out[k] = "" if v is None else str(v)
+    return out
+
+
+def pin_row_blob(row: Dict[str, Any]) -> str:
+    """ストアに入れる行 JSON（差分判定にも使う）。"""
+    return json.dumps(pin_row_fields(row), ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def pin_record_from_blob(row: Dict[str, Any]) -> PinRecord:
+    """ストア・ジャーナルの行 → PinRecord（以前の版が書いた余分なキーもここで落とす）。"""
+    return PinRecord(pin_row_fields(row))
+
+
+def row_keys(rows: List[Dict[str, Any]]) -> List[str]:
+    """行の鍵（uid。空・重複は位置付きの代替鍵）。"""
+    keys: List[str] = []
+    seen = set()
+    for i, d in enumerate(rows):
+        k = str(d.get("uid") or "").strip()
+        if not k or k in seen:
+            k = f"\x00row{i}:{k}"
+        seen.add(k)
+        keys.append(k)
+    return keys
+
+
+def read_pin_csv(csv_path: str) -> List[PinRecord]:
+    """CSV を PinRecord のリストに（座標が不正な行は飛ばす）。"""
+    rows: List[PinRecord] = []
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                rows.append(PinRecord.from_csv_row(row))
+            except ValueError:
+                continue
+    return rows
+
+
+def write_pin_csv_atomic(csv_path: str, rows: Iterable[Dict[str, Any]]) -> None:
+    """CSV を一時ファイルに書いてから置き換える（書き込み途中で落ちても元の CSV は壊れない）。"""
+    d = os.path.dirname(csv_path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".csv", dir=d)
+    try:
+        with os.fdopen(fd, "w", newline="", encoding="utf-8-sig") as f:
+            writer = csv.DictWriter(f, fieldnames=PIN_CSV_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(pin_row_to_csv(d) for d in rows)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, csv_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class SqlitePinStore:
+    """1 ゲーム分のピンストア。メソッドはスレッドをまたいで呼んでよい（内部でロックする）。"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pins ("
+                " uid TEXT PRIMARY KEY, seq INTEGER NOT NULL,"
+                " x REAL, y REAL, attribute TEXT, row_json TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS pins_seq ON pins (seq)")
+        if self._meta("schema") not in (None, str(PIN_STORE_SCHEMA_VERSION)):
+            self._reset()
+        self._set_meta("schema", str(PIN_STORE_SCHEMA_VERSION))
+        # uid -> 前回保存（読込）時の行 JSON。並び順は _order
+        self._saved: Dict[str, str] = {}
+        self._order: List[str] = []
+        self._seq: Dict[str, int] = {}
+        self._next_seq = 0
+
+    # --- meta ---
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key: str, value: Optional[str]) -> None:
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _reset(self) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM pins")
+            self._conn.execute("DELETE FROM meta")
+
+    @property
+    def csv_dirty(self) -> bool:
+        """CSV へ書き出していない変更があるか。"""
+        with self._lock:
+            return self._meta("csv_dirty") == "1"
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM pins LIMIT 1").fetchone() is None
+
+    def csv_changed_externally(self, csv_path: str) -> bool:
+        """最後に同期してから CSV がストアの外で書き換えられたか。"""
+        with self._lock:
+            return json.dumps(file_signature(csv_path)) != (self._meta("csv_sig") or "null")
+
+    # --- 読込 ---
+    def load(self) -> List[PinRecord]:
+        with self._lock:
+            rows: List[PinRecord] = []
+            saved: Dict[str, str] = {}
+            order: List[str] = []
+            seqs: Dict[str, int] = {}
+            for uid, seq, row_json in self._conn.execute("SELECT uid, seq, row_json FROM pins ORDER BY seq"):
+                rows.append(pin_record_from_blob(json.loads(row_json)))
+                saved[uid] = row_json
+                order.append(uid)
+                seqs[uid] = seq
+            self._saved, self._order, self._seq = saved, order, seqs
+            self._next_seq = (max(seqs.values()) + 1) if seqs else 0
+            return rows
+
+    def import_csv(self, csv_path: str) -> List[PinRecord]:
+        """CSV から全行を取り込み直す（ストアの内容は置き換え）。"""
+        rows = read_pin_csv(csv_path)
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM pins")
+            self._saved, self._order, self._seq, self._next_seq = {}, [], {}, 0
+            # uid が重複・空の行があってもストアには入れられるよう、save と同じ規則で鍵を振る
+            self.save(rows, mark_csv_dirty=False)
+            self._set_meta("csv_sig", json.dumps(file_signature(csv_path)))
+            self._set_meta("csv_dirty", "0")
+        return rows
+
+    # --- 保存 ---
+    def save(self, rows: List[Dict[str, Any]], mark_csv_dirty: bool = True) -> Dict[str, int]:
+        """
+        rows（エディタの data_list）を保存する。前回から変わった行だけ書く。
+        戻り値: {"upserted", "deleted", "reordered"}。
+        """
+        keys = row_keys(rows)
+        blobs = [pin_row_blob(d) for d in rows]
+        with self._lock:
+            saved = self._saved
+            live = set(keys)
+            deleted = [k for k in saved if k not in live]
+            # 既存行の相対順が同じで、新しい行が末尾にだけ増えたなら seq は振り直さない
+            survivors = [k for k in self._order if k in live]
+            reorder = keys[: len(survivors)] != survivors
+            upserts: List[Tuple[Any, ...]] = []
+            seqs: Dict[str, int] = {} if reorder else {k: self._seq[k] for k in survivors}
+            next_seq = 0 if reorder else self._next_seq
+            for k, d, blob in zip(keys, rows, blobs):
+                if k not in seqs:
+                    seqs[k] = next_seq
+                    next_seq += 1
+                elif saved.get(k) == blob:
+                    continue
+                upserts.append((k, seqs[k], _num(d.get("x")), _num(d.get("y")), str(d.get("attribute") or ""), blob))
+            if upserts or deleted:
+                with self._conn:
+                    if deleted:
+                        self._conn.executemany("DELETE FROM pins WHERE uid = ?", [(k,) for k in deleted])
+                    self._conn.executemany(
+                        "INSERT OR REPLACE INTO pins (uid, seq, x, y, attribute, row_json) VALUES (?, ?, ?, ?, ?, ?)",
+                        upserts,
+                    )
+                    if mark_csv_dirty:
+                        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_dirty', '1')")
+            self._saved = dict(zip(keys, blobs))
+            self._order = keys
+            self._seq = seqs
+            self._next_seq = next_seq
+        return {"upserted": len(upserts), "deleted": len(deleted), "reordered": int(reorder)}
+
+    # --- CSV 書き出し ---
+    def export_csv(self, csv_path: str) -> int:
+        """ストアの内容で CSV を書き直す（派生物）。書いた行数を返す。"""
+        with self._lock:
+            rows = [
+                pin_record_from_blob(json.loads(row_json))
+                for (row_json,) in self._conn.execute("SELECT row_json FROM pins ORDER BY seq")
+            ]
+            write_pin_csv_atomic(csv_path, rows)
+            self._set_meta("csv_sig", json.dumps(file_signature(csv_path)))
+            self._set_meta("csv_dirty", "0")
+            return len(rows)
+
+    def close(self) -> None:
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
+
+
+def _num(v: Any) -> Optional[float]:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return None
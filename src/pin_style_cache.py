@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""
+ピンの解決済みマーカースタイル（色・アイコン・表示モード・重要度）のキャッシュ。
+
+スタイルは「ピン行のスタイル関連列」と「config のマーカーマスタ」だけで決まるため、
+行ごとに列の署名を覚えておき、署名とマスタ版数が変わらない限り再解決しない。
+解決結果は内容で intern して小さな整数 style_id にし、PhotoImage キャッシュのキーに使う
+（ピンごとの json.dumps をやめ、同じ見た目のピン同士で画像を共有する）。
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# スタイル解決に影響するピン行の列
+STYLE_ROW_FIELDS: Tuple[str, ...] = (
+    "attribute",
+    "category_pin",
+    "categories",
+    "marker_display_style",
+    "importance",
+)
+
+# スタイル解決に影響する config のキー（attr_mapping は type のみ使う）
+STYLE_MASTER_KEYS: Tuple[str, ...] = (
+    "pin_marker_by_attribute",
+    "pin_marker_by_category_id",
+    "pin_marker_by_item_id",
+)
+
+
+def style_master_fingerprint(config: Dict[str, Any]) -> str:
+    """マーカー見た目に関わるマスタ部分だけの指紋。変化したときだけキャッシュを捨てる。"""
+    cfg = config if isinstance(config, dict) else {}
+    part: Dict[str, Any] = {k: cfg.get(k) or {} for k in STYLE_MASTER_KEYS}
+    am = cfg.get("attr_mapping") or {}
+    part["attr_types"] = {
+        k: (v.get("type") if isinstance(v, dict) else None) for k, v in am.items()
+    } if isinstance(am, dict) else {}
+    try:
+        return json.dumps(part, sort_keys=True, ensure_ascii=False, default=str)
+    except (TypeError, ValueError):
+        return repr(part)
+
+
+def _row_signature(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    return tuple(row.get(k) for k in STYLE_ROW_FIELDS)
+
+
+def _freeze_style(style: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((str(k), str(v)) for k, v in style.items()))
+
+
+class ResolvedPinStyleCache:
+    """
+    行（dict の同一性）→ (署名, style_id) のキャッシュと、style_id ⇔ スタイル dict の intern 表。
+    返すスタイル dict は共有物なので呼び出し側で書き換えないこと。
+    """
+
+    def __init__(self):
+        self.master_revision = 0
+        self._master_fp: Optional[str] = None
+        self._by_row: Dict[int, Tuple[Tuple[Any, ...], int]] = {}
+        self._ids: Dict[Tuple[Tuple[str, str], ...], int] = {}
+        self._styles: List[Dict[str, Any]] = []
+
+    def sync_master(self, config: Dict[str, Any]) -> bool:
+        """config 読込後に呼ぶ。マーカーマスタが変わっていれば版数を上げて行キャッシュを捨てる。"""
+        fp = style_master_fingerprint(config)
+        if fp == self._master_fp:
+            return False
+        self._master_fp = fp
+        self.master_revision += 1
+        self._by_row.clear()
+        return True
+
+    def intern(self, style: Dict[str, Any]) -> int:
+        """スタイル内容に対する style_id（同内容なら同じ id）。"""
+        key = _freeze_style(style)
+        sid = self._ids.get(key)
+        if sid is None:
+            sid = len(self._styles)
+            self._ids[key] = sid
+            self._styles.append(dict(style))
+        return sid
+
+    def style(self, style_id: int) -> Dict[str, Any]:
+        return self._styles[style_id]
+
+    def resolve(self, row: Dict[str, Any], resolver: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+        """row のスタイルを (style_id, style) で返す。署名が前回と同じなら resolver を呼ばない。"""
+        sig = _row_signature(row)
+        key = id(row)
+        hit = self._by_row.get(key)
+        if hit is not None and hit[0] == sig:
+            return hit[1], self._styles[hit[1]]
+        sid = self.intern(resolver(row))
+        self._by_row[key] = (sig, sid)
+        return sid, self._styles[sid]
+
+    def prune(self, live_rows: int) -> None:
+        """削除済み行の分が溜まったら行キャッシュを捨てる（id 再利用は署名比較で安全）。"""
+        if len(self._by_row) > max(1024, 2 * int(live_rows)):
+            self._by_row.clear()
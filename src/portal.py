@@ -84,12 +84,17 @@ class Portal(ctk.CTk):
         popup.geometry("350x180")
         popup.title("Processing...")
         popup.attributes("-topmost", True)
-        ctk.CTkLabel(popup, text="タイル化を実行中です...\n完了までお待ちください", font=("Meiryo", 14)).pack(expand=True)
+        lbl = ctk.CTkLabel(popup, text="タイル化を実行中です...\n完了までお待ちください", font=("Meiryo", 14))
+        lbl.pack(expand=True)
         self.update()
 
+        def on_progress(msg):
+            lbl.configure(text=f"タイル化を実行中です...\n{msg}")
+            popup.update()
+
         try:
             # ★ここで utils.py の関数を呼び出す（重複コード削除）
-            orig_w, orig_h = create_tiles_from_image(src_img, target_dir)
+            orig_w, orig_h = create_tiles_from_image(src_img, target_dir, progress=on_progress)
             
             # Config生成
             default_attr_mapping = {
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+ピン・エリア保存の追記専用ジャーナル（<game_path>/.save_journal.jsonl）。
+
+保存のたびに master_data.csv / areas.json を全体書き直しするのをやめ、前回保存からの差分
+（行の upsert / delete）だけを 1 行 1 操作の JSON で追記する。1 回の保存分の最後に commit 行を書いて
+fsync するので、追記の途中で落ちても commit の無い尻切れ分は読込時に捨てられる（本体ファイルは触らない）。
+
+- 読込: load_csv / load_areas が本体を読んだ後に replay で確定済みの操作を当て直す
+- 圧縮: 本体ファイルを一時ファイル + rename で書き直してからジャーナルを消す（閉じるとき・しきい値超過時）。
+  操作は冪等（同じ鍵の upsert は置き換え、delete は無ければ何もしない）なので、rename 後・ジャーナル削除前に
+  落ちても次回の replay で同じ内容になる。
+- 行の並びが変わった保存（既存行の順序入れ替え・途中への挿入）は差分で表せないので、その場で圧縮する。
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from typing import Any, Callable, Dict, List, Optional
+
+from .pin_store import pin_record_from_blob, pin_row_blob, read_pin_csv, row_keys, write_pin_csv_atomic
+
+SAVE_JOURNAL_NAME = ".save_journal.jsonl"
+DEFAULT_COMPACT_KB = 512
+
+KIND_PIN = "pin"
+KIND_AREA = "area"
+
+
+def save_journal_path(game_path: str) -> str:
+    return os.path.join(game_path, SAVE_JOURNAL_NAME)
+
+
+def area_row_blob(area: Dict[str, Any]) -> str:
+    return json.dumps(area, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def write_areas_atomic(areas_path: str, area_list: List[Dict[str, Any]]) -> None:
+    """areas.json を一時ファイル + rename で書く（形式は従来どおり indent=2）。"""
+    d = os.path.dirname(areas_path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"areas": area_list or []}, f, indent=2, ensure_ascii=False)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, areas_path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+class RowSnapshot:
+    """
+    前回保存（読込）時点の行 JSON。diff() で今の行リストとの差分操作を作り、commit() で確定する。
+    """
+
+    def __init__(self, kind: str, blob: Callable[[Dict[str, Any]], str]):
+        self.kind = kind
+        self._blob = blob
+        self._saved: Dict[str, str] = {}
+        self._order: List[str] = []
+        self._pending: Optional[tuple] = None
+
+    def reset(self, rows: List[Dict[str, Any]]) -> None:
+        keys = row_keys(rows)
+        self._saved = {k: self._blob(d) for k, d in zip(keys, rows)}
+        self._order = keys
+        self._pending = None
+
+    def diff(self, rows: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        差分操作のリスト（変化なしなら []）。並びが変わって差分で表せないときは None（全体書き直しが要る）。
+        """
+        keys = row_keys(rows)
+        live = set(keys)
+        survivors = [k for k in self._order if k in live]
+        if keys[: len(survivors)] != survivors:
+            self._pending = None
+            return None
+        blobs = {}
+        ops: List[Dict[str, Any]] = []
+        for k in self._order:
+            if k not in live:
+                ops.append({"op": "delete", "kind": self.kind, "key": k})
+        for k, d in zip(keys, rows):
+            b = self._blob(d)
+            blobs[k] = b
+            if self._saved.get(k) != b:
+                # 行は JSON 文字列ではなくオブジェクトで書く（ジャーナルを人が読めるように）
+                ops.append({"op": "upsert", "kind": self.kind, "key": k, "row": json.loads(b)})
+        self._pending = (blobs, keys)
+        return ops
+
+    def commit(self) -> None:
+        """直前の diff() の内容を保存済みとして確定する。"""
+        if self._pending is not None:
+            self._saved, self._order = self._pending
+            self._pending = None
+
+
+def apply_ops(
+    rows: List[Dict[str, Any]], ops: List[Dict[str, Any]], make_row: Callable[[Dict[str, Any]], Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """本体から読んだ行に操作を当てる。既存の鍵は同じ位置で置き換え、新しい鍵は末尾に足す。"""
+    if not ops:
+        return rows
+    keys = row_keys(rows)
+    by_key: Dict[str, Dict[str, Any]] = dict(zip(keys, rows))
+    order = list(keys)
+    for op in ops:
+        k = op.get("key")
+        if not isinstance(k, str):
+            continue
+        if op.get("op") == "delete":
+            by_key.pop(k, None)
+        elif op.get("op") == "upsert" and isinstance(op.get("row"), dict):
+            if k not in by_key:
+                order.append(k)
+            by_key[k] = make_row(op["row"])
+    seen = set()
+    out = []
+    for k in order:
+        if k in by_key and k not in seen:
+            seen.add(k)
+            out.append(by_key[k])
+    return out
+
+
+class SaveJournal:
+    def __init__(self, path: str):
+        self.path = path
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def read(self, kind: str) -> List[Dict[str, Any]]:
+        """commit まで書かれた操作のうち kind のもの（ファイル順）。壊れた行以降は読まない。"""
+        out: List[Dict[str, Any]] = []
+        batch: List[Dict[str, Any]] = []
+        try:
+            f = open(self.path, "r", encoding="utf-8")
+        except OSError:
+            return out
+        with f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    op = json.loads(line)
+                except ValueError:
+                    break
+                if not isinstance(op, dict):
+                    break
+                if op.get("op") == "commit":
+                    out.extend(batch)
+                    batch = []
+                elif op.get("kind") == kind:
+                    batch.append(op)
+        return out
+
+    def append(self, ops: List[Dict[str, Any]]) -> None:
+        """1 回の保存分を追記して fsync する。"""
+        if not ops:
+            return
+        lines = [json.dumps(op, ensure_ascii=False, separators=(",", ":"), default=str) for op in ops]
+        lines.append(json.dumps({"op": "commit", "n": len(ops)}, separators=(",", ":")))
+        self._truncate_torn_tail()
+        with open(self.path, "a", encoding="utf-8", newline="\n") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _truncate_torn_tail(self) -> None:
+        """前回の追記が途中で切れていたら、最後の commit 行の後ろを切り落とす（続けて書くと読めなくなるため）。"""
+        try:
+            with open(self.path, "rb+") as f:
+                data = f.read()
+                end = data.rfind(b'{"op":"commit"')
+                keep = 0 if end < 0 else data.index(b"\n", end) + 1
+                if keep != len(data):
+                    f.truncate(keep)
+        except (OSError, ValueError):
+            pass
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def load_areas_file(areas_path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(areas_path):
+        return []
+    with open(areas_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    areas = data.get("areas", []) if isinstance(data, dict) else []
+    return [a for a in areas if isinstance(a, dict)]
+
+
+def compact_save_journal(journal: SaveJournal, csv_path: Optional[str], areas_path: str) -> bool:
+    """
+    ディスク上の「本体 + 確定済みジャーナル」を本体へ書き戻してジャーナルを消す（メモリ上の未保存分は含まない）。
+    csv_path が None ならピンは対象外（ピンストア利用時）。ジャーナルが無ければ何もせず False。
+    """
+    if journal.size() == 0:
+        return False
+    if csv_path is not None:
+        pin_ops = journal.read(KIND_PIN)
+        if pin_ops:
+            rows = read_pin_csv(csv_path) if os.path.exists(csv_path) else []
+            write_pin_csv_atomic(csv_path, apply_ops(rows, pin_ops, pin_record_from_blob))
+    area_ops = journal.read(KIND_AREA)
+    if area_ops:
+        write_areas_atomic(areas_path, apply_ops(load_areas_file(areas_path), area_ops, dict))
+    journal.clear()
+    return True
+
+
+def new_pin_snapshot() -> RowSnapshot:
+    return RowSnapshot(KIND_PIN, pin_row_blob)
+
+
+def new_area_snapshot() -> RowSnapshot:
+    return RowSnapshot(KIND_AREA, area_row_blob)
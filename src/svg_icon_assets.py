@@ -8,6 +8,10 @@ SVG マーカーアイコン共通アセット（エディター・エクスポ
 本番（ブラウザ）では map.js 側で、具象色を currentColor に正規化してから「currentColor を #RRGGBB に置換」して表示する。
 
 エディタは refresh_svg_icon_catalog 時に batch_normalize_icon_svgs_inplace でディスク上の SVG も同じルールで上書きする（変更があったファイルのみ）。
+
+svg_file_to_pil_rgba の結果は svg_raster_cache（内容ハッシュ + サイズ + 色 + バックエンドがキー）に載る。
+ラスタ化はサイズごとに白のマスク 1 回で、色違いはマスクのアルファに単色を通して作る。
+set_raster_cache_dir でゲームフォルダ配下を指定するとディスクにも残り、次回起動以降もラスタ化しない。
 """
 from __future__ import annotations
 
@@ -21,6 +25,7 @@ _ID_RE = re.compile(r"^[\w.\-]+$")
 
 _cairo_svg_ok: Optional[bool] = None
 _pymupdf_svg_ok: Optional[bool] = None
+_raster_cache = None
 
 
 def _probe_cairo_svg() -> bool:
@@ -52,6 +57,30 @@ def is_svg_raster_available() -> bool:
     return _probe_cairo_svg() or _probe_pymupdf()
 
 
+def svg_raster_backend_name() -> str:
+    """ラスタ結果キャッシュのキーに入れるバックエンド名（優先して使われる側）。"""
+    if _probe_cairo_svg():
+        return "cairo"
+    if _probe_pymupdf():
+        return "pymupdf"
+    return ""
+
+
+def raster_cache():
+    """モジュール共通の SvgRasterCache（初回呼び出しで作る。Pillow を遅延 import するため）。"""
+    global _raster_cache
+    if _raster_cache is None:
+        from .svg_raster_cache import SvgRasterCache
+
+        _raster_cache = SvgRasterCache()
+    return _raster_cache
+
+
+def set_raster_cache_dir(cache_dir: Optional[str]) -> None:
+    """ラスタ結果の保存先（None でメモリのみ）。エディタはゲームフォルダ配下を渡す。"""
+    raster_cache().set_cache_dir(cache_dir)
+
+
 def common_icons_dir(project_root: str) -> str:
     return os.path.join(project_root, "assets", "icons")
 
@@ -60,6 +89,13 @@ def game_icons_dir(game_path: str) -> str:
     return os.path.join(game_path, "assets", "icons")
 
 
+def _hex6_or_white(hex_color: str) -> str:
+    h = (hex_color or "#ffffff").strip()
+    if not h.startswith("#") or len(h) != 7:
+        h = "#ffffff"
+    return h
+
+
 def replace_current_color(svg_text: str, hex_color: str) -> str:
     """
     SVG 文字列内の currentColor（大文字小文字無視）を指定色に置換。
@@ -67,9 +103,7 @@ def replace_current_color(svg_text: str, hex_color: str) -> str:
     """
     if not svg_text:
         return svg_text
-    h = (hex_color or "#ffffff").strip()
-    if not h.startswith("#") or len(h) != 7:
-        h = "#ffffff"
+    h = _hex6_or_white(hex_color)
     return re.sub(r"currentColor", h, svg_text, flags=re.IGNORECASE)
 
 
@@ -326,28 +360,88 @@ def _svg_text_to_pil_pymupdf(svg_text: str, size_px: int):
             pdf.close()
 
 
-def svg_file_to_pil_rgba(abs_path: str, size_px: int, current_color_hex: str):
-    """
-    SVG を指定サイズの PIL RGBA にラスタ化。currentColor は事前に置換。
-    利用順: cairosvg（Cairo 利用可時）→ PyMuPDF → None。
-    """
-    size_px = max(4, int(round(size_px)))
-    if not is_svg_raster_available():
-        return None
+# 色違いの元になるマスク（白でラスタ化したもの）の色キー
+ICON_MASK_COLOR = "#ffffff"
+_SINGLE_TINT_MIN = 250
+
+
+def _rasterize_svg_file(abs_path: str, size_px: int, color: str):
     try:
         with open(abs_path, "r", encoding="utf-8") as f:
             svg_text = f.read()
     except OSError:
         return None
     svg_text = normalize_svg_paints_to_current_color(svg_text)
-    svg_text = replace_current_color(svg_text, current_color_hex)
+    svg_text = replace_current_color(svg_text, color)
     im = _svg_text_to_pil_cairo(svg_text, size_px)
+    if im is None:
+        im = _svg_text_to_pil_pymupdf(svg_text, size_px)
+    return im
+
+
+def is_single_tint_mask(mask_rgba) -> bool:
+    """
+    白でラスタ化した結果が「白 + アルファ」だけか（url() のグラデーション等が無い単色シルエットか）。
+    白背景に重ねて全画素が白のままなら、任意の色は tint_alpha_mask で作れる。
+    縁の半透明画素は非乗算化の丸めで 254 程度になるので少し許容する。
+    """
+    from PIL import Image
+
+    flat = Image.new("RGBA", mask_rgba.size, (255, 255, 255, 255))
+    flat.alpha_composite(mask_rgba)
+    return all(lo >= _SINGLE_TINT_MIN for lo, _hi in flat.convert("RGB").getextrema())
+
+
+def tint_alpha_mask(mask_rgba, hex_color: str):
+    """マスクのアルファを通して単色を塗った RGBA（ピクセル演算は Pillow 側で一括）。"""
+    from PIL import Image
+
+    h = _hex6_or_white(hex_color)
+    out = Image.new("RGBA", mask_rgba.size, (int(h[1:3], 16), int(h[3:5], 16), int(h[5:7], 16), 255))
+    out.putalpha(mask_rgba.getchannel("A"))
+    return out
+
+
+def warm_icon_mask(abs_path: str, size_px: int, mask_rgba) -> None:
+    """外部で作ったマスク（アトラスから切り出したもの等）をメモリのラスタ結果キャッシュに載せる。"""
+    raster_cache().put(abs_path, int(size_px), ICON_MASK_COLOR, svg_raster_backend_name(), mask_rgba, persist=False)
+
+
+def svg_file_to_pil_rgba(abs_path: str, size_px: int, current_color_hex: str):
+    """
+    SVG を指定サイズの PIL RGBA にラスタ化。currentColor は事前に置換。
+    利用順: ラスタ結果キャッシュ → cairosvg（Cairo 利用可時）→ PyMuPDF → None。
+
+    ラスタ化はサイズごとに白（マスク）で 1 回だけ行い、他の色はマスクのアルファに単色を通して作る
+    （カテゴリ・項目ごとの色上書きが増えてもラスタ化回数は増えない）。色違いはメモリにだけ載せる。
+    単色シルエットでない SVG（グラデーション等）だけは色ごとにラスタ化する。
+    """
+    size_px = max(4, int(round(size_px)))
+    if not is_svg_raster_available():
+        return None
+    color = _hex6_or_white(current_color_hex).lower()
+    backend = svg_raster_backend_name()
+    cache = raster_cache()
+    im = cache.get(abs_path, size_px, color, backend)
     if im is not None:
         return im
-    im = _svg_text_to_pil_pymupdf(svg_text, size_px)
-    if im is not None:
+    mask = cache.get(abs_path, size_px, ICON_MASK_COLOR, backend)
+    if mask is None:
+        mask = _rasterize_svg_file(abs_path, size_px, ICON_MASK_COLOR)
+        if mask is None:
+            return None
+        cache.put(abs_path, size_px, ICON_MASK_COLOR, backend, mask)
+    if color == ICON_MASK_COLOR:
+        return mask
+    if is_single_tint_mask(mask):
+        im = tint_alpha_mask(mask, color)
+        cache.put(abs_path, size_px, color, backend, im, persist=False)
         return im
-    return None
+    im = _rasterize_svg_file(abs_path, size_px, color)
+    if im is None:
+        return None
+    cache.put(abs_path, size_px, color, backend, im)
+    return im
 
 
 def svg_or_placeholder_pil_rgba(abs_path: str, size_px: int, current_color_hex: str):
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+SVG マーカーアイコンのスプライトアトラス（一括ラスタ化 + 1 枚画像 + JSON 索引）。
+
+list_svg_icon_entries の全アイコン（ゲーム側が共通を上書きした後の集合）を、エディタ・サイトで使う各サイズで
+白マスク（currentColor = #ffffff）としてラスタ化し、サイズごとの格子に詰めて 1 枚の PNG / WebP にする。
+色は svg_icon_assets と同じくマスクのアルファに単色を通して付ける前提なので、アトラスは色に依存しない
+（ブラウザでは CSS の mask-image + background-color でそのまま色付けできる）。
+
+- 出力: <game_path>/assets/icon_atlas.png（または .webp）と icon_atlas.json
+- エディタ: 起動時に warm_raster_cache_from_atlas でアトラスを読み、SVG の内容ハッシュが一致するものだけ
+  ラスタ結果キャッシュ（メモリ）に載せる。書き換えられた SVG は従来どおりその場でラスタ化される。
+- サイト（map.js）: 最初のアイコン表示でアトラスと索引を 1 回ずつ取得し、載っているアイコンは枠を canvas で
+  着色して使う（アイコンごとの SVG fetch をしない）。載っていない・読めない場合は従来の SVG fetch に戻る。
+  SVG を差し替えたらアトラスを作り直してから公開すること（サイト側は内容ハッシュを照合しない）。
+
+索引（JSON）:
+  {"version": 1, "image": "icon_atlas.png", "width": W, "height": H, "backend": "pymupdf",
+   "image_hash": "<画像の blake2b>", "sizes": [20, 28, ...],
+   "icons": {"<id>": {"scope": "game", "sha1": "...", "single_tint": true,
+                      "frames": {"28": [x, y, w, h], ...}}}}
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from PIL import Image
+
+from . import svg_icon_assets
+
+ATLAS_VERSION = 1
+ATLAS_BASENAME = "icon_atlas"
+ATLAS_MAX_WIDTH = 2048
+ATLAS_PADDING = 1
+# エディタで使う一辺 px:
+#   マスタ行プレビュー 20 / アイコン選択グリッド 42 / 選択ダイアログのプレビュー 56
+#   地図ピン 28（_PIN_MARKER_PX 56 の viewBox 48 中 24）と重要度 2・4・5 の倍率 0.78 / 1.18 / 1.36 → 22 / 33 / 38
+EDITOR_ICON_SIZES = (20, 22, 28, 33, 38, 42, 56)
+# サイト（map.js）で使う一辺 px: 最大表示は icon_only の 24px × 重要度 5 の 1.4 倍 = 34（等倍用）と、その 2 倍（高 DPI 用）。
+# 合成ピン 13px・グループ表示のチップ 18px もこれを縮小して表示する
+SITE_ICON_SIZES = (34, 68)
+DEFAULT_ATLAS_SIZES = tuple(sorted(set(EDITOR_ICON_SIZES) | set(SITE_ICON_SIZES)))
+
+
+def atlas_paths(game_path: str, fmt: str = "png") -> Dict[str, str]:
+    base = os.path.join(game_path, "assets", ATLAS_BASENAME)
+    return {"image": base + "." + fmt, "index": base + ".json"}
+
+
+def _write_atomic(path: str, write) -> None:
+    d = os.path.dirname(path)
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=os.path.splitext(path)[1], dir=d)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            write(f)
+        # mkstemp は 0600 で作るので、サイトに載せる成果物として通常のファイル権限に戻す
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def build_icon_atlas(
+    project_root: str,
+    game_path: str,
+    sizes: Sequence[int] = DEFAULT_ATLAS_SIZES,
+    fmt: str = "png",
+    max_width: int = ATLAS_MAX_WIDTH,
+    progress=None,
+) -> Dict[str, Any]:
+    """
+    全アイコンを各サイズでラスタ化してアトラスを書く。ラスタ化は svg_file_to_pil_rgba 経由なので
+    ディスクのラスタ結果キャッシュが効く（2 回目以降はほぼ PNG 読み込みだけ）。
+    fmt: "png" または "webp"（WebP はロスレス）。戻り値: 統計（アイコン数・失敗数・出力パスなど）。
+    """
+    fmt = (fmt or "png").lower()
+    if fmt not in ("png", "webp"):
+        raise ValueError(f"unsupported atlas format: {fmt}")
+    if not svg_icon_assets.is_svg_raster_available():
+        raise RuntimeError("SVG をラスタ化できません（cairosvg / PyMuPDF のどちらも使えません）")
+    sizes = sorted({max(4, int(s)) for s in sizes})
+    entries = svg_icon_assets.list_svg_icon_entries(project_root, game_path)
+    cache = svg_icon_assets.raster_cache()
+
+    icons: Dict[str, Dict[str, Any]] = {}
+    failed: List[str] = []
+    # サイズごとの (id, マスク)
+    per_size: Dict[int, List[tuple]] = {s: [] for s in sizes}
+    total = len(entries) * len(sizes)
+    done = 0
+    for e in entries:
+        ap = e["abs_path"]
+        digest = cache.file_digest(ap)
+        masks = {}
+        for s in sizes:
+            im = svg_icon_assets.svg_file_to_pil_rgba(ap, s, svg_icon_assets.ICON_MASK_COLOR)
+            done += 1
+            if progress is not None:
+                progress(done, total)
+            if im is None:
+                break
+            masks[s] = im
+        if digest is None or len(masks) != len(sizes):
+            failed.append(e["id"])
+            continue
+        icons[e["id"]] = {
+            "scope": e["scope"],
+            "sha1": digest,
+            "single_tint": svg_icon_assets.is_single_tint_mask(masks[sizes[-1]]),
+            "frames": {},
+        }
+        for s in sizes:
+            per_size[s].append((e["id"], masks[s]))
+
+    # 同じサイズのアイコンは同じ正方形なので、サイズごとに横 max_width の格子へ詰めて縦に積む
+    placements = []
+    width = 1
+    y = 0
+    for s in sizes:
+        items = per_size[s]
+        if not items:
+            continue
+        cell = s + ATLAS_PADDING
+        cols = max(1, min(len(items), (max_width + ATLAS_PADDING) // cell))
+        for i, (icon_id, im) in enumerate(items):
+            r, c = divmod(i, cols)
+            x0, y0 = c * cell, y + r * cell
+            placements.append((x0, y0, im))
+            icons[icon_id]["frames"][str(s)] = [x0, y0, im.width, im.height]
+        width = max(width, cols * cell - ATLAS_PADDING)
+        y += ((len(items) + cols - 1) // cols) * cell
+    height = max(1, y - ATLAS_PADDING) if placements else 1
+
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    for x0, y0, im in placements:
+        atlas.paste(im, (x0, y0))
+
+    paths = atlas_paths(game_path, fmt)
+    buf = io.BytesIO()
+    if fmt == "webp":
+        atlas.save(buf, format="WEBP", lossless=True, method=6)
+    else:
+        atlas.save(buf, format="PNG", optimize=True)
+    image_bytes = buf.getvalue()
+    _write_atomic(paths["image"], lambda f: f.write(image_bytes))
+    index = {
+        "version": ATLAS_VERSION,
+        "image": os.path.basename(paths["image"]),
+        "width": width,
+        "height": height,
+        "backend": svg_icon_assets.svg_raster_backend_name(),
+        # map.js は画像をこのハッシュ付き URL で取る（中身が同じ間はブラウザキャッシュが効く）
+        "image_hash": hashlib.blake2b(image_bytes, digest_size=8).hexdigest(),
+        "sizes": sizes,
+        "icons": icons,
+    }
+    data = json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    _write_atomic(paths["index"], lambda f: f.write(data))
+    return {
+        "icons": len(icons),
+        "failed": failed,
+        "sizes": sizes,
+        "width": width,
+        "height": height,
+        "image_path": paths["image"],
+        "index_path": paths["index"],
+    }
+
+
+def load_atlas_index(game_path: str) -> Optional[Dict[str, Any]]:
+    path = atlas_paths(game_path)["index"]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != ATLAS_VERSION:
+        return None
+    return index
+
+
+def warm_raster_cache_from_atlas(
+    project_root: str, game_path: str, sizes: Optional[Iterable[int]] = None
+) -> int:
+    """
+    アトラスから切り出したマスクをラスタ結果キャッシュに載せる。載せた件数を返す（アトラスが無ければ 0）。
+    バックエンドが違う・SVG の内容ハッシュが変わったアイコンは使わない（その場のラスタ化に任せる）。
+    """
+    index = load_atlas_index(game_path)
+    if index is None or index.get("backend") != svg_icon_assets.svg_raster_backend_name():
+        return 0
+    img_path = os.path.join(os.path.dirname(atlas_paths(game_path)["index"]), str(index.get("image") or ""))
+    want = None if sizes is None else {str(int(s)) for s in sizes}
+    cache = svg_icon_assets.raster_cache()
+    try:
+        with Image.open(img_path) as f:
+            atlas = f.convert("RGBA")
+    except (OSError, ValueError):
+        return 0
+    warmed = 0
+    for e in svg_icon_assets.list_svg_icon_entries(project_root, game_path):
+        rec = (index.get("icons") or {}).get(e["id"])
+        if not isinstance(rec, dict) or rec.get("scope") != e["scope"]:
+            continue
+        if cache.file_digest(e["abs_path"]) != rec.get("sha1"):
+            continue
+        for size_key, frame in (rec.get("frames") or {}).items():
+            if want is not None and size_key not in want:
+                continue
+            try:
+                x, y, w, h = (int(v) for v in frame)
+            except (TypeError, ValueError):
+                continue
+            svg_icon_assets.warm_icon_mask(e["abs_path"], int(size_key), atlas.crop((x, y, x + w, y + h)))
+            warmed += 1
+    return warmed
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+SVG マーカーアイコンのラスタ結果キャッシュ（内容アドレス方式）。
+
+キーは「SVG ファイル内容のハッシュ + 一辺 px + 色 + ラスタ化バックエンド」。ファイル名ではなく中身で引くので、
+同じ SVG が共通とゲーム側にあっても 1 件で済み、SVG を書き換えれば自然に別キーになる（古い PNG は使われない）。
+
+- メモリ: image_cache.ImageCacheManager の 1 region（バイト予算の LRU）
+- ディスク: <game_path>/.cache/icon_raster/<キー先頭2文字>/<キー>.png（一時ファイル + rename で書く）
+
+ファイル内容のハッシュは (パス, mtime_ns, サイズ) で覚えておくので、ヒット時は stat 1 回と辞書引きだけで済む。
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import threading
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from .image_cache import ImageCacheManager
+
+DEFAULT_MEMORY_BUDGET_MB = 32
+# ラスタ化の前処理（正規化ルールなど）を変えたら上げる。古いディスクキャッシュを読まなくなる
+RASTER_CACHE_VERSION = 1
+
+
+def raster_cache_dir_for_game(game_path: str) -> str:
+    return os.path.join(game_path, ".cache", "icon_raster")
+
+
+class SvgRasterCache:
+    """
+    get(abs_path, size_px, color, backend) → PIL RGBA のコピー（無ければ None）。
+    put(...) で登録（メモリ + ディスク）。cache_dir が None ならメモリのみ。
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB):
+        self.cache_dir = cache_dir or None
+        self._lock = threading.Lock()
+        self._memory = ImageCacheManager(max(1, int(memory_budget_mb)) * 1024 * 1024)
+        self._region = self._memory.region("svg_raster")
+        # abs_path -> ((mtime_ns, size), 内容ハッシュ)
+        self._digests: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self.disk_hits = 0
+        self.disk_writes = 0
+
+    def set_cache_dir(self, cache_dir: Optional[str]) -> None:
+        with self._lock:
+            self.cache_dir = cache_dir or None
+
+    def file_digest(self, abs_path: str) -> Optional[str]:
+        """SVG ファイル内容の SHA-1。stat が変わらない限り読み直さない。"""
+        try:
+            st = os.stat(abs_path)
+        except OSError:
+            return None
+        sig = (int(st.st_mtime_ns), int(st.st_size))
+        with self._lock:
+            hit = self._digests.get(abs_path)
+        if hit is not None and hit[0] == sig:
+            return hit[1]
+        try:
+            with open(abs_path, "rb") as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+        with self._lock:
+            self._digests[abs_path] = (sig, digest)
+        return digest
+
+    @staticmethod
+    def raster_key(digest: str, size_px: int, color: str, backend: str) -> str:
+        raw = f"v{RASTER_CACHE_VERSION}|{digest}|{int(size_px)}|{(color or '').lower()}|{backend}"
+        return hashlib.sha1(raw.encode("ascii", "replace")).hexdigest()
+
+    def _disk_path(self, key: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, key[:2], key + ".png")
+
+    def get_by_key(self, key: str) -> Optional[Image.Image]:
+        with self._lock:
+            im = self._region.get(key)
+        if im is None:
+            path = self._disk_path(key)
+            if not path or not os.path.isfile(path):
+                return None
+            try:
+                with Image.open(path) as f:
+                    im = f.convert("RGBA")
+            except (OSError, ValueError):
+                return None
+            with self._lock:
+                self.disk_hits += 1
+                self._region.put(key, im)
+        # 呼び出し側が描き込んでもキャッシュが汚れないよう複製を返す（アイコンは小さいので安い）
+        return im.copy()
+
+    def put_by_key(self, key: str, im: Image.Image, persist: bool = True) -> None:
+        if im.mode != "RGBA":
+            im = im.convert("RGBA")
+        im = im.copy()
+        with self._lock:
+            self._region.put(key, im)
+        path = self._disk_path(key) if persist else None
+        if not path or os.path.isfile(path):
+            return
+        d = os.path.dirname(path)
+        tmp = None
+        try:
+            os.makedirs(d, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".png", dir=d)
+            with os.fdopen(fd, "wb") as f:
+                im.save(f, format="PNG")
+            os.replace(tmp, path)
+            tmp = None
+            with self._lock:
+                self.disk_writes += 1
+        except OSError:
+            pass
+        finally:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    def get(self, abs_path: str, size_px: int, color: str, backend: str) -> Optional[Image.Image]:
+        digest = self.file_digest(abs_path)
+        if digest is None:
+            return None
+        return self.get_by_key(self.raster_key(digest, size_px, color, backend))
+
+    def put(
+        self, abs_path: str, size_px: int, color: str, backend: str, im: Image.Image, persist: bool = True
+    ) -> None:
+        digest = self.file_digest(abs_path)
+        if digest is None:
+            return
+        self.put_by_key(self.raster_key(digest, size_px, color, backend), im, persist=persist)
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._region.clear()
+            self._digests.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._region.stats())
+            out["disk_hits"] = self.disk_hits
+            out["disk_writes"] = self.disk_writes
+        return out
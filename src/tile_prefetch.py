@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+エディタ地図タイルのバックグラウンド先読み（デコード）。
+
+_refresh_map_do はキャッシュに無いタイルをメインスレッドで開かず、ここへ依頼してその場は背景色のまま描く。
+ワーカースレッドが WebP デコード・RGB 変換を行い（拡大はビューポート合成時に 1 回でまとめてやる）、
+結果はワーカー側で溜めておくだけで、呼び出し側がメインスレッドの after で take_ready() を見に来る
+（ワーカースレッドからは Tk を一切呼ばない。busy の間だけポーリングすればよい）。
+依頼は優先度順（表示中 → 周辺リング → 隣のズーム）のリストで、新しい依頼が来たら未着手分は捨てる。
+"""
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Set, Tuple
+
+from PIL import Image
+
+# (キャッシュキー, タイルファイルパス)
+TileJob = Tuple[str, str]
+
+
+def tile_cache_key(path: str) -> str:
+    """エディタの _tile_pil_cache のキー（等倍タイル 1 枚につき 1 件）。"""
+    return path
+
+
+def decode_tile(path: str) -> Image.Image:
+    """等倍 RGB タイル。"""
+    with Image.open(path) as im:
+        return im.convert("RGB")
+
+
+class TilePrefetcher:
+    """
+    デコード専用のスレッドプール。結果は (キャッシュキー, 画像) で take_ready() から受け取る。
+    """
+
+    def __init__(self, workers: int = 2):
+        self._cond = threading.Condition()
+        self._queue: Deque[TileJob] = deque()
+        self._inflight: Set[str] = set()
+        self._failed: Set[str] = set()
+        self._ready: List[Tuple[str, Image.Image]] = []
+        self._closed = False
+        self._threads: List[threading.Thread] = []
+        for i in range(max(1, int(workers))):
+            t = threading.Thread(target=self._worker, name=f"tile-prefetch-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def request(self, jobs: Iterable[TileJob]) -> None:
+        """未着手の依頼を jobs（優先度順）で置き換える。処理中・失敗済みのキーは積まない。"""
+        with self._cond:
+            if self._closed:
+                return
+            seen: Set[str] = set()
+            queue: Deque[TileJob] = deque()
+            for job in jobs:
+                key = job[0]
+                if key in seen or key in self._inflight or key in self._failed:
+                    continue
+                seen.add(key)
+                queue.append(job)
+            self._queue = queue
+            if queue:
+                self._cond.notify_all()
+
+    def take_ready(self) -> List[Tuple[str, Image.Image]]:
+        """デコード済みを受け取る（メインスレッド用）。"""
+        with self._cond:
+            ready, self._ready = self._ready, []
+        return ready
+
+    @property
+    def busy(self) -> bool:
+        """未着手・デコード中・受け取り待ちのどれかがあるか（False になったらポーリングを止めてよい）。"""
+        with self._cond:
+            return bool(self._queue or self._inflight or self._ready)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._queue.clear()
+            self._ready = []
+            self._cond.notify_all()
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and not self._queue:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key, path = self._queue.popleft()
+                self._inflight.add(key)
+            try:
+                tile: Optional[Image.Image] = decode_tile(path)
+            except (OSError, ValueError):
+                tile = None
+            with self._cond:
+                self._inflight.discard(key)
+                if self._closed:
+                    return
+                if tile is None:
+                    self._failed.add(key)
+                    continue
+                self._ready.append((key, tile))
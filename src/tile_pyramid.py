@@ -0,0 +1,682 @@
+# -*- coding: utf-8 -*-
+"""
+地図画像 → タイルピラミッド（tiles/{z}/{x}/{y}.webp）の生成エンジン。
+
+- 台紙（2^max_zoom × 256 四方、左上寄せ・余白は黒）の座標系は従来と同じ。
+- 各ズームは 1 つ上のズームの画像を 2 分の 1 に縮小して作る（毎回台紙全体を縮小しない）。
+- 画像の外側だけの余白タイルは書かない（map.js は bounds 外を要求せず、エディタは欠けタイルを飛ばす）。
+- WebP エンコードはプロセスプールで並列化する。
+- tiles/.tiles_manifest.json にタイルごとの画素ダイジェストを残し、
+  再実行時は「ファイルがあり画素が同じ」タイルを再エンコードしない（中断からの再開・差分更新）。
+- 巨大な地図はストリーミングモード（build_tile_pyramid(streaming=True)）で、
+  元画像を横帯ごとに読み、最大ズームの帯 → 1/2 帯 → … と下のズームへ流しながらタイルを書く。
+  台紙全体もズームごとの全体画像も持たない。帯ごとに読めるのは無圧縮 TIFF / BMP / PPM など raw の形式だけで、
+  このときの使用メモリは memory_budget_mb の帯サイズで頭打ちになる。PNG / WebP / JPEG は 1 度全体を展開するので、
+  その分は予算に収まらないことがある（JPEG は予算に収まる縮小率でデコードし、それ以外は警告を出す。_RowSource 参照）。
+- 下のズームへの縮小はどちらのモードも 2x2 平均（_halve）。同じ元画像からはモードによらず同じタイルになる。
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import shutil
+import sys
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from PIL import Image, ImageFile
+
+TILE_SIZE = 256
+MANIFEST_NAME = ".tiles_manifest.json"
+MANIFEST_VERSION = 1
+DEFAULT_WEBP_QUALITY = 80
+# ストリーミングモードの既定メモリ予算（帯バッファ分。MB）
+DEFAULT_MEMORY_BUDGET_MB = 512
+
+ProgressFn = Callable[[str], None]
+
+
+def pyramid_geometry(width: int, height: int) -> Tuple[int, int]:
+    """(max_zoom, 台紙一辺 px)。小さい画像でも max_zoom は 0 以上。"""
+    max_dim = max(int(width), int(height), 1)
+    max_zoom = max(0, math.ceil(math.log(max_dim / TILE_SIZE, 2)))
+    return max_zoom, (2 ** max_zoom) * TILE_SIZE
+
+
+def tile_path(tile_dir: str, z: int, x: int, y: int) -> str:
+    return os.path.join(tile_dir, str(z), str(x), f"{y}.webp")
+
+
+def tile_key(z: int, x: int, y: int) -> str:
+    return f"{z}/{x}/{y}"
+
+
+def tile_digest(tile: Image.Image) -> str:
+    """タイル画素のダイジェスト（差分判定用。エンコード結果ではなく入力画素で比べる）。"""
+    return hashlib.blake2b(tile.tobytes(), digest_size=16).hexdigest()
+
+
+def ensure_tile_dir(target_dir: str) -> str:
+    tile_dir = os.path.join(target_dir, "tiles")
+    os.makedirs(tile_dir, exist_ok=True)
+    # .gitignore 生成
+    gitignore_path = os.path.join(tile_dir, ".gitignore")
+    if not os.path.exists(gitignore_path):
+        with open(gitignore_path, "w", encoding="utf-8") as f:
+            f.write("# Ignore all tiles\n*\n!.gitignore\n")
+    return tile_dir
+
+
+def _encode_tile_job(job: Tuple[str, str, Tuple[int, int], bytes, int]) -> str:
+    """プロセスプール側: 生画素から WebP を一時ファイルに書いて置き換える（途中終了で壊れたタイルを残さない）。"""
+    path, mode, size, raw, quality = job
+    im = Image.frombytes(mode, size, raw)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    im.save(tmp, "WEBP", quality=quality)
+    os.replace(tmp, path)
+    return path
+
+
+class TileEncoder:
+    """WebP 書き出し。workers>1 ならプロセスプール、作れない環境では直列にフォールバックする。"""
+
+    def __init__(self, workers: Optional[int] = None, quality: int = DEFAULT_WEBP_QUALITY):
+        self.quality = int(quality)
+        n = workers if workers is not None else (os.cpu_count() or 1)
+        self.workers = max(1, int(n))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pending: set = set()
+        self.encoded = 0
+        if self.workers > 1:
+            try:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            except (OSError, NotImplementedError, ValueError):
+                self._pool = None
+
+    def submit(self, path: str, tile: Image.Image) -> None:
+        job = (path, tile.mode, tile.size, tile.tobytes(), self.quality)
+        self.encoded += 1
+        if self._pool is None:
+            _encode_tile_job(job)
+            return
+        # 未完了ジョブ数を抑えて、キュー上の生画素でメモリが膨らまないようにする
+        while len(self._pending) >= self.workers * 4:
+            done, self._pending = wait(self._pending, return_when=FIRST_COMPLETED)
+            for f in done:
+                f.result()
+        self._pending.add(self._pool.submit(_encode_tile_job, job))
+
+    def drain(self) -> None:
+        if self._pending:
+            done, _ = wait(self._pending)
+            self._pending = set()
+            for f in done:
+                f.result()
+
+    def close(self) -> None:
+        try:
+            self.drain()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+
+    def __enter__(self) -> "TileEncoder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def load_manifest(tile_dir: str) -> Dict[str, Any]:
+    path = os.path.join(tile_dir, MANIFEST_NAME)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data
+
+
+def save_manifest(tile_dir: str, manifest: Dict[str, Any]) -> None:
+    path = os.path.join(tile_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _reusable_digests(old: Dict[str, Any], quality: int, max_zoom: int, force: bool) -> Dict[str, str]:
+    """前回マニフェストのうち今回も信用できるタイルダイジェスト。"""
+    if force or not old:
+        return {}
+    if old.get("quality") != quality or old.get("tile_size") != TILE_SIZE or old.get("max_zoom") != max_zoom:
+        return {}
+    tiles = old.get("tiles")
+    return dict(tiles) if isinstance(tiles, dict) else {}
+
+
+def remove_stale_tiles(tile_dir: str, old_tiles: Dict[str, Any], live: set, max_zoom: int) -> int:
+    """今回の生成対象に無いタイル（前回の余白・縮小前の範囲）と max_zoom を超えるズームを消す。"""
+    removed = 0
+    for key in old_tiles:
+        if key in live:
+            continue
+        try:
+            z, x, y = (int(p) for p in key.split("/"))
+        except ValueError:
+            continue
+        p = tile_path(tile_dir, z, x, y)
+        if os.path.isfile(p):
+            try:
+                os.remove(p)
+                removed += 1
+            except OSError:
+                pass
+    try:
+        names = os.listdir(tile_dir)
+    except OSError:
+        names = []
+    for name in names:
+        if name.isdigit() and int(name) > max_zoom:
+            shutil.rmtree(os.path.join(tile_dir, name), ignore_errors=True)
+    return removed
+
+
+def _halve(img: Image.Image) -> Image.Image:
+    """
+    1 つ下のズーム用に 1/2 縮小（2x2 平均）。奇数辺は黒で 1px 足して台紙と同じ位置合わせを保つ。
+    2x2 ブロック内で閉じるので、ストリーミングの帯ごとに縮小しても全体を縮小した場合と同じ画素になる。
+    """
+    w, h = img.size
+    if w % 2 or h % 2:
+        padded = Image.new(img.mode, (w + w % 2, h + h % 2), (0, 0, 0))
+        padded.paste(img, (0, 0))
+        img = padded
+    return img.reduce(2)
+
+
+def _emit_level_tiles(
+    level_img: Image.Image,
+    z: int,
+    tile_dir: str,
+    encoder: TileEncoder,
+    reuse: Dict[str, str],
+    new_tiles: Dict[str, str],
+    ty0: int = 0,
+) -> Tuple[int, int]:
+    """
+    1 ズーム分（ストリーミング時はタイル行 ty0 から始まる帯）のタイルを切り出し、
+    変化したものだけエンコードに回す。戻り値: (書いた数, 再利用した数)。
+    """
+    lw, lh = level_img.size
+    nx = max(1, math.ceil(lw / TILE_SIZE))
+    ny = max(1, math.ceil(lh / TILE_SIZE))
+    written = reused = 0
+    for x in range(nx):
+        for j in range(ny):
+            # 画像外は黒（台紙の余白と同じ）で埋まる
+            tile = level_img.crop((x * TILE_SIZE, j * TILE_SIZE, (x + 1) * TILE_SIZE, (j + 1) * TILE_SIZE))
+            y = ty0 + j
+            key = tile_key(z, x, y)
+            dg = tile_digest(tile)
+            new_tiles[key] = dg
+            path = tile_path(tile_dir, z, x, y)
+            if reuse.get(key) == dg and os.path.isfile(path):
+                reused += 1
+                continue
+            encoder.submit(path, tile)
+            written += 1
+    return written, reused
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """このプロセスの最大常駐メモリ（bytes）。取れない環境では None。"""
+    try:
+        import resource
+    except ImportError:
+        resource = None  # type: ignore[assignment]
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux は KB、macOS は bytes
+        return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class _PMC(ctypes.Structure):
+                _fields_ = [
+                    ("cb", wintypes.DWORD),
+                    ("PageFaultCount", wintypes.DWORD),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+
+            pmc = _PMC()
+            pmc.cb = ctypes.sizeof(_PMC)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(pmc), pmc.cb):
+                return int(pmc.PeakWorkingSetSize)
+        except (AttributeError, OSError):
+            return None
+    return None
+
+
+class _UnboundedPixels:
+    """地図は信頼できる入力なので、Pillow の展開爆弾チェック（約 1.8 億画素で例外）を一時的に外す。"""
+
+    def __enter__(self) -> None:
+        self._saved = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+
+    def __exit__(self, *exc) -> None:
+        Image.MAX_IMAGE_PIXELS = self._saved
+
+
+def source_size(src_img_path: str) -> Tuple[int, int]:
+    """画素を展開せずに元画像のサイズだけ読む。"""
+    with _UnboundedPixels():
+        with Image.open(src_img_path) as im:
+            return im.size
+
+
+def needs_streaming(width: int, height: int, memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB) -> bool:
+    """通常モードの最大常駐（元画像 + 台紙相当の RGB 画像 2 枚分）が予算を超えるか。"""
+    _max_zoom, canvas_size = pyramid_geometry(width, height)
+    full_bytes = int(width) * int(height) * 3 + canvas_size * canvas_size * 3 // 2
+    return full_bytes > float(memory_budget_mb) * 1024 * 1024
+
+
+def _full_decode_bytes(im: Image.Image) -> int:
+    """im を全体展開して RGB にしたときの画素バッファの大きさ（RGB 以外は変換前の画像も同時に持つ）。"""
+    w, h = im.size
+    rgb = w * h * 3
+    if im.mode == "RGB":
+        return rgb
+    return rgb + w * h * len(im.getbands())
+
+
+# stride 省略の raw タイルで 1 行のバイト数を計算できる rawmode
+_RAW_BYTES_PER_PIXEL = {"L": 1, "RGB": 3, "RGBA": 4, "RGBX": 4}
+
+
+class _RowSource:
+    """
+    元画像を行範囲 [y0, y1) ごとに RGB で読む。
+
+    Pillow のタイル記述（ImageFile.tile）が行方向に分割できる形式
+    （無圧縮 TIFF のストリップ/タイル、BMP・PPM などの raw）は、その帯に掛かる部分だけを
+    デコードする（strategy="region"）。PNG / WebP / JPEG など 1 本のストリームでしか
+    デコードできない形式は最初に 1 度だけ全体を展開する（strategy="full_decode"）。
+    全体の展開が memory_budget_mb を超える場合:
+      - JPEG は draft() で予算に収まる縮小率（1/2・1/4・1/8）でデコードし、帯を読むたびに元の解像度へ拡大する
+        （strategy="jpeg_draft"。最大ズーム付近は細部が落ちる）
+      - それ以外は予算を超えたまま全体を展開し、warn で警告する（帯で読みたければ無圧縮 TIFF などに変換する）
+    over_budget_mb に予算超過分（MB、超えていなければ 0）を残す。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+        warn: Optional[ProgressFn] = None,
+    ):
+        self.path = path
+        self._full: Optional[Image.Image] = None
+        self._draft_size: Optional[Tuple[int, int]] = None
+        self.over_budget_mb = 0.0
+        with Image.open(path) as im:
+            self.size: Tuple[int, int] = im.size
+            self._band_tiles = self._splittable_tiles(im)
+            fmt = im.format
+            full_bytes = _full_decode_bytes(im)
+        if self._band_tiles is not None:
+            self.strategy = "region"
+            return
+        self.strategy = "full_decode"
+        budget = float(memory_budget_mb) * 1024 * 1024
+        if full_bytes <= budget:
+            return
+        if fmt == "JPEG":
+            w, h = self.size
+            scale = next((d for d in (2, 4, 8) if full_bytes / (d * d) <= budget), 8)
+            self._draft_size = (max(1, -(-w // scale)), max(1, -(-h // scale)))
+            self.strategy = "jpeg_draft"
+            self.over_budget_mb = max(0.0, (full_bytes / (scale * scale) - budget) / (1024 * 1024))
+            msg = (
+                f"警告: JPEG 全体の展開（約 {full_bytes / (1024 * 1024):.0f} MB）がメモリ予算 {memory_budget_mb:g} MB を"
+                f"超えるため、1/{scale} の解像度でデコードして拡大します（最大ズーム付近の細部が落ちます）。"
+                "元の解像度が必要ならメモリ予算を上げてください。"
+            )
+        else:
+            self.over_budget_mb = (full_bytes - budget) / (1024 * 1024)
+            msg = (
+                f"警告: {fmt or '元画像'} は帯ごとに読めないため全体を展開します（約 {full_bytes / (1024 * 1024):.0f} MB、"
+                f"メモリ予算 {memory_budget_mb:g} MB を超過）。予算内で作るには無圧縮 TIFF / BMP / PPM に変換してください。"
+            )
+        if warn is not None:
+            warn(msg)
+        else:
+            warnings.warn(msg, stacklevel=2)
+
+    def _splittable_tiles(self, im: Image.Image) -> Optional[List[Tuple[str, Tuple[int, int, int, int], int, Any]]]:
+        tiles = list(getattr(im, "tile", None) or [])
+        if not tiles or getattr(im, "n_frames", 1) != 1:
+            return None
+        if len(tiles) > 1:
+            # TIFF のストリップ/タイルは独立に読めるので、帯に掛かるものだけ選べる
+            if im.format != "TIFF":
+                return None
+            return [tuple(t) for t in tiles]  # type: ignore[misc]
+        name, extents, offset, args = tiles[0]
+        if name != "raw":
+            return None
+        if isinstance(args, str):
+            args = (args, 0, 1)
+        rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+        w, h = self.size
+        if tuple(extents) != (0, 0, w, h) or orientation not in (1, -1):
+            return None
+        if not stride:
+            bands = _RAW_BYTES_PER_PIXEL.get(rawmode)
+            if bands is None:
+                return None
+            stride = w * bands
+        # raw 1 本は 1 行 = 1 ストリップとみなし、帯ごとに読み出し位置を計算する
+        return [("raw-rows", (0, 0, w, h), int(offset), (rawmode, int(stride), int(orientation)))]
+
+    def _band_tile_list(self, y0: int, y1: int) -> Tuple[int, int, List[Tuple[Any, ...]]]:
+        assert self._band_tiles is not None
+        first = self._band_tiles[0]
+        if first[0] == "raw-rows":
+            _name, _ext, offset, (rawmode, stride, orientation) = first
+            w, h = self.size
+            if orientation == 1:
+                off = offset + y0 * stride
+            else:
+                # ボトムアップ（BMP）: 帯の最下行がファイル上で先に来る
+                off = offset + (h - y1) * stride
+            return y0, y1, [("raw", (0, 0, w, y1 - y0), off, (rawmode, stride, orientation))]
+        picked = [t for t in self._band_tiles if t[1][1] < y1 and t[1][3] > y0]
+        ty0 = min(t[1][1] for t in picked)
+        ty1 = max(t[1][3] for t in picked)
+        shifted = [
+            (t[0], (t[1][0], t[1][1] - ty0, t[1][2], t[1][3] - ty0), t[2], t[3])
+            for t in picked
+        ]
+        return ty0, ty1, shifted
+
+    def read(self, y0: int, y1: int) -> Image.Image:
+        w, _h = self.size
+        if self._band_tiles is None:
+            if self._full is None:
+                with Image.open(self.path) as im:
+                    if self._draft_size is not None:
+                        im.draft("RGB", self._draft_size)
+                    im.load()
+                    # RGB のままなら convert の複製を作らない
+                    self._full = im if im.mode == "RGB" else im.convert("RGB")
+            if self._draft_size is None:
+                return self._full.crop((0, y0, w, y1))
+            return self._upscaled_rows(y0, y1)
+        ty0, ty1, tiles = self._band_tile_list(y0, y1)
+        with Image.open(self.path) as im:
+            # ヘッダだけ読んだ画像のサイズとタイル記述を帯に差し替えてデコードさせる
+            im._size = (w, ty1 - ty0)
+            if hasattr(im, "_tile_size"):
+                # TIFF はデコード先をこちらのサイズで確保する
+                im._tile_size = im._size
+            im.tile = [ImageFile._Tile(*t) for t in tiles]
+            im.load()
+            band = im.convert("RGB")
+        if band.size != (w, ty1 - ty0):
+            raise OSError(f"帯の部分デコードに失敗しました: {self.path}")
+        if ty0 != y0 or ty1 != y1:
+            band = band.crop((0, y0 - ty0, w, y1 - ty0))
+        return band
+
+    def _upscaled_rows(self, y0: int, y1: int) -> Image.Image:
+        """縮小デコードした全体から [y0, y1) を元の解像度で作る（帯の継ぎ目が揃うよう前後の行も含めて拡大する）。"""
+        assert self._full is not None
+        w, h = self.size
+        rw, rh = self._full.size
+        sx, sy = rw / w, rh / h
+        margin = 4
+        ry0 = max(0, math.floor(y0 * sy) - margin)
+        ry1 = min(rh, math.ceil(y1 * sy) + margin)
+        part = self._full.crop((0, ry0, rw, ry1))
+        box = (0.0, y0 * sy - ry0, w * sx, y1 * sy - ry0)
+        return part.resize((w, y1 - y0), Image.Resampling.LANCZOS, box=box)
+
+    def close(self) -> None:
+        self._full = None
+
+
+def _vstack(top: Optional[Image.Image], bottom: Image.Image) -> Image.Image:
+    if top is None:
+        return bottom
+    out = Image.new(bottom.mode, (bottom.size[0], top.size[1] + bottom.size[1]), (0, 0, 0))
+    out.paste(top, (0, 0))
+    out.paste(bottom, (0, top.size[1]))
+    return out
+
+
+class _StreamingPyramid:
+    """
+    各ズームに「未出力の行」の帯だけを持ち、タイル 2 行分（512px）溜まるごとに
+    タイルを書いて 1/2 に縮小した 1 行分を下のズームへ渡す。
+    どのズームの帯も先頭がタイル 2 行単位に揃うので、縮小結果は台紙から作った場合と同じ位置になる。
+    """
+
+    def __init__(self, max_zoom: int, emit: Callable[[Image.Image, int, int], None]):
+        self.max_zoom = max_zoom
+        self._emit = emit
+        self._pending: Dict[int, Optional[Image.Image]] = {z: None for z in range(max_zoom + 1)}
+        self._next_row: Dict[int, int] = {z: 0 for z in range(max_zoom + 1)}
+
+    def _emit_rows(self, z: int, rows: Image.Image) -> None:
+        self._emit(rows, z, self._next_row[z] // TILE_SIZE)
+        self._next_row[z] += rows.size[1]
+
+    def push(self, z: int, band: Image.Image) -> None:
+        pending = _vstack(self._pending[z], band)
+        step = 2 * TILE_SIZE
+        w, h = pending.size
+        off = 0
+        while h - off >= step:
+            rows = pending.crop((0, off, w, off + step))
+            off += step
+            self._emit_rows(z, rows)
+            if z > 0:
+                self.push(z - 1, _halve(rows))
+        if off == 0:
+            self._pending[z] = pending
+        elif off < h:
+            self._pending[z] = pending.crop((0, off, w, h))
+        else:
+            self._pending[z] = None
+
+    def finish(self) -> None:
+        """残りの行（画像下端の端数）を上のズームから順に流し切る。"""
+        for z in range(self.max_zoom, -1, -1):
+            rest = self._pending[z]
+            self._pending[z] = None
+            if rest is None:
+                continue
+            self._emit_rows(z, rest)
+            if z > 0:
+                self.push(z - 1, _halve(rest))
+
+
+def _streaming_band_rows(width: int, memory_budget_mb: float) -> int:
+    """1 回に読む元画像の行数（タイル 2 行の倍数）。帯 + 各ズームの保留分 + 切り出しの複製でおよそ 4 倍見込む。"""
+    step = 2 * TILE_SIZE
+    per_row = max(1, int(width)) * 3 * 4
+    rows = int(float(memory_budget_mb) * 1024 * 1024 // per_row) // step * step
+    return max(step, rows)
+
+
+def _build_tile_pyramid_streaming(
+    src_img_path: str,
+    tile_dir: str,
+    quality: int,
+    workers: Optional[int],
+    force: bool,
+    memory_budget_mb: float,
+    report: ProgressFn,
+) -> Dict[str, Any]:
+    report("--- タイル生成開始（ストリーミング） ---")
+    source = _RowSource(src_img_path, memory_budget_mb, warn=report)
+    orig_w, orig_h = source.size
+    max_zoom, canvas_size = pyramid_geometry(orig_w, orig_h)
+    band_rows = _streaming_band_rows(orig_w, memory_budget_mb)
+    report(f"元サイズ: {orig_w}x{orig_h} -> 台紙サイズ: {canvas_size}x{canvas_size} (MaxZoom: {max_zoom})")
+    report(f"読込方式: {source.strategy} / 帯 {band_rows} 行 / メモリ予算 {memory_budget_mb:g} MB")
+
+    old = load_manifest(tile_dir)
+    reuse = _reusable_digests(old, quality, max_zoom, force)
+    manifest = _new_manifest(quality, max_zoom, orig_w, orig_h)
+    new_tiles: Dict[str, str] = manifest["tiles"]
+    counts = {"written": 0, "reused": 0}
+
+    with TileEncoder(workers=workers, quality=quality) as encoder:
+
+        def emit(rows: Image.Image, z: int, ty0: int) -> None:
+            w_n, r_n = _emit_level_tiles(rows, z, tile_dir, encoder, reuse, new_tiles, ty0=ty0)
+            counts["written"] += w_n
+            counts["reused"] += r_n
+
+        stream = _StreamingPyramid(max_zoom, emit)
+        try:
+            for y0 in range(0, orig_h, band_rows):
+                y1 = min(orig_h, y0 + band_rows)
+                stream.push(max_zoom, source.read(y0, y1))
+                encoder.drain()
+                save_manifest(tile_dir, {**manifest, "tiles": {**reuse, **new_tiles}})
+                report(f"{y1}/{orig_h} 行 完了（書き出し {counts['written']} / 再利用 {counts['reused']}）")
+            stream.finish()
+        finally:
+            source.close()
+
+    removed = remove_stale_tiles(tile_dir, (old.get("tiles") or {}), set(new_tiles), max_zoom)
+    save_manifest(tile_dir, manifest)
+    return {
+        "orig_w": orig_w,
+        "orig_h": orig_h,
+        "max_zoom": max_zoom,
+        "written": counts["written"],
+        "reused": counts["reused"],
+        "removed": removed,
+        "source_strategy": source.strategy,
+        "over_budget_mb": round(source.over_budget_mb, 1),
+    }
+
+
+def _new_manifest(quality: int, max_zoom: int, orig_w: int, orig_h: int) -> Dict[str, Any]:
+    return {
+        "version": MANIFEST_VERSION,
+        "tile_size": TILE_SIZE,
+        "quality": quality,
+        "max_zoom": max_zoom,
+        "orig_w": orig_w,
+        "orig_h": orig_h,
+        "tiles": {},
+    }
+
+
+def _build_tile_pyramid_in_memory(
+    src_img_path: str,
+    tile_dir: str,
+    quality: int,
+    workers: Optional[int],
+    force: bool,
+    report: ProgressFn,
+) -> Dict[str, Any]:
+    level_img = Image.open(src_img_path).convert("RGB")
+    orig_w, orig_h = level_img.size
+    max_zoom, canvas_size = pyramid_geometry(orig_w, orig_h)
+    report("--- タイル生成開始 ---")
+    report(f"元サイズ: {orig_w}x{orig_h} -> 台紙サイズ: {canvas_size}x{canvas_size} (MaxZoom: {max_zoom})")
+
+    old = load_manifest(tile_dir)
+    reuse = _reusable_digests(old, quality, max_zoom, force)
+    manifest = _new_manifest(quality, max_zoom, orig_w, orig_h)
+    new_tiles: Dict[str, str] = manifest["tiles"]
+    written = reused = 0
+    with TileEncoder(workers=workers, quality=quality) as encoder:
+        for z in range(max_zoom, -1, -1):
+            if z < max_zoom:
+                level_img = _halve(level_img)
+            w_n, r_n = _emit_level_tiles(level_img, z, tile_dir, encoder, reuse, new_tiles)
+            written += w_n
+            reused += r_n
+            encoder.drain()
+            # ズームごとに確定分を残す（中断後の再実行はここから差分になる）
+            save_manifest(tile_dir, {**manifest, "tiles": {**reuse, **new_tiles}})
+            report(f"Zoom {z} 完了（書き出し {w_n} / 再利用 {r_n}）")
+
+    removed = remove_stale_tiles(tile_dir, (old.get("tiles") or {}), set(new_tiles), max_zoom)
+    save_manifest(tile_dir, manifest)
+    return {
+        "orig_w": orig_w,
+        "orig_h": orig_h,
+        "max_zoom": max_zoom,
+        "written": written,
+        "reused": reused,
+        "removed": removed,
+    }
+
+
+def build_tile_pyramid(
+    src_img_path: str,
+    target_dir: str,
+    quality: int = DEFAULT_WEBP_QUALITY,
+    workers: Optional[int] = None,
+    force: bool = False,
+    progress: Optional[ProgressFn] = None,
+    streaming: Optional[bool] = None,
+    memory_budget_mb: float = DEFAULT_MEMORY_BUDGET_MB,
+) -> Dict[str, Any]:
+    """
+    src_img_path をタイル化して target_dir/tiles に書く。
+    force=True でマニフェストを無視して全タイルを書き直す。
+    streaming=None は元画像の大きさと memory_budget_mb から自動で選ぶ（True/False で強制）。
+    戻り値: orig_w, orig_h, max_zoom, written, reused, removed, streaming, peak_rss_mb
+    （ストリーミング時は source_strategy と over_budget_mb も。予算を超えた場合は progress にも警告を出す）
+    """
+    def report(msg: str) -> None:
+        print(msg)
+        if progress is not None:
+            progress(msg)
+
+    tile_dir = ensure_tile_dir(target_dir)
+    with _UnboundedPixels():
+        if streaming is None:
+            streaming = needs_streaming(*source_size(src_img_path), memory_budget_mb=memory_budget_mb)
+        if streaming:
+            stats = _build_tile_pyramid_streaming(
+                src_img_path, tile_dir, quality, workers, force, memory_budget_mb, report
+            )
+        else:
+            stats = _build_tile_pyramid_in_memory(src_img_path, tile_dir, quality, workers, force, report)
+    peak = peak_rss_bytes()
+    stats["streaming"] = bool(streaming)
+    stats["peak_rss_mb"] = round(peak / (1024 * 1024), 1) if peak is not None else None
+    if peak is not None:
+        report(f"最大メモリ使用量: {stats['peak_rss_mb']} MB")
+    return stats
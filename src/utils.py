@@ -1,61 +1,30 @@
 import os
-import math
 import shutil
 from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
 
-def create_tiles_from_image(src_img_path, target_dir):
+from .tile_pyramid import DEFAULT_MEMORY_BUDGET_MB, build_tile_pyramid
+
+def create_tiles_from_image(src_img_path, target_dir, workers=None, force=False, progress=None,
+                            streaming=None, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB):
     """
     画像を読み込み、正方形の台紙の左上に貼り付けてからタイル化する。
+    各ズームは 1 つ上のズームから縮小し、エンコードは並列。前回から画素が変わっていない
+    タイルは書き直さない（地図画像の差し替え時は変わった範囲だけ更新される）。
+    force=True で全タイルを作り直す。progress(msg) で進捗文言を受け取れる。
+    台紙が memory_budget_mb に収まらない大きな地図は自動で帯ごとのストリーミング生成になる
+    （streaming=True/False で強制）。
     """
-    img = Image.open(src_img_path).convert('RGB')
-    original_w, original_h = img.size
-    
-    # 元画像をそのままコピー
-    shutil.copy(src_img_path, os.path.join(target_dir, "map.png"))
-    
-    # キャンバスサイズ計算（ズレ防止）
-    max_dim = max(original_w, original_h)
-    max_zoom = math.ceil(math.log(max_dim / 256, 2))
-    canvas_size = (2 ** max_zoom) * 256
-    
-    print(f"--- タイル生成開始 ---")
-    print(f"元サイズ: {original_w}x{original_h} -> 台紙サイズ: {canvas_size}x{canvas_size} (MaxZoom: {max_zoom})")
-
-    base_image = Image.new('RGB', (canvas_size, canvas_size), (0, 0, 0))
-    base_image.paste(img, (0, 0)) 
-    
-    tile_dir = os.path.join(target_dir, "tiles")
-    os.makedirs(tile_dir, exist_ok=True)
-
-    # .gitignore 生成
-    gitignore_path = os.path.join(tile_dir, ".gitignore")
-    if not os.path.exists(gitignore_path):
-        with open(gitignore_path, "w", encoding="utf-8") as f:
-            f.write("# Ignore all tiles\n*\n!.gitignore\n")
-
-    # タイル生成ループ
-    for zoom in range(max_zoom, -1, -1):
-        num_tiles = 2 ** zoom
-        current_dim = num_tiles * 256
-        if zoom == max_zoom:
-            resized_img = base_image
-        else:
-            resized_img = base_image.resize((current_dim, current_dim), Image.Resampling.LANCZOS)
-        
-        z_dir = os.path.join(tile_dir, str(zoom))
-        os.makedirs(z_dir, exist_ok=True)
-        
-        for x in range(num_tiles):
-            x_dir = os.path.join(z_dir, str(x))
-            os.makedirs(x_dir, exist_ok=True)
-            for y in range(num_tiles):
-                tile = resized_img.crop((x*256, y*256, (x+1)*256, (y+1)*256))
-                tile.save(os.path.join(x_dir, f"{y}.webp"), "WEBP", quality=80)
-        
-        print(f"Zoom {zoom} 完了")
+    # 元画像をそのままコピー（同じファイルを指定した再タイル化ではコピー不要）
+    dst_map = os.path.join(target_dir, "map.png")
+    if not (os.path.exists(dst_map) and os.path.samefile(src_img_path, dst_map)):
+        shutil.copy(src_img_path, dst_map)
 
-    return original_w, original_h
+    stats = build_tile_pyramid(
+        src_img_path, target_dir, workers=workers, force=force, progress=progress,
+        streaming=streaming, memory_budget_mb=memory_budget_mb,
+    )
+    return stats["orig_w"], stats["orig_h"]
 
 def save_cropped_image_with_annotations(game_path, map_file, crop_box, orig_w, orig_h, here_pos, arrow_pos):
     """
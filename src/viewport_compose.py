@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+エディタ地図のビューポート合成（等倍タイル → 表示中のキャンバス範囲の 1 枚画像）。
+
+表示に要る等倍タイル（256px）を 1 枚のモザイクに並べ、ビューポートの各画素が参照するモザイク上の
+範囲を座標で指定して 1 回の再サンプル（Pillow の resize(box=...)、NEAREST / BILINEAR）で引く。
+タイルごとに ts×ts へ拡大したコピーを作って切り抜き・アルファ付き貼り付けする方式をやめたので、
+キャッシュには等倍タイルだけを持てばよい（拡大済みコピーの分のメモリが要らない）。
+"""
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+from PIL import Image
+
+TILE_SIZE = 256
+RESAMPLE_NEAREST = "nearest"
+RESAMPLE_BILINEAR = "bilinear"
+
+TileGrid = Dict[Tuple[int, int], Image.Image]
+
+_RESAMPLE_FILTERS = {
+    RESAMPLE_NEAREST: Image.Resampling.NEAREST,
+    RESAMPLE_BILINEAR: Image.Resampling.BILINEAR,
+}
+
+
+def normalize_resample(value: object) -> str:
+    v = str(value or "").strip().lower()
+    return v if v in _RESAMPLE_FILTERS else RESAMPLE_NEAREST
+
+
+def compose_viewport(
+    tiles: TileGrid,
+    tx_a: int,
+    tx_b: int,
+    ty_a: int,
+    ty_b: int,
+    ts: int,
+    vl: float,
+    vt: float,
+    cw: int,
+    ch: int,
+    bg: Tuple[int, int, int] = (28, 29, 36),
+    resample: str = RESAMPLE_NEAREST,
+) -> Image.Image:
+    """
+    tiles: (tx, ty) → 等倍タイル。範囲 [tx_a, tx_b) × [ty_a, ty_b) の外・欠けは bg で埋まる。
+    ts: 1 タイルのキャンバス上の一辺 px（拡大率は ts / 256）。vl, vt: ビューポート左上のキャンバス座標。
+    戻り値: (cw, ch) の RGB 画像。
+    """
+    cw, ch = int(cw), int(ch)
+    if cw <= 0 or ch <= 0 or tx_b <= tx_a or ty_b <= ty_a:
+        return Image.new("RGB", (max(1, cw), max(1, ch)), bg)
+    mosaic = Image.new("RGB", ((tx_b - tx_a) * TILE_SIZE, (ty_b - ty_a) * TILE_SIZE), bg)
+    for (tx, ty), im in tiles.items():
+        if im.mode != "RGB":
+            im = im.convert("RGB")
+        # タイルは不透明なのでマスク無しで貼る
+        mosaic.paste(im, ((tx - tx_a) * TILE_SIZE, (ty - ty_a) * TILE_SIZE))
+    scale = float(ts) / TILE_SIZE
+    ox, oy = tx_a * TILE_SIZE, ty_a * TILE_SIZE
+    box = (vl / scale - ox, vt / scale - oy, (vl + cw) / scale - ox, (vt + ch) / scale - oy)
+    return mosaic.resize((cw, ch), _RESAMPLE_FILTERS[normalize_resample(resample)], box=box)
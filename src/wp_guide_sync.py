@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""
+ガイドページ候補（wp_rest_guide_sources）の差分同期と、その結果を置くローカル索引ファイル。
+
+索引はただのキャッシュなので、ゲームフォルダの .cache/wp_guide_sync/<名前>.rest_index.json
+（REST 応答キャッシュ .cache/wp_rest と同じく git 管理外）に置き、ソースごとに
+  - 各 posts URL（JA / EN）の取得済み投稿（突き合わせに要る項目だけ）と、最後に見た modified（水位）
+  - 突き合わせ済みの行（wp_rest_guide.paired_rows_for_source の結果）
+を持つ。エディタは開いた時点で索引の行をそのまま候補に使い、裏で sync_guide_sources を走らせる。
+
+同期（既知の posts URL）:
+  1. ID だけの一覧（_fields=id）で削除を検出し、並び順を取る
+  2. modified_after=水位 で更新・追加された投稿だけを取り直す
+  3. 変化があったソースだけ突き合わせをやり直し、索引を一時ファイル + rename で書く
+どちらも wp_rest_fetch のプールで全ソース分まとめて並列に投げる。
+初めての URL・ソース設定が変わったソース・ID 一覧に知らない投稿があった URL は全件取得する。
+取得に失敗した URL のソースは前回の状態のまま残す（次回また差分を取る）。
+"""
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .wp_rest_fetch import DEFAULT_MAX_WORKERS, WpRestFetcher
+from .wp_rest_guide import _normalize_rest_base, _post_id, _source_rest_fields, paired_rows_for_source, source_posts_urls
+
+GUIDE_SYNC_INDEX_VERSION = 1
+_ID_ONLY_FIELDS = ("id",)
+
+
+def guide_sync_index_path(game_path: str, guide_page_links_path: str) -> str:
+    name = os.path.splitext(os.path.basename(guide_page_links_path))[0]
+    return os.path.join(game_path, ".cache", "wp_guide_sync", name + ".rest_index.json")
+
+
+def _source_key(src: Dict[str, Any]) -> str:
+    """ソース設定そのものを鍵にする（URL やフィルタ設定を変えたら別ソース扱いで全件取り直し）。"""
+    return json.dumps(src, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def load_guide_sync_index(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = None
+    if not isinstance(data, dict) or data.get("version") != GUIDE_SYNC_INDEX_VERSION:
+        return {"version": GUIDE_SYNC_INDEX_VERSION, "sources": {}}
+    if not isinstance(data.get("sources"), dict):
+        data["sources"] = {}
+    return data
+
+
+def _write_index_atomic(path: str, index: Dict[str, Any]) -> None:
+    d = os.path.dirname(path) or "."
+    os.makedirs(d, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=d)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def cached_guide_rows(path: str, sources: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+    """索引にある突き合わせ済みの行（今の sources の順）。ネットワークには出ない。"""
+    index = load_guide_sync_index(path)
+    out: List[Dict[str, str]] = []
+    for src in sources or []:
+        if not isinstance(src, dict):
+            continue
+        ent = index["sources"].get(_source_key(src))
+        if isinstance(ent, dict) and isinstance(ent.get("rows"), list):
+            out.extend(r for r in ent["rows"] if isinstance(r, dict))
+    return out
+
+
+def _watermark(posts: List[Dict[str, Any]]) -> str:
+    """投稿の modified（サイトのローカル時刻。modified_after と同じ基準）の最大値。"""
+    best = ""
+    for p in posts:
+        m = p.get("modified")
+        if isinstance(m, str) and m > best:
+            best = m
+    return best
+
+
+def _since_param(watermark: str) -> Optional[str]:
+    """水位の 1 秒前（同じ秒に更新された投稿を取りこぼさないように。重複は上書きで吸収される）。"""
+    if not watermark:
+        return None
+    try:
+        return (datetime.fromisoformat(watermark) - timedelta(seconds=1)).isoformat()
+    except ValueError:
+        return watermark
+
+
+def _merge_posts(
+    old_posts: List[Dict[str, Any]], ids: List[Dict[str, Any]], changed: List[Dict[str, Any]]
+) -> Tuple[Optional[List[Dict[str, Any]]], bool]:
+    """
+    前回の投稿 + ID 一覧 + 更新分 → (今の投稿リスト, 変化があったか)。
+    ID 一覧に前回も更新分にも無い投稿があれば (None, True)（全件取り直しが要る）。
+    """
+    by_id: Dict[int, Dict[str, Any]] = {}
+    for p in old_posts:
+        pid = _post_id(p)
+        if pid is not None:
+            by_id[pid] = p
+    dirty = False
+    for p in changed:
+        pid = _post_id(p)
+        if pid is None:
+            continue
+        if by_id.get(pid) != p:
+            dirty = True
+        by_id[pid] = p
+    out: List[Dict[str, Any]] = []
+    live: Set[int] = set()
+    for p in ids:
+        pid = _post_id(p)
+        if pid is None or pid in live:
+            continue
+        post = by_id.get(pid)
+        if post is None:
+            return None, True
+        live.add(pid)
+        out.append(post)
+    if len(live) != len(by_id) or [_post_id(p) for p in out] != [_post_id(p) for p in old_posts]:
+        dirty = True
+    return out, dirty
+
+
+def sync_guide_sources(
+    sources: List[Dict[str, Any]],
+    index_path: str,
+    *,
+    timeout: float = 30.0,
+    cache_dir: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Tuple[List[Dict[str, str]], Optional[str], Dict[str, int]]:
+    """
+    索引を使って全ソースを差分同期する。戻り値: (全ソースの行, エラーメッセージ, 統計)。
+    統計: posts_fetched（取り直した投稿数）, sources_rebuilt（突き合わせをやり直したソース数）, requests。
+    """
+    index = load_guide_sync_index(index_path)
+    old_sources: Dict[str, Any] = index["sources"]
+    srcs = [s for s in (sources or []) if isinstance(s, dict)]
+
+    # posts URL ごとの前回状態（同じ URL を複数ソースで使っていれば、どれか 1 つ）と _fields
+    known: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+    wanted: Dict[Tuple[str, Any], Optional[Tuple[str, ...]]] = {}
+    for src in srcs:
+        fields = _source_rest_fields(src)
+        ent = old_sources.get(_source_key(src))
+        langs = ent.get("langs") if isinstance(ent, dict) and isinstance(ent.get("langs"), dict) else {}
+        for u in source_posts_urls(src):
+            base = _normalize_rest_base(u)
+            if not base:
+                continue
+            k = (base, fields)
+            wanted[k] = fields
+            st = langs.get(base)
+            if k not in known and isinstance(st, dict) and isinstance(st.get("posts"), list):
+                known[k] = st
+
+    failed: Set[Any] = set()
+    stats = {"posts_fetched": 0, "sources_rebuilt": 0, "requests": 0}
+    state: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+    changed_urls: Set[Tuple[str, Any]] = set()
+    with WpRestFetcher(cache_dir=cache_dir, max_workers=max_workers, timeout=timeout) as fetcher:
+        specs: Dict[Any, Any] = {}
+        for k, fields in wanted.items():
+            base = k[0]
+            st = known.get(k)
+            if st is None:
+                specs[("full", k)] = (base, fields, None)
+            else:
+                specs[("ids", k)] = (base, _ID_ONLY_FIELDS, None)
+                specs[("changed", k)] = (base, fields, _since_param(str(st.get("watermark") or "")))
+        got = fetcher.fetch_post_lists(specs, failed=failed)
+
+        refetch: Dict[Any, Any] = {}
+        for k, fields in wanted.items():
+            st = known.get(k)
+            if st is None:
+                if ("full", k) in failed:
+                    continue
+                posts = got[("full", k)]
+                stats["posts_fetched"] += len(posts)
+                state[k] = {"watermark": _watermark(posts), "posts": posts}
+                changed_urls.add(k)
+                continue
+            if ("ids", k) in failed or ("changed", k) in failed:
+                state[k] = st
+                continue
+            changed = got[("changed", k)]
+            stats["posts_fetched"] += len(changed)
+            merged, dirty = _merge_posts(st["posts"], got[("ids", k)], changed)
+            if merged is None:
+                refetch[("full", k)] = (k[0], fields, None)
+                continue
+            state[k] = {"watermark": _watermark(merged) or str(st.get("watermark") or ""), "posts": merged}
+            if dirty:
+                changed_urls.add(k)
+        if refetch:
+            got2 = fetcher.fetch_post_lists(refetch, failed=failed)
+            for key, spec in refetch.items():
+                k = key[1]
+                if key in failed:
+                    state[k] = known[k]
+                    continue
+                posts = got2[key]
+                stats["posts_fetched"] += len(posts)
+                state[k] = {"watermark": _watermark(posts), "posts": posts}
+                changed_urls.add(k)
+        stats["requests"] = fetcher.stats["requests"]
+
+    new_sources: Dict[str, Any] = {}
+    rows_out: List[Dict[str, str]] = []
+    errors: List[str] = []
+    for i, src in enumerate(srcs):
+        skey = _source_key(src)
+        fields = _source_rest_fields(src)
+        ja_u, en_u = source_posts_urls(src)
+        if not ja_u and not en_u:
+            continue
+        keys = [(_normalize_rest_base(u), fields) for u in (ja_u, en_u) if _normalize_rest_base(u)]
+        old_ent = old_sources.get(skey) if isinstance(old_sources.get(skey), dict) else None
+        if any(k not in state for k in keys):
+            # 取得に失敗した URL がある: 前回の行のまま（初回なら空）
+            errors.append(f"ソース{i + 1}: 記事を取得できませんでした")
+            if old_ent is not None:
+                new_sources[skey] = old_ent
+                rows_out.extend(old_ent.get("rows") or [])
+            continue
+        langs = {k[0]: state[k] for k in keys}
+        if old_ent is not None and isinstance(old_ent.get("rows"), list) and not any(k in changed_urls for k in keys):
+            rows = old_ent["rows"]
+        else:
+            posts_ja = list(state[(_normalize_rest_base(ja_u), fields)]["posts"]) if ja_u else []
+            posts_en = list(state[(_normalize_rest_base(en_u), fields)]["posts"]) if en_u else []
+            rows = paired_rows_for_source(src, posts_ja, posts_en)
+            stats["sources_rebuilt"] += 1
+        if not rows:
+            errors.append(f"ソース{i + 1}: 記事を取得できませんでした")
+        new_sources[skey] = {"langs": langs, "rows": rows}
+        rows_out.extend(rows)
+
+    index = {"version": GUIDE_SYNC_INDEX_VERSION, "sources": new_sources}
+    try:
+        _write_index_atomic(index_path, index)
+    except OSError as ex:
+        errors.append(f"索引を保存できませんでした: {ex}")
+    return rows_out, ("; ".join(errors) if errors else None), stats
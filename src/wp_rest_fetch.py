@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+"""
+WordPress REST（.../wp/v2/posts）の取得エンジン。wp_rest_guide から使う。
+
+- 並列: 各 URL の 1 ページ目をまとめて投げ、X-WP-TotalPages が分かったら残りのページを同じプールに積む
+  （ソース・言語・ページをまたいで max_workers 本まで同時に取得）。ヘッダが無いサイトは従来どおり順に読む。
+- 接続: ワーカースレッドごとに (scheme, host) 単位で http.client の接続を持ち回す（keep-alive、SSL コンテキストは 1 つ）。
+  環境変数のプロキシが効くホストだけは urllib に任せる。
+- 転送量: ``_fields`` で突き合わせに使う項目だけ要求し、gzip を受け付ける。
+- キャッシュ: cache_dir を渡すと、ETag / Last-Modified 付きの応答を <cache_dir>/<URL の SHA-1>.json に保存し、
+  次回は If-None-Match / If-Modified-Since で再検証する（304 ならキャッシュの本文を使う）。
+  ``modified_after`` を渡すと、その時刻より後に更新された投稿だけを要求する（差分同期用）。
+
+ページの取得に失敗したら、そのページより前のページまでを返す（従来の逐次取得と同じ扱い）。
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import ssl
+import tempfile
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+USER_AGENT = "MapEditor-wp-rest-guide/1.0"
+DEFAULT_MAX_WORKERS = 6
+DEFAULT_PER_PAGE = 100
+DEFAULT_MAX_PAGES = 200
+# build_paired_entries / filter_posts_by_rest_lang / 差分同期が読む項目
+POST_FIELDS: Tuple[str, ...] = (
+    "id",
+    "slug",
+    "link",
+    "title",
+    "lang",
+    "translations",
+    "polylang_translations",
+    "modified",
+    "modified_gmt",
+)
+CACHE_VERSION = 1
+# (posts ベース URL, _fields（None で付けない）, modified_after（None で付けない）)
+PostListSpec = Tuple[str, Optional[Sequence[str]], Optional[str]]
+_MAX_REDIRECTS = 5
+
+
+def wp_rest_cache_dir_for_game(game_path: str) -> str:
+    return os.path.join(game_path, ".cache", "wp_rest")
+
+
+class WpRestHttpError(OSError):
+    def __init__(self, url: str, status: int):
+        super().__init__(f"HTTP {status}: {url}")
+        self.url = url
+        self.status = status
+
+
+def posts_page_url(
+    base: str,
+    page: int,
+    per_page: int = DEFAULT_PER_PAGE,
+    fields: Optional[Sequence[str]] = POST_FIELDS,
+    modified_after: Optional[str] = None,
+) -> str:
+    """posts のベース URL（?lang=jp 等が付いていてもよい）に page / per_page / _fields / modified_after を足す。"""
+    base = (base or "").strip().rstrip("/")
+    params: List[Tuple[str, str]] = [("page", str(page)), ("per_page", str(per_page))]
+    existing = urllib.parse.parse_qs(urllib.parse.urlparse(base).query, keep_blank_values=True)
+    if fields and "_fields" not in existing:
+        params.append(("_fields", ",".join(fields)))
+    if modified_after and "modified_after" not in existing:
+        params.append(("modified_after", modified_after))
+    sep = "&" if "?" in base else "?"
+    return f"{base}{sep}{urllib.parse.urlencode(params)}"
+
+
+class _Response:
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+
+class WpRestFetcher:
+    """
+    スレッドプール + keep-alive 接続 + ディスクキャッシュ。with 文か close() で接続とプールを閉じる。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = 30.0,
+        user_agent: str = USER_AGENT,
+    ):
+        self.cache_dir = cache_dir or None
+        self.timeout = timeout
+        self.user_agent = user_agent
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="wp-rest")
+        self._ssl = ssl.create_default_context()
+        self._local = threading.local()
+        self._conns_lock = threading.Lock()
+        self._all_conns: List[http.client.HTTPConnection] = []
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "not_modified": 0, "bytes": 0}
+
+    def __enter__(self) -> "WpRestFetcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
+        with self._conns_lock:
+            conns, self._all_conns = self._all_conns, []
+        for c in conns:
+            try:
+                c.close()
+            except Exception:
+                pass
+
+    # --- HTTP ---
+    def _connection(self, scheme: str, netloc: str, fresh: bool) -> http.client.HTTPConnection:
+        conns = getattr(self._local, "conns", None)
+        if conns is None:
+            conns = self._local.conns = {}
+        key = (scheme, netloc)
+        conn = conns.get(key)
+        if conn is not None and fresh:
+            conn.close()
+            conn = None
+        if conn is None:
+            if scheme == "https":
+                conn = http.client.HTTPSConnection(netloc, timeout=self.timeout, context=self._ssl)
+            else:
+                conn = http.client.HTTPConnection(netloc, timeout=self.timeout)
+            conns[key] = conn
+            with self._conns_lock:
+                self._all_conns.append(conn)
+        return conn
+
+    def _send(self, url: str, headers: Dict[str, str]) -> _Response:
+        u = urllib.parse.urlsplit(url)
+        scheme = (u.scheme or "http").lower()
+        if scheme not in ("http", "https"):
+            raise WpRestHttpError(url, 0)
+        if _uses_proxy(scheme, u.hostname or ""):
+            return self._send_urllib(url, headers)
+        path = urllib.parse.urlunsplit(("", "", u.path or "/", u.query, ""))
+        # 持ち回した接続がサーバ側で切られていたら、新しい接続で 1 回だけやり直す
+        for attempt in (0, 1):
+            conn = self._connection(scheme, u.netloc, fresh=attempt > 0)
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if attempt:
+                    raise
+                continue
+            out_headers = {k.lower(): v for k, v in resp.getheaders()}
+            if resp.will_close:
+                conn.close()
+            return _Response(resp.status, out_headers, body)
+        raise WpRestHttpError(url, 0)
+
+    def _send_urllib(self, url: str, headers: Dict[str, str]) -> _Response:
+        req = urllib.request.Request(url, headers=headers, method="GET")
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout, context=self._ssl) as resp:
+                return _Response(resp.status, {k.lower(): v for k, v in resp.getheaders()}, resp.read())
+        except urllib.error.HTTPError as ex:
+            return _Response(ex.code, {k.lower(): v for k, v in (ex.headers or {}).items()}, ex.read() or b"")
+
+    def get_json(self, url: str) -> Tuple[Any, Dict[str, str]]:
+        """
+        GET して JSON を返す（戻り値: (データ, 応答ヘッダ)）。キャッシュがあれば再検証し、304 ならキャッシュの本文。
+        2xx / 304 以外は WpRestHttpError。
+        """
+        cached = self._cache_read(url)
+        headers = {
+            "User-Agent": self.user_agent,
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+        }
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        target = url
+        for _ in range(_MAX_REDIRECTS + 1):
+            resp = self._send(target, headers)
+            if resp.status in (301, 302, 303, 307, 308) and resp.headers.get("location"):
+                target = urllib.parse.urljoin(target, resp.headers["location"])
+                continue
+            break
+        with self._stats_lock:
+            self.stats["requests"] += 1
+            self.stats["bytes"] += len(resp.body)
+        if resp.status == 304 and cached is not None:
+            with self._stats_lock:
+                self.stats["not_modified"] += 1
+            return cached.get("data"), dict(cached.get("headers") or {})
+        if not 200 <= resp.status < 300:
+            raise WpRestHttpError(url, resp.status)
+        body = resp.body
+        if resp.headers.get("content-encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+        data = json.loads(body.decode("utf-8", errors="replace"))
+        kept = {k: v for k, v in resp.headers.items() if k in ("x-wp-total", "x-wp-totalpages")}
+        if resp.headers.get("etag") or resp.headers.get("last-modified"):
+            self._cache_write(url, resp.headers.get("etag"), resp.headers.get("last-modified"), kept, data)
+        return data, kept
+
+    # --- キャッシュ ---
+    def _cache_path(self, url: str) -> Optional[str]:
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ".json")
+
+    def _cache_read(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._cache_path(url)
+        if not path:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_VERSION or entry.get("url") != url:
+            return None
+        return entry
+
+    def _cache_write(
+        self, url: str, etag: Optional[str], last_modified: Optional[str], headers: Dict[str, str], data: Any
+    ) -> None:
+        path = self._cache_path(url)
+        if not path:
+            return
+        entry = {
+            "version": CACHE_VERSION,
+            "url": url,
+            "etag": etag or "",
+            "last_modified": last_modified or "",
+            "headers": headers,
+            "data": data,
+        }
+        tmp = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=self.cache_dir)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(tmp, path)
+            tmp = None
+        except OSError:
+            pass
+        finally:
+            if tmp is not None:
+                try:
+                    os.remove(tmp)
+                except OSError:
+                    pass
+
+    # --- 投稿一覧 ---
+    def fetch_post_lists(
+        self,
+        specs: Dict[Hashable, PostListSpec],
+        *,
+        per_page: int = DEFAULT_PER_PAGE,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        failed: Optional[Set[Hashable]] = None,
+    ) -> Dict[Hashable, List[Dict[str, Any]]]:
+        """
+        specs: {キー: (posts ベース URL, _fields, modified_after)} の一覧を 1 つのプールで並列に全ページ取得する。
+        同じベース URL を _fields 違いで並べてもよい（差分同期の「ID 一覧」と「更新分」など）。
+        failed に集合を渡すと、途中のページが取れなかったキーを入れる（戻り値はそのページの手前まで）。
+        """
+        pages: Dict[Hashable, Dict[int, List[Dict[str, Any]]]] = {k: {} for k in specs}
+        # ページ数が分かった（または失敗した）キーの最終ページ
+        limit: Dict[Hashable, int] = {}
+        inflight: Dict[Future, Tuple[Hashable, int]] = {}
+
+        def submit(key: Hashable, page: int) -> None:
+            base, fields, since = specs[key]
+            url = posts_page_url(base, page, per_page, fields, since)
+            inflight[self._pool.submit(self.get_json, url)] = (key, page)
+
+        for k in specs:
+            submit(k, 1)
+        while inflight:
+            done, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            for fut in done:
+                key, page = inflight.pop(fut)
+                try:
+                    data, headers = fut.result()
+                except (OSError, ValueError, http.client.HTTPException):
+                    # 総ページ数の範囲内（または 1 ページ目）で取れなかったときだけ失敗扱い。
+                    # ヘッダの無いサイトで最終ページの次を読んだ 400 は、従来どおり「ここで終わり」
+                    if page == 1 or key in limit:
+                        if failed is not None:
+                            failed.add(key)
+                    limit[key] = min(limit.get(key, page), page - 1)
+                    continue
+                if not isinstance(data, list) or not data:
+                    limit[key] = min(limit.get(key, page), page - 1)
+                    continue
+                pages[key][page] = [p for p in data if isinstance(p, dict)]
+                if page != 1:
+                    if key not in limit and len(data) >= per_page and page < max_pages:
+                        # 総ページ数が分からないサイト: 満杯なら次のページ
+                        submit(key, page + 1)
+                    continue
+                total = _int_header(headers, "x-wp-totalpages")
+                if total is not None:
+                    total = min(total, max_pages)
+                    limit[key] = total
+                    for p in range(2, total + 1):
+                        submit(key, p)
+                elif len(data) >= per_page and max_pages > 1:
+                    submit(key, 2)
+
+        out: Dict[Hashable, List[Dict[str, Any]]] = {}
+        for k in specs:
+            got = pages[k]
+            posts: List[Dict[str, Any]] = []
+            page = 1
+            # 途中のページが欠けたら、そこより後は使わない
+            while page in got and page <= limit.get(k, max_pages):
+                posts.extend(got[page])
+                page += 1
+            out[k] = posts
+        return out
+
+    def fetch_posts_many(
+        self,
+        bases: Iterable[str],
+        *,
+        per_page: int = DEFAULT_PER_PAGE,
+        max_pages: int = DEFAULT_MAX_PAGES,
+        fields: Optional[Sequence[str]] = POST_FIELDS,
+        modified_after: Optional[Dict[str, str]] = None,
+        failed: Optional[Set[Hashable]] = None,
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        複数の posts ベース URL を並列に全ページ取得する。戻り値: {ベース URL: 投稿リスト}。
+        modified_after: {ベース URL: ISO 時刻} を渡した URL は、その時刻より後に更新された投稿だけ。
+        """
+        since = modified_after or {}
+        specs: Dict[Hashable, PostListSpec] = {}
+        for b in bases:
+            b = (b or "").strip()
+            if b:
+                specs[b] = (b, fields, since.get(b))
+        return self.fetch_post_lists(specs, per_page=per_page, max_pages=max_pages, failed=failed)  # type: ignore[return-value]
+
+    def fetch_posts(self, base: str, **kwargs) -> List[Dict[str, Any]]:
+        since = kwargs.pop("modified_after", None)
+        if since:
+            kwargs["modified_after"] = {(base or "").strip(): since}
+        return self.fetch_posts_many([base], **kwargs).get((base or "").strip(), [])
+
+
+def _int_header(headers: Dict[str, str], name: str) -> Optional[int]:
+    try:
+        return int(str(headers.get(name, "")).strip())
+    except ValueError:
+        return None
+
+
+def _uses_proxy(scheme: str, host: str) -> bool:
+    proxies = urllib.request.getproxies()
+    if scheme not in proxies:
+        return False
+    return not urllib.request.proxy_bypass(host)
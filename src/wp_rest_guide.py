@@ -11,30 +11,24 @@ WordPress REST API から記事一覧を取得し、JA/EN をリンク候補の1
 from __future__ import annotations
 
 import html as html_lib
-import json
 import re
-import ssl
-import urllib.error
 import urllib.parse
-import urllib.request
 from typing import Any, Dict, List, Optional, Tuple
 
+from .wp_rest_fetch import (
+    DEFAULT_MAX_PAGES,
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_PER_PAGE,
+    POST_FIELDS,
+    WpRestFetcher,
+)
 
-DEFAULT_WP_REST_GUIDE_SOURCES: List[Dict[str, str]] = []
 
-USER_AGENT = "MapEditor-wp-rest-guide/1.0"
+DEFAULT_WP_REST_GUIDE_SOURCES: List[Dict[str, str]] = []
 
-
-def _request_json(url: str, timeout: float = 30.0) -> Any:
-    req = urllib.request.Request(
-        url,
-        headers={"User-Agent": USER_AGENT, "Accept": "application/json"},
-        method="GET",
-    )
-    ctx = ssl.create_default_context()
-    with urllib.request.urlopen(req, timeout=timeout, context=ctx) as resp:
-        raw = resp.read().decode("utf-8", errors="replace")
-    return json.loads(raw)
+_TAG_RE = re.compile(r"<[^>]+>")
+_SPACES_RE = re.compile(r"\s+")
+_URL_IN_TEXT_RE = re.compile(r"https?://[^\s]+", re.IGNORECASE)
 
 
 def _normalize_rest_base(base: str) -> str:
@@ -45,33 +39,36 @@ def _normalize_rest_base(base: str) -> str:
 def fetch_posts_for_source(
     rest_posts_url: str,
     *,
-    per_page: int = 100,
-    max_pages: int = 200,
+    per_page: int = DEFAULT_PER_PAGE,
+    max_pages: int = DEFAULT_MAX_PAGES,
     timeout: float = 30.0,
+    cache_dir: Optional[str] = None,
 ) -> List[Dict[str, Any]]:
     """
     .../wp/v2/posts のベース URL。クエリ（例: ?lang=jp）が付いていても page/per_page を & で連結して全ページ取得。
+    2 ページ目以降は並列に取得する（wp_rest_fetch）。
     """
     base = _normalize_rest_base(rest_posts_url)
     if not base:
         return []
-    out: List[Dict[str, Any]] = []
-    for page in range(1, max_pages + 1):
-        q = urllib.parse.urlencode({"page": str(page), "per_page": str(per_page)})
-        sep = "&" if "?" in base else "?"
-        url = f"{base}{sep}{q}"
-        try:
-            data = _request_json(url, timeout=timeout)
-        except (urllib.error.URLError, urllib.error.HTTPError, json.JSONDecodeError, TimeoutError, OSError):
-            break
-        if not isinstance(data, list) or len(data) == 0:
-            break
-        for item in data:
-            if isinstance(item, dict):
-                out.append(item)
-        if len(data) < per_page:
-            break
-    return out
+    with WpRestFetcher(cache_dir=cache_dir, timeout=timeout) as fetcher:
+        return fetcher.fetch_posts(base, per_page=per_page, max_pages=max_pages)
+
+
+def _source_rest_fields(src: Dict[str, Any]) -> Optional[Tuple[str, ...]]:
+    """
+    ソースの rest_fields: 既定は POST_FIELDS。false / 空で _fields を付けない（翻訳 ID を独自の項目で返すサイト向け）。
+    リストなら POST_FIELDS に足す。
+    """
+    raw = src.get("rest_fields", True)
+    if raw is False or raw == [] or raw == "":
+        return None
+    if isinstance(raw, str):
+        raw = [x for x in raw.split(",")]
+    if isinstance(raw, list):
+        extra = [str(x).strip() for x in raw if str(x).strip()]
+        return tuple(dict.fromkeys(list(POST_FIELDS) + extra))
+    return POST_FIELDS
 
 
 def _post_slug(p: Dict[str, Any]) -> str:
@@ -104,11 +101,14 @@ def plain_text_for_guide_title(raw: str) -> str:
     s = raw.strip()
     if not s:
         return ""
-    s = re.sub(r"<[^>]+>", " ", s)
+    # 突き合わせでは全投稿のタイトルを通すので、当たらない置換は飛ばす
+    if "<" in s:
+        s = _TAG_RE.sub(" ", s)
     s = html_lib.unescape(s)
-    s = re.sub(r"\s+", " ", s).strip()
-    s = re.sub(r"https?://[^\s]+", " ", s, flags=re.IGNORECASE)
-    s = re.sub(r"\s+", " ", s).strip()
+    s = _SPACES_RE.sub(" ", s).strip()
+    if "http" in s.lower():
+        s = _URL_IN_TEXT_RE.sub(" ", s)
+        s = _SPACES_RE.sub(" ", s).strip()
     return s
 
 
@@ -442,30 +442,42 @@ def _pair_posts_by_slug(
     return rows
 
 
+class _EnPostIndex:
+    """
+    EN 投稿の突き合わせ用索引（1 回作って JA 投稿ごとに引く）。
+    by_id: 投稿 ID → 投稿、by_ja_id: EN 側の translations に載っている JA の ID → (投稿, ID)。
+    by_ja_id は posts_en の並びで最初に見つかったものを残す（従来の逆引きの走査順と同じ）。
+    """
+
+    def __init__(self, posts_en: List[Dict[str, Any]], keys_ja_from_en: Tuple[str, ...]):
+        self.by_id: Dict[int, Dict[str, Any]] = {}
+        for p in posts_en:
+            pid = _post_id(p)
+            if pid is not None:
+                self.by_id[pid] = p
+        self.by_ja_id: Dict[int, Tuple[Dict[str, Any], int]] = {}
+        for eid, e in self.by_id.items():
+            jid = _first_translation_id(extract_translation_id_map(e), keys_ja_from_en)
+            if jid is not None:
+                self.by_ja_id.setdefault(int(jid), (e, eid))
+
+
 def _find_en_post_for_ja(
     ja: Dict[str, Any],
-    by_id_en: Dict[int, Dict[str, Any]],
+    index: _EnPostIndex,
     keys_en_from_ja: Tuple[str, ...],
-    keys_ja_from_en: Tuple[str, ...],
 ) -> Tuple[Optional[Dict[str, Any]], Optional[int]]:
     """JA 投稿の translations から EN を探す。無ければ EN 側の translations に JA の id がある投稿を逆引き。"""
     trans = extract_translation_id_map(ja)
     en_id = _first_translation_id(trans, keys_en_from_ja)
     if en_id is not None:
-        en = by_id_en.get(int(en_id))
+        en = index.by_id.get(int(en_id))
         if en is not None:
             return en, int(en_id)
     ja_id = _post_id(ja)
     if ja_id is None:
         return None, None
-    for e in by_id_en.values():
-        t2 = extract_translation_id_map(e)
-        jid = _first_translation_id(t2, keys_ja_from_en)
-        if jid is not None and int(jid) == int(ja_id):
-            eid = _post_id(e)
-            if eid is not None:
-                return e, eid
-    return None, None
+    return index.by_ja_id.get(ja_id, (None, None))
 
 
 def _pair_posts_by_translations(
@@ -478,17 +490,13 @@ def _pair_posts_by_translations(
     keys_ja_from_en: Tuple[str, ...],
     append_fetch_lang_to_link: bool,
 ) -> List[Dict[str, str]]:
-    by_id_en: Dict[int, Dict[str, Any]] = {}
-    for p in posts_en:
-        pid = _post_id(p)
-        if pid is not None:
-            by_id_en[pid] = p
+    index = _EnPostIndex(posts_en, keys_ja_from_en)
     used_en: set[int] = set()
     rows: List[Dict[str, str]] = []
     for ja in posts_ja:
         if not isinstance(ja, dict):
             continue
-        en, en_id = _find_en_post_for_ja(ja, by_id_en, keys_en_from_ja, keys_ja_from_en)
+        en, en_id = _find_en_post_for_ja(ja, index, keys_en_from_ja)
         if en is not None and en_id is not None:
             used_en.add(en_id)
         slug = _post_slug(ja)
@@ -623,60 +631,110 @@ def build_paired_entries(
     )
 
 
+def fetch_source_posts(
+    sources: List[Dict[str, Any]],
+    *,
+    timeout: float = 30.0,
+    cache_dir: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+) -> Dict[Tuple[str, Optional[Tuple[str, ...]]], List[Dict[str, Any]]]:
+    """
+    全ソースの JA / EN の posts URL を 1 つのプールで並列に取得する（rest_fields の違うソースが混ざっていても 1 回）。
+    戻り値: {(posts URL（正規化後）, _fields): 投稿リスト}。_fields はソースごとの rest_fields（_source_rest_fields）。
+    """
+    specs: Dict[Tuple[str, Optional[Tuple[str, ...]]], Any] = {}
+    for src in sources or []:
+        if not isinstance(src, dict):
+            continue
+        fields = _source_rest_fields(src)
+        for u in source_posts_urls(src):
+            base = _normalize_rest_base(u)
+            if base:
+                specs[(base, fields)] = (base, fields, None)
+    if not specs:
+        return {}
+    with WpRestFetcher(cache_dir=cache_dir, max_workers=max_workers, timeout=timeout) as fetcher:
+        return fetcher.fetch_post_lists(specs)  # type: ignore[return-value]
+
+
+def source_posts_urls(src: Dict[str, Any]) -> Tuple[str, str]:
+    """ソース設定の (JA の posts URL, EN の posts URL)。無い側は空。"""
+    if not isinstance(src, dict):
+        return "", ""
+    return (src.get("ja") or src.get("jp") or "").strip(), (src.get("en") or "").strip()
+
+
+def paired_rows_for_source(
+    src: Dict[str, Any],
+    posts_ja: List[Dict[str, Any]],
+    posts_en: List[Dict[str, Any]],
+) -> List[Dict[str, str]]:
+    """1 ソース分の取得済み投稿を、ソース設定（言語フィルタ・翻訳キー・pair_mode など）に従って突き合わせる。"""
+    ja_u, en_u = source_posts_urls(src)
+
+    def _tuple_from_src(key: str, default: Tuple[str, ...]) -> Tuple[str, ...]:
+        raw = src.get(key) if isinstance(src, dict) else None
+        if isinstance(raw, list) and raw:
+            return tuple(str(x).strip() for x in raw if str(x).strip())
+        if isinstance(raw, str) and raw.strip():
+            return tuple(x.strip() for x in raw.split(",") if x.strip())
+        return default
+
+    if bool(src.get("filter_posts_by_rest_lang", False)):
+        accept_ja = _tuple_from_src("rest_lang_accept_ja", ("ja", "jp", "japanese"))
+        accept_en = _tuple_from_src("rest_lang_accept_en", ("en", "english"))
+        posts_ja = filter_posts_by_rest_lang(posts_ja, accept_ja)
+        posts_en = filter_posts_by_rest_lang(posts_en, accept_en)
+
+    keys_en = _tuple_from_src("translation_keys_en_from_ja", ("en", "EN"))
+    keys_ja = _tuple_from_src("translation_keys_ja_from_en", ("ja", "jp", "JP"))
+    pair_mode = str(src.get("pair_mode") or "auto").strip()
+    append_lang = bool(src.get("append_fetch_lang_to_link", False))
+
+    paired = build_paired_entries(
+        posts_ja,
+        posts_en,
+        ja_posts_api_url=ja_u,
+        en_posts_api_url=en_u,
+        translation_keys_en_from_ja=keys_en,
+        translation_keys_ja_from_en=keys_ja,
+        force_pair_mode=pair_mode,
+        append_fetch_lang_to_link=append_lang,
+    )
+    normalize_paired_row_urls_for_single_language(paired)
+    return paired
+
+
 def collect_paired_from_sources(
     sources: List[Dict[str, Any]],
     *,
     timeout: float = 30.0,
+    cache_dir: Optional[str] = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
 ) -> Tuple[List[Dict[str, str]], Optional[str]]:
     """
     sources: [{"ja": "https://.../wp/v2/posts", "en": "https://.../wp/v2/posts"}, ...]
+    cache_dir: REST 応答のディスクキャッシュ（wp_rest_fetch.wp_rest_cache_dir_for_game）。None でキャッシュしない。
     戻り値: (merged_rows, error_message)
+    差分だけ取り直す同期は wp_guide_sync.sync_guide_sources。
     """
     if not sources:
         return [], None
+    fetched = fetch_source_posts(sources, timeout=timeout, cache_dir=cache_dir, max_workers=max_workers)
     merged: List[Dict[str, str]] = []
     errors: List[str] = []
     for i, src in enumerate(sources):
         if not isinstance(src, dict):
             continue
-        ja_u = (src.get("ja") or src.get("jp") or "").strip()
-        en_u = (src.get("en") or "").strip()
+        ja_u, en_u = source_posts_urls(src)
         if not ja_u and not en_u:
             continue
-        posts_ja = fetch_posts_for_source(ja_u, timeout=timeout) if ja_u else []
-        posts_en = fetch_posts_for_source(en_u, timeout=timeout) if en_u else []
-
-        def _tuple_from_src(key: str, default: Tuple[str, ...]) -> Tuple[str, ...]:
-            raw = src.get(key) if isinstance(src, dict) else None
-            if isinstance(raw, list) and raw:
-                return tuple(str(x).strip() for x in raw if str(x).strip())
-            if isinstance(raw, str) and raw.strip():
-                return tuple(x.strip() for x in raw.split(",") if x.strip())
-            return default
-
-        if bool(src.get("filter_posts_by_rest_lang", False)):
-            accept_ja = _tuple_from_src("rest_lang_accept_ja", ("ja", "jp", "japanese"))
-            accept_en = _tuple_from_src("rest_lang_accept_en", ("en", "english"))
-            posts_ja = filter_posts_by_rest_lang(posts_ja, accept_ja)
-            posts_en = filter_posts_by_rest_lang(posts_en, accept_en)
-
-        keys_en = _tuple_from_src("translation_keys_en_from_ja", ("en", "EN"))
-        keys_ja = _tuple_from_src("translation_keys_ja_from_en", ("ja", "jp", "JP"))
-        pair_mode = str(src.get("pair_mode") or "auto").strip()
-        append_lang = bool(src.get("append_fetch_lang_to_link", False))
-
-        paired = build_paired_entries(
-            posts_ja,
-            posts_en,
-            ja_posts_api_url=ja_u,
-            en_posts_api_url=en_u,
-            translation_keys_en_from_ja=keys_en,
-            translation_keys_ja_from_en=keys_ja,
-            force_pair_mode=pair_mode,
-            append_fetch_lang_to_link=append_lang,
-        )
-        normalize_paired_row_urls_for_single_language(paired)
-        if not paired and (ja_u or en_u):
+        fields = _source_rest_fields(src)
+        # 同じ posts URL を複数ソースで使っていても、それぞれが自分の投稿リストを持つ（filter で書き換えないよう複製）
+        posts_ja = list(fetched.get((_normalize_rest_base(ja_u), fields), [])) if ja_u else []
+        posts_en = list(fetched.get((_normalize_rest_base(en_u), fields), [])) if en_u else []
+        paired = paired_rows_for_source(src, posts_ja, posts_en)
+        if not paired:
             errors.append(f"ソース{i + 1}: 記事を取得できませんでした")
         merged.extend(paired)
     return merged, ("; ".join(errors) if errors else None)
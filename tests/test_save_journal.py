@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""保存ジャーナル・ピンストア経由の読み直しが CSV 経由と同じ行になることの回帰テスト。"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.pin_record import PinRecord  # noqa: E402
+from src.pin_store import SqlitePinStore, read_pin_csv, write_pin_csv_atomic  # noqa: E402
+from src.save_journal import (  # noqa: E402
+    KIND_PIN,
+    SaveJournal,
+    apply_ops,
+    compact_save_journal,
+    new_pin_snapshot,
+)
+from src.pin_store import pin_record_from_blob  # noqa: E402
+
+
+def _pin(uid, x, y, **kw):
+    d = PinRecord(
+        {
+            "uid": uid, "x": float(x), "y": float(y), "name_jp": "", "name_en": "", "attribute": "ORE",
+            "obj_attributes": {}, "categories": [], "memo_jp": "",
+        }
+    )
+    d.update(kw)
+    return d
+
+
+def _save(journal, snapshot, rows):
+    """エディタの保存と同じ手順（差分 → 追記 → 確定）。"""
+    ops = snapshot.diff(rows)
+    assert ops is not None
+    journal.append(ops)
+    snapshot.commit()
+
+
+def _replay(csv_path, journal):
+    rows = read_pin_csv(csv_path) if os.path.exists(csv_path) else []
+    return apply_ops(rows, journal.read(KIND_PIN), pin_record_from_blob)
+
+
+def _csv_round_trip(tmp_path, rows):
+    p = str(tmp_path / "round_trip.csv")
+    write_pin_csv_atomic(p, rows)
+    return read_pin_csv(p)
+
+
+def test_draft_pin_survives_journal_replay_and_compaction(tmp_path):
+    csv_path = str(tmp_path / "master_data.csv")
+    areas_path = str(tmp_path / "areas.json")
+    base = [_pin("a", 1, 2, categories=[{"cat_id": "C1"}])]
+    write_pin_csv_atomic(csv_path, base)
+
+    journal = SaveJournal(str(tmp_path / ".save_journal.jsonl"))
+    snapshot = new_pin_snapshot()
+    rows = read_pin_csv(csv_path)
+    snapshot.reset(rows)
+    # 新規ピンをドラフトのまま保存（Ctrl+S・自動保存）
+    rows.append(_pin("b", 3, 4, name_jp="新規", __draft__=True))
+    _save(journal, snapshot, rows)
+
+    replayed = _replay(csv_path, journal)
+    assert [d["uid"] for d in replayed] == ["a", "b"]
+    assert all("__draft__" not in d for d in replayed)
+    assert replayed == _csv_round_trip(tmp_path, rows)
+
+    assert compact_save_journal(journal, csv_path, areas_path)
+    assert journal.size() == 0
+    assert read_pin_csv(csv_path) == replayed
+
+
+def test_journal_update_and_delete_match_csv(tmp_path):
+    csv_path = str(tmp_path / "master_data.csv")
+    write_pin_csv_atomic(csv_path, [_pin("a", 1, 2), _pin("b", 3, 4), _pin("c", 5, 6)])
+    journal = SaveJournal(str(tmp_path / ".save_journal.jsonl"))
+    snapshot = new_pin_snapshot()
+    rows = read_pin_csv(csv_path)
+    snapshot.reset(rows)
+
+    rows[0]["memo_jp"] = "更新"
+    del rows[1]
+    _save(journal, snapshot, rows)
+    rows.append(_pin("d", 7, 8, obj_attributes={"場所": "洞窟"}))
+    _save(journal, snapshot, rows)
+
+    assert _replay(csv_path, journal) == _csv_round_trip(tmp_path, rows)
+    compact_save_journal(journal, csv_path, str(tmp_path / "areas.json"))
+    assert read_pin_csv(csv_path) == _csv_round_trip(tmp_path, rows)
+
+
+def test_uncommitted_tail_is_ignored(tmp_path):
+    csv_path = str(tmp_path / "master_data.csv")
+    write_pin_csv_atomic(csv_path, [_pin("a", 1, 2)])
+    journal = SaveJournal(str(tmp_path / ".save_journal.jsonl"))
+    snapshot = new_pin_snapshot()
+    rows = read_pin_csv(csv_path)
+    snapshot.reset(rows)
+    rows.append(_pin("b", 3, 4))
+    _save(journal, snapshot, rows)
+    # 追記の途中で落ちた（commit 行が無い）
+    with open(journal.path, "a", encoding="utf-8") as f:
+        f.write('{"op":"delete","kind":"pin","key":"a"}\n{"op":"upsert","kind":"pin","key":"c","ro')
+
+    assert [d["uid"] for d in _replay(csv_path, journal)] == ["a", "b"]
+
+
+def test_pin_store_round_trip_drops_transient_keys(tmp_path):
+    csv_path = str(tmp_path / "master_data.csv")
+    rows = [_pin("a", 1, 2), _pin("b", 3, 4, __draft__=True, categories="[{broken")]
+    store = SqlitePinStore(str(tmp_path / "master_data.sqlite3"))
+    try:
+        store.save(rows)
+        loaded = store.load()
+        assert loaded == _csv_round_trip(tmp_path, rows)
+        store.export_csv(csv_path)
+        assert read_pin_csv(csv_path) == loaded
+    finally:
+        store.close()
+
+
+def test_pins_export_applies_journal(tmp_path):
+    from src.export_utils import _load_pins_csv, write_pins_export
+
+    csv_path = str(tmp_path / "master_data.csv")
+    write_pin_csv_atomic(csv_path, [_pin("a", 1, 2), _pin("b", 3, 4)])
+    journal = SaveJournal(str(tmp_path / ".save_journal.jsonl"))
+    snapshot = new_pin_snapshot()
+    rows = read_pin_csv(csv_path)
+    snapshot.reset(rows)
+    del rows[0]
+    rows.append(_pin("c", 5, 6, name_jp="追加"))
+    _save(journal, snapshot, rows)
+
+    assert [d["uid"] for d in _load_pins_csv(str(tmp_path))] == ["b", "c"]
+    stats = write_pins_export(str(tmp_path), compact=True, incremental=True)
+    assert stats["pins"] == 2
+    # 圧縮後（CSV だけ）も同じ出力になり、前回出力から写せる
+    with open(stats["path"], "rb") as f:
+        before = f.read()
+    compact_save_journal(journal, csv_path, str(tmp_path / "areas.json"))
+    stats = write_pins_export(str(tmp_path), compact=True, incremental=True)
+    assert stats["reused"] == 2
+    with open(stats["path"], "rb") as f:
+        assert f.read() == before
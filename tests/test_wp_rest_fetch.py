@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""wp_rest_fetch の取得エンジンを、手元の http.server（WordPress の posts 一覧の代役）に向けて確かめる。"""
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.wp_rest_fetch import WpRestFetcher  # noqa: E402
+from src.wp_rest_guide import fetch_source_posts  # noqa: E402
+
+PER_PAGE = 2
+
+
+class _Site:
+    """パス → 投稿リスト。total_pages_header=False で X-WP-TotalPages を返さないサイト、fail_pages で 500 を返すページ。"""
+
+    def __init__(self):
+        self.posts = {}
+        self.total_pages_header = True
+        self.fail_pages = set()
+        self.etag = '"v1"'
+        self.requests = []
+        self.lock = threading.Lock()
+
+
+def _handler(site):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            u = urllib.parse.urlsplit(self.path)
+            q = urllib.parse.parse_qs(u.query)
+            page = int(q.get("page", ["1"])[0])
+            per_page = int(q.get("per_page", [str(PER_PAGE)])[0])
+            with site.lock:
+                site.requests.append((u.path, page, q.get("_fields", [""])[0], self.headers.get("If-None-Match")))
+            posts = site.posts.get(u.path)
+            if posts is None:
+                return self._reply(404)
+            if page in site.fail_pages:
+                return self._reply(500)
+            total = max(1, -(-len(posts) // per_page))
+            if page > total:
+                # WordPress は範囲外のページに 400（rest_post_invalid_page_number）を返す
+                return self._reply(400, b'{"code":"rest_post_invalid_page_number"}')
+            if self.headers.get("If-None-Match") == site.etag:
+                return self._reply(304, headers={"ETag": site.etag})
+            body = json.dumps(posts[(page - 1) * per_page : page * per_page]).encode("utf-8")
+            headers = {"Content-Type": "application/json", "ETag": site.etag}
+            if site.total_pages_header:
+                headers["X-WP-Total"] = str(len(posts))
+                headers["X-WP-TotalPages"] = str(total)
+            self._reply(200, body, headers)
+
+    return Handler
+
+
+@pytest.fixture
+def site(monkeypatch):
+    for k in ("http_proxy", "HTTP_PROXY", "https_proxy", "HTTPS_PROXY", "all_proxy", "ALL_PROXY"):
+        monkeypatch.delenv(k, raising=False)
+    s = _Site()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(s))
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    s.base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield s
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _posts(n, prefix="p"):
+    return [{"id": i + 1, "slug": f"{prefix}{i + 1}"} for i in range(n)]
+
+
+@pytest.mark.parametrize("total_pages_header", [True, False])
+def test_fetch_all_pages_in_order(site, total_pages_header):
+    site.total_pages_header = total_pages_header
+    site.posts["/ja/wp/v2/posts"] = _posts(5, "ja")
+    site.posts["/en/wp/v2/posts"] = _posts(4, "en")
+    ja, en = site.base + "/ja/wp/v2/posts", site.base + "/en/wp/v2/posts"
+    failed = set()
+    with WpRestFetcher(max_workers=4) as fetcher:
+        got = fetcher.fetch_posts_many([ja, en], per_page=PER_PAGE, failed=failed)
+    assert [p["slug"] for p in got[ja]] == [f"ja{i}" for i in range(1, 6)]
+    assert [p["slug"] for p in got[en]] == [f"en{i}" for i in range(1, 5)]
+    # ヘッダの無いサイトで最終ページの次を読んだ 400 は失敗ではない
+    assert not failed
+
+
+def test_cached_pages_are_revalidated_with_304(site, tmp_path):
+    site.posts["/wp/v2/posts"] = _posts(3)
+    base = site.base + "/wp/v2/posts"
+    cache_dir = str(tmp_path / "wp_rest")
+    with WpRestFetcher(cache_dir=cache_dir) as fetcher:
+        first = fetcher.fetch_posts(base, per_page=PER_PAGE)
+        assert fetcher.stats["not_modified"] == 0
+    site.requests.clear()
+    with WpRestFetcher(cache_dir=cache_dir) as fetcher:
+        second = fetcher.fetch_posts(base, per_page=PER_PAGE)
+        assert fetcher.stats["not_modified"] == 2
+    assert second == first
+    assert all(r[3] == site.etag for r in site.requests)
+
+    # 内容が変わった（ETag が変わった）ら本文を取り直す
+    site.etag = '"v2"'
+    site.posts["/wp/v2/posts"] = _posts(4)
+    with WpRestFetcher(cache_dir=cache_dir) as fetcher:
+        third = fetcher.fetch_posts(base, per_page=PER_PAGE)
+        assert fetcher.stats["not_modified"] == 0
+    assert [p["id"] for p in third] == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("total_pages_header", [True, False])
+def test_failed_page_truncates(site, total_pages_header):
+    site.total_pages_header = total_pages_header
+    site.posts["/wp/v2/posts"] = _posts(8)
+    site.fail_pages = {3}
+    base = site.base + "/wp/v2/posts"
+    failed = set()
+    with WpRestFetcher(max_workers=4) as fetcher:
+        got = fetcher.fetch_posts_many([base], per_page=PER_PAGE, failed=failed)
+    # 3 ページ目が取れなければ、4 ページ目が取れていても 2 ページ目までしか使わない
+    assert [p["id"] for p in got[base]] == [1, 2, 3, 4]
+    # 総ページ数が分かっていれば失敗として報告する。ヘッダの無いサイトではエラーを一覧の終わりと見なす（従来の逐次取得と同じ）
+    assert failed == ({base} if total_pages_header else set())
+
+
+def test_failed_first_page_is_reported(site):
+    site.posts["/wp/v2/posts"] = _posts(3)
+    site.fail_pages = {1}
+    base = site.base + "/wp/v2/posts"
+    failed = set()
+    with WpRestFetcher() as fetcher:
+        got = fetcher.fetch_posts_many([base], per_page=PER_PAGE, failed=failed)
+    assert got[base] == []
+    assert failed == {base}
+
+
+def test_sources_with_different_rest_fields_share_one_fetch(site):
+    site.posts["/a/wp/v2/posts"] = _posts(1, "a")
+    site.posts["/b/wp/v2/posts"] = _posts(1, "b")
+    sources = [
+        {"ja": site.base + "/a/wp/v2/posts"},
+        {"ja": site.base + "/b/wp/v2/posts", "rest_fields": False},
+        # 同じ URL でも rest_fields が違えば別に取る
+        {"ja": site.base + "/a/wp/v2/posts", "rest_fields": ["acf"]},
+    ]
+    got = fetch_source_posts(sources)
+    assert len(got) == 3
+    fields_by_path = {}
+    for path, _page, fields, _inm in site.requests:
+        fields_by_path.setdefault(path, set()).add(fields)
+    assert "" in fields_by_path["/b/wp/v2/posts"]
+    assert len(fields_by_path["/a/wp/v2/posts"]) == 2
+    assert all(posts for posts in got.values())